@@ -1,6 +1,8 @@
 from django.contrib import admin
+from django.contrib.admin.actions import delete_selected
 
 from ci_dashboard.models import Rule, RuleCheck, CiSystem, ProductCi, Status, ProductCiStatus
+from ci_dashboard.models import ImportJob, Webhook
 
 
 class RuleAdmin(admin.ModelAdmin):
@@ -26,6 +28,75 @@ class RuleAdmin(admin.ModelAdmin):
     )
 
 
+def delete_selected_statuses(modeladmin, request, queryset):
+    statuses = list(queryset)
+    response = delete_selected(modeladmin, request, queryset)
+
+    if response is None:  # deleted, otherwise the confirmation page
+        modeladmin.model.history_changed(statuses)
+
+    return response
+
+
+class StatusAdmin(admin.ModelAdmin):
+    """Keeps the timelines and the live dashboards in sync with the edits."""
+
+    def get_actions(self, request):
+        actions = super(StatusAdmin, self).get_actions(request)
+
+        if 'delete_selected' in actions:
+            actions['delete_selected'] = (
+                delete_selected_statuses,
+                'delete_selected',
+                delete_selected.short_description,
+            )
+
+        return actions
+
+    def save_model(self, request, obj, form, change):
+        super(StatusAdmin, self).save_model(request, obj, form, change)
+        self.model.history_changed([obj])
+
+    def delete_model(self, request, obj):
+        super(StatusAdmin, self).delete_model(request, obj)
+        self.model.history_changed([obj])
+
+
+class WebhookAdmin(admin.ModelAdmin):
+    fields = (
+        'url',
+        'event_types',
+        'is_active',
+        'last_event_id',
+    )
+    list_display = (
+        'url',
+        'event_types',
+        'is_active',
+        'last_event_id',
+        'last_error',
+        'updated_at',
+    )
+
+
+class ImportJobAdmin(admin.ModelAdmin):
+    list_display = (
+        'id',
+        'state',
+        'user',
+        'cis_imported',
+        'cis_total',
+        'ps_imported',
+        'ps_total',
+        'created_at',
+        'finished_at',
+    )
+    exclude = ('seeds',)
+
+
 admin.site.register(RuleCheck)
 admin.site.register(Rule, RuleAdmin)
-admin.site.register([CiSystem, ProductCi, Status, ProductCiStatus])
+admin.site.register(Webhook, WebhookAdmin)
+admin.site.register(ImportJob, ImportJobAdmin)
+admin.site.register([Status, ProductCiStatus], StatusAdmin)
+admin.site.register([CiSystem, ProductCi])
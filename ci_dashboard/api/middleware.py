@@ -1,13 +1,23 @@
+from django.contrib.auth.models import AnonymousUser, User
+from django.utils.functional import SimpleLazyObject
+
 from ci_dashboard.models import UserToken
 
 
+def _get_user(user_id):
+    return User.objects.filter(pk=user_id).first() or AnonymousUser()
+
+
 class TokenAuthMiddleware(object):
     @staticmethod
     def process_request(request):
         token = request.META.get('HTTP_TOKEN')
         if not token:
             return
-        try:
-            request.user = UserToken.objects.get(token=token).user
-        except UserToken.DoesNotExist:
-            pass
+
+        user_id = UserToken.user_id_for_token(token)
+        if user_id is not None:
+            request.user = SimpleLazyObject(lambda: _get_user(user_id))
+            # browsers do not send the header on their own, the session
+            # authenticated requests are still checked by the csrf middleware
+            request._dont_enforce_csrf_checks = True
@@ -1,6 +1,15 @@
 $(function() {
-    var AUTOREFRESH_COUNTDOWN = 5 * 60 * 1000,
-        autoRefreshTimer;
+    var STATUS_COLORS = {
+            1: 'success',
+            2: 'danger',
+            16: 'default',
+            32: 'warning'
+        },
+        ROW_CLASSES = 'success danger default warning info',
+        LABEL_CLASSES = 'label-success label-danger label-default ' +
+                        'label-warning label-info',
+        EVENT_TYPES = ['ci_status', 'product_status'],
+        pollTimer;
 
     $('.ci-card-link').on('click', function(e) {
         e.preventDefault();
@@ -30,28 +39,98 @@ $(function() {
     });
 
 
-    var activateAutoRefresh = function(enable) {
-        clearTimeout(autoRefreshTimer);
+    var _statusColor = function(statusType) {
+        return STATUS_COLORS[statusType] || 'info';
+    };
+
+    var _patchStatus = function(elements, data) {
+        var color = _statusColor(data.status_type);
+
+        elements.filter('tr').removeClass(ROW_CLASSES).addClass(color);
+        $('[data-field="status_label"]', elements)
+            .removeClass(LABEL_CLASSES)
+            .addClass('label-' + color)
+            .text(data.status_text);
+        $('[data-field="status_text"]', elements).text(data.status_text);
+
+        // a new status of the same type keeps the time it became active
+        if (data.status_type !== data.previous_status_type) {
+            $('[data-field="active_from"]', elements).text('just now');
+        }
+    };
+
+    var _onCiStatus = function(data) {
+        var elements = $('[data-ci-system="' + data.ci_system + '"]');
+
+        _patchStatus(elements, data);
+        $('[data-field="summary"]', elements).text(data.summary);
+        $('[data-field="is_manual"]', elements)
+            .text(data.is_manual ? 'True' : 'False');
+        $('[data-field="author"]', elements).text(data.author);
+        $('[data-field="rule_checks"]', elements)
+            .text(data.rule_checks + ' / ' + data.failed_rule_checks);
+    };
+
+    var _onProductStatus = function(data) {
+        _patchStatus($('[data-product-ci="' + data.product_ci + '"]'), data);
+    };
+
+    var EVENT_HANDLERS = {
+        ci_status: _onCiStatus,
+        product_status: _onProductStatus
+    };
+
+    // the events are polled with short requests, so the web workers
+    // are not held by the open dashboards
+    var pollEvents = function(url, lastEventId, interval) {
+        $.ajax({
+            url: url,
+            data: {after: lastEventId, event_type: EVENT_TYPES},
+            traditional: true,
+            dataType: 'json'
+        }).done(function(response) {
+            $.each(response.data.events, function(_, event) {
+                EVENT_HANDLERS[event.event_type](event.data);
+            });
+            lastEventId = response.data.last_id;
+        }).always(function(response) {
+            var more = response && response.data && response.data.has_more;
+
+            if (pollTimer !== null) {
+                pollTimer = setTimeout(function() {
+                    pollEvents(url, lastEventId, interval);
+                }, more ? 0 : interval * 1000);
+            }
+        });
+    };
+
+    var activateLiveUpdates = function(enable, toggle) {
+        clearTimeout(pollTimer);
+        pollTimer = null;
 
         if (enable) {
-            autoRefreshTimer = setTimeout(function() {
-                window.location.reload(true)
-            }, AUTOREFRESH_COUNTDOWN);
+            pollTimer = setTimeout(function() {
+                pollEvents(
+                    toggle.data('events-url'),
+                    toggle.data('last-event-id'),
+                    toggle.data('interval')
+                );
+            }, 0);
         }
     };
 
-    var _enableAutoRefresh = function(container) {
+    var _enableLiveUpdates = function(container, toggle) {
         container.removeClass('btn-default').addClass('btn-success active');
-        $('span', container).text('Page Autorefresh: ON');
+        $('span', container).text('Live Updates: ON');
 
-        activateAutoRefresh(true);
+        activateLiveUpdates(true, toggle);
     };
 
-    var _disableAutoRefresh = function(container) {
+    var _disableLiveUpdates = function(container) {
         container.removeClass('btn-success active').addClass('btn-default');
-        $('span', container).text('Page Autorefresh: OFF');
+        $('span', container).text('Live Updates: OFF');
 
-        activateAutoRefresh(false);
+        activateLiveUpdates(false);
     };
 
     if ((location.pathname == '/dashboard/' ||
@@ -64,16 +143,16 @@ $(function() {
 
         if (initialValue == 'true') {
             toggle.prop('checked', true);
-            _enableAutoRefresh(container);
+            _enableLiveUpdates(container, toggle);
         }
 
         toggle.on('change', function () {
             if (toggle.prop('checked')) {
                 localStorage.setItem('ci_status.autorefresh', 'true');
-                _enableAutoRefresh(container);
+                _enableLiveUpdates(container, toggle);
             } else {
                 localStorage.setItem('ci_status.autorefresh', 'false');
-                _disableAutoRefresh(container);
+                _disableLiveUpdates(container);
             }
         });
     }
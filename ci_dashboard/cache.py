@@ -0,0 +1,51 @@
+"""In-process caches for the values read on every request."""
+
+from __future__ import unicode_literals
+
+import threading
+import time
+
+from collections import OrderedDict
+
+
+class LocalCache(object):
+    """Thread-safe bounded mapping with expiring entries.
+
+    The least recently used entries are evicted when `max_size` is reached.
+    """
+
+    def __init__(self, timeout, max_size=1000):
+        self.timeout = timeout
+        self.max_size = max_size
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                value, expires_at = self._data.pop(key)
+            except KeyError:
+                return default
+
+            if expires_at < time.time():
+                return default
+
+            self._data[key] = (value, expires_at)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data.pop(key, None)
+
+            while len(self._data) >= self.max_size:
+                self._data.popitem(last=False)
+
+            self._data[key] = (value, time.time() + self.timeout)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
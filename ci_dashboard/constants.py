@@ -61,3 +61,32 @@ LDAP_USER_PERMISSIONS = (
         'productcistatus',
     )
 )
+
+EVENT_CI_STATUS = 'ci_status'
+EVENT_PRODUCT_STATUS = 'product_status'
+EVENT_RULE_CHECK = 'rule_check'
+EVENT_TYPE_CHOICES = (
+    (EVENT_CI_STATUS, 'CI Status'),
+    (EVENT_PRODUCT_STATUS, 'Product Status'),
+    (EVENT_RULE_CHECK, 'Rule Check'),
+)
+
+ROLLUP_RULE = 'rule'
+ROLLUP_CI_SYSTEM = 'ci_system'
+ROLLUP_PRODUCT_CI = 'product_ci'
+ROLLUP_SCOPE_CHOICES = (
+    (ROLLUP_RULE, 'Rule'),
+    (ROLLUP_CI_SYSTEM, 'CI System'),
+    (ROLLUP_PRODUCT_CI, 'Product Status'),
+)
+
+IMPORT_PENDING = 'pending'
+IMPORT_RUNNING = 'running'
+IMPORT_DONE = 'done'
+IMPORT_FAILED = 'failed'
+IMPORT_STATE_CHOICES = (
+    (IMPORT_PENDING, 'Pending'),
+    (IMPORT_RUNNING, 'Running'),
+    (IMPORT_DONE, 'Done'),
+    (IMPORT_FAILED, 'Failed'),
+)
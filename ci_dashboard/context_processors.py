@@ -1,9 +1,7 @@
-from ci_dashboard.models import Stats
+from ci_dashboard.models import last_sync_timestamp
 
 
 def last_sync(request):
-    last_sync, created = Stats.objects.get_or_create(name='last_sync')
-
     return {
-        'last_sync': last_sync.updated_at.isoformat(),
+        'last_sync': last_sync_timestamp().isoformat(),
     }
@@ -0,0 +1,72 @@
+"""Opaque cursors for keyset pagination over `(timestamp, id)` pairs."""
+
+from __future__ import unicode_literals
+
+import base64
+import json
+
+from datetime import datetime, time
+
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+
+class CursorError(ValueError):
+    pass
+
+
+def parse_timestamp(value):
+    """Parses ISO 8601 timestamp, dates are treated as midnight UTC."""
+    try:
+        moment = parse_datetime(value)
+
+        if moment is None:
+            day = parse_date(value)
+            moment = datetime.combine(day, time()) if day else None
+    except ValueError:
+        moment = None
+
+    if moment is None:
+        raise CursorError('Invalid timestamp: %s' % value)
+
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment, timezone.utc)
+
+    return moment
+
+
+def encode_cursor(positions):
+    """Packs `{name: (timestamp, id)}` into an url-safe string."""
+    data = {
+        name: [moment.isoformat(), pk]
+        for name, (moment, pk) in positions.items()
+    }
+    return base64.urlsafe_b64encode(
+        json.dumps(data, sort_keys=True).encode('utf-8')
+    ).decode('ascii')
+
+
+def decode_cursor(cursor):
+    try:
+        data = json.loads(
+            base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8')
+        )
+        return {
+            name: (parse_timestamp(moment), int(pk))
+            for name, (moment, pk) in data.items()
+        }
+    except (TypeError, ValueError, AttributeError) as exc:
+        raise CursorError('Invalid cursor: %s' % exc)
+
+
+def after(field, position):
+    """Filter for rows following the `position` in `(field, id)` order."""
+    moment, pk = position
+    return Q(**{field + '__gt': moment}) | Q(**{field: moment, 'id__gt': pk})
+
+
+def before(field, position):
+    """Filter for rows preceding the `position` in `(field, id)` order."""
+    moment, pk = position
+    return Q(**{field + '__lt': moment}) | Q(**{field: moment, 'id__lt': pk})
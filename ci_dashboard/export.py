@@ -0,0 +1,155 @@
+"""Streaming export of the statuses history as NDJSON or CSV.
+
+Rows are read by chunks in `(created_at, id)` order, every chunk is
+serialized and yielded before the next one is read, so the memory used
+does not depend on the size of the history.
+"""
+
+from __future__ import unicode_literals
+
+import csv
+import json
+import zlib
+
+from datetime import timedelta
+
+import six
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.dateparse import parse_date
+
+from ci_dashboard import cursors
+from ci_dashboard.models import ProductCiStatus, RuleCheck, Status
+
+EXPORT_SOURCES = {
+    'statuses': (Status, (
+        'id', 'ci_system', 'status_type', 'summary', 'description',
+        'is_manual', 'user', 'created_at', 'updated_at', 'last_changed_at',
+    )),
+    'product_statuses': (ProductCiStatus, (
+        'id', 'product_ci', 'version', 'status_type', 'summary',
+        'description', 'is_manual', 'user', 'created_at', 'updated_at',
+        'last_changed_at',
+    )),
+    'rule_checks': (RuleCheck, (
+        'id', 'rule', 'status_type', 'running', 'queued', 'build_number',
+        'is_running_now', 'last_successfull_build_link',
+        'last_failed_build_link', 'created_at', 'last_seen', 'updated_at',
+    )),
+}
+
+EXPORT_FORMATS = ('ndjson', 'csv')
+
+CONTENT_TYPES = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+
+class ExportError(ValueError):
+    pass
+
+
+def export(source, export_format='ndjson', date_from=None, date_to=None,
+           compress=False, chunk_size=None):
+    """Yields the exported history of the source as byte strings.
+
+    `date_from` and `date_to` are ISO 8601 timestamps or dates, a date in
+    `date_to` includes the whole day.
+    """
+    if source not in EXPORT_SOURCES:
+        raise ExportError('Unknown export source: %s' % source)
+    if export_format not in EXPORT_FORMATS:
+        raise ExportError('Unknown export format: %s' % export_format)
+
+    model, fields = EXPORT_SOURCES[source]
+    queryset = model.objects.all()
+
+    if date_from:
+        queryset = queryset.filter(
+            created_at__gte=cursors.parse_timestamp(date_from))
+
+    if date_to:
+        to = cursors.parse_timestamp(date_to)
+        if parse_date(date_to):
+            to += timedelta(days=1)
+        queryset = queryset.filter(created_at__lt=to)
+
+    chunks = iter_chunks(
+        queryset, fields, chunk_size or settings.EXPORT_CHUNK_SIZE)
+    serialize = _ndjson if export_format == 'ndjson' else _csv
+    stream = serialize(chunks, fields)
+
+    return _gzip(stream) if compress else stream
+
+
+def iter_chunks(queryset, fields, chunk_size):
+    """Yields lists of rows read in `(created_at, id)` order."""
+    created_at, pk = fields.index('created_at'), fields.index('id')
+    position = None
+
+    while True:
+        chunk = queryset
+        if position:
+            chunk = chunk.filter(cursors.after('created_at', position))
+
+        rows = list(chunk.order_by('created_at', 'id').values_list(
+            *fields)[:chunk_size])
+        if not rows:
+            return
+
+        yield rows
+
+        position = (rows[-1][created_at], rows[-1][pk])
+
+
+def _ndjson(chunks, fields):
+    for rows in chunks:
+        yield ''.join(
+            json.dumps(dict(zip(fields, row)), cls=DjangoJSONEncoder) + '\n'
+            for row in rows
+        ).encode('utf-8')
+
+
+class _Echo(object):
+    """File-like object which returns the written value."""
+
+    def write(self, value):
+        return value
+
+
+def _csv(chunks, fields):
+    writer = csv.writer(_Echo())
+
+    yield _csv_line(writer, fields)
+
+    for rows in chunks:
+        yield b''.join(_csv_line(writer, row) for row in rows)
+
+
+def _csv_line(writer, values):
+    line = writer.writerow([_csv_value(value) for value in values])
+    return line if isinstance(line, bytes) else line.encode('utf-8')
+
+
+def _csv_value(value):
+    if value is None:
+        return ''
+    if hasattr(value, 'isoformat'):
+        value = value.isoformat()
+    if six.PY2 and isinstance(value, six.text_type):
+        return value.encode('utf-8')
+
+    return value
+
+
+def _gzip(stream):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    for data in stream:
+        compressed = compressor.compress(data)
+        if compressed:
+            yield compressed
+
+    yield compressor.flush()
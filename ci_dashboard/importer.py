@@ -0,0 +1,616 @@
+"""Set based import of the CI systems and product statuses from the seeds.
+
+The existing CI systems, rules and product statuses are loaded with a few
+queries and compared with the seeds in memory. Only the differences are
+written, by bulk inserts and `UPDATE ... WHERE id IN` statements inside
+one transaction, so the import time does not grow with a query per rule.
+
+The hash of the imported seeds and the hash of the state they left the CI
+systems, rules, products and product rules in are kept in
+`ImportSnapshot`. The same seeds are not imported again as long as that
+state was not changed since, by the admin for example.
+"""
+
+from __future__ import unicode_literals
+
+import copy
+import hashlib
+import json
+import logging
+
+from collections import defaultdict, OrderedDict
+
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from ci_dashboard import constants
+from ci_dashboard.models import CiSystem, ImportSnapshot, ProductCi, Rule
+
+LOGGER = logging.getLogger(__name__)
+
+CI_FIELDS = ('name', 'username', 'password', 'is_active', 'sticky_failure')
+
+PLAN_SECTIONS = (
+    ('cis', ('create', 'update', 'deactivate')),
+    ('rules', ('create', 'activate', 'deactivate')),
+    ('products', ('create', 'activate', 'deactivate')),
+    ('product_rules', ('add', 'remove')),
+)
+
+SNAPSHOT_MODELS = {
+    'cisystem': CiSystem,
+    'productci': ProductCi,
+}
+
+
+def seeds_hash(value):
+    """Hash of the value normalized to json with sorted keys."""
+    return hashlib.sha256(json.dumps(
+        value, sort_keys=True, cls=DjangoJSONEncoder
+    ).encode('utf-8')).hexdigest()
+
+
+def state_hash():
+    """Hash of the imported fields of the CI systems, rules and products
+    and of the product rules links.
+    """
+    return seeds_hash([
+        list(CiSystem.objects.order_by('id').values_list(
+            'id', 'url', *CI_FIELDS)),
+        list(Rule.objects.order_by('id').values_list(
+            'id', 'ci_system_id', 'name', 'rule_type', 'trigger_type',
+            'gerrit_refspec', 'gerrit_branch', 'is_active')),
+        list(ProductCi.objects.order_by('id').values_list(
+            'id', 'name', 'version', 'is_active')),
+        list(ProductCi.rules.through.objects.order_by('id').values_list(
+            'productci_id', 'rule_id')),
+    ])
+
+
+def unchanged_result(digest):
+    """Result of the latest import if it was done from the same seeds.
+
+    None when the seeds differ or the imported CI systems, rules, products
+    or product rules were changed since.
+    """
+    snapshot = ImportSnapshot.objects.last()
+    if snapshot is None or snapshot.seeds_hash != digest:
+        return None
+
+    if snapshot.state_hash != state_hash():
+        return None
+
+    result = snapshot.result_dict()
+    ids = defaultdict(set)
+    for model_name, pk in result['objects']:
+        ids[model_name].add(pk)
+
+    found = {}
+    for model_name, pks in ids.items():
+        for obj in SNAPSHOT_MODELS[model_name].objects.filter(
+            id__in=pks, is_active=True
+        ):
+            found[(model_name, obj.pk)] = obj
+
+    if len(found) != sum(len(pks) for pks in ids.values()):
+        return None
+
+    result['objects'] = [
+        found[(model_name, pk)] for model_name, pk in result['objects']
+    ]
+    result['unchanged'] = True
+
+    return result
+
+
+def empty_plan(errors=()):
+    """Import plan without changes, with the `errors` only."""
+    plan = {
+        section: {action: [] for action in actions}
+        for section, actions in PLAN_SECTIONS
+    }
+    plan['errors'] = list(errors)
+
+    return plan
+
+
+def import_changed(digest, cis, products, progress=None):
+    """Imports the seeds and keeps their snapshot for the next import."""
+    importer = SeedImporter()
+    result = importer.run(cis, products, progress)
+
+    if not importer.failed:
+        stored = dict(result, cis_total=len(cis), ps_total=len(products))
+        stored['objects'] = [
+            [obj._meta.model_name, obj.pk] for obj in result['objects']
+        ]
+
+        with transaction.atomic():
+            ImportSnapshot.objects.all().delete()
+            ImportSnapshot.objects.create(
+                seeds_hash=digest,
+                state_hash=state_hash(),
+                result=json.dumps(stored),
+            )
+
+    return result
+
+
+class SeedImporter(object):
+    """Imports the CI systems and products built from the seeds.
+
+    The result has the `objects`, `errors`, `cis_imported` and
+    `ps_imported` keys of `CiSystem.create_from_seeds` result.
+    """
+
+    def __init__(self):
+        self.cis = {ci.url: ci for ci in CiSystem.objects.all()}
+        self.previous_cis = {
+            url: tuple(getattr(ci, field) for field in CI_FIELDS)
+            for url, ci in self.cis.items()
+        }
+        self.active_urls = {
+            url for url, ci in self.cis.items() if ci.is_active
+        }
+        urls = {ci.pk: ci.url for ci in self.cis.values()}
+
+        self.rules = {
+            rule.index_key(urls[rule.ci_system_id]): rule
+            for rule in Rule.objects.all()
+        }
+        self.products = {
+            (product.name, product.version): product
+            for product in ProductCi.objects.all()
+        }
+        self.previous_products = {
+            key: product.is_active for key, product in self.products.items()
+        }
+
+        self.imported_cis = OrderedDict()
+        self.ci_rules = {}
+        self.imported_products = OrderedDict()
+        self.product_rules = {}
+
+        self.failed = False
+
+    def run(self, cis, products, progress=None):
+        """Imports the CI systems and products.
+
+        Every part of the seeds is compared with the loaded objects and only
+        the differences are written.
+        """
+        result, imported = self._diff(cis, products)
+        counters = {'cis_total': len(cis), 'ps_total': len(products)}
+
+        # the changes are written in one transaction, the progress is
+        # reported before it starts and once it is committed
+        if progress:
+            progress(dict(result, cis_processed=0, ps_processed=0, **counters))
+
+        try:
+            with transaction.atomic():
+                links = self._link_changes()
+                self._write_cis()
+                self._write_rules()
+                self._write_products()
+                self._write_links(links)
+        except IntegrityError as exc:
+            msg = 'Can not import the seeds. Error(s) occured: %s'
+            LOGGER.error(msg, exc)
+            result.update(objects=[], cis_imported=0, ps_imported=0)
+            result['errors'].append(msg % exc)
+            self.failed = True
+            return result
+
+        result['objects'] = [objects[key] for objects, key in imported]
+
+        if progress:
+            progress(dict(result, cis_processed=len(cis),
+                          ps_processed=len(products), **counters))
+
+        return result
+
+    def plan(self, cis, products):
+        """Changes the import of the CI systems and products would make.
+
+        The changes are computed from the objects loaded by the importer,
+        nothing is written.
+        """
+        result, _ = self._diff(cis, products)
+        new_cis, changed_cis, deactivated_cis = self._ci_changes()
+        new_rules, rules_active = self._rule_changes()
+        new_products, products_active = self._product_changes()
+        added_links, removed_links = self._link_changes()
+
+        return {
+            'cis': {
+                'create': [ci.url for ci in new_cis],
+                'update': [
+                    '{} ({})'.format(ci.url, ', '.join(fields))
+                    for ci, fields in changed_cis
+                ],
+                'deactivate': [ci.url for ci in deactivated_cis],
+            },
+            'rules': {
+                'create': [_rule_text(key) for key, rule in new_rules],
+                'activate': [_rule_text(key) for key in rules_active[True]],
+                'deactivate': [
+                    _rule_text(key) for key in rules_active[False]],
+            },
+            'products': {
+                'create': [_product_text(key) for key in new_products],
+                'activate': [
+                    _product_text(key) for key in products_active[True]],
+                'deactivate': [
+                    _product_text(key) for key in products_active[False]],
+            },
+            'product_rules': {
+                'add': [_link_text(link) for link in added_links],
+                'remove': [_link_text(link[:2]) for link in removed_links],
+            },
+            'errors': result['errors'],
+        }
+
+    def _diff(self, cis, products):
+        result = {
+            'objects': [],
+            'errors': [],
+            'cis_imported': 0,
+            'ps_imported': 0,
+        }
+        imported = []
+
+        for ci in cis:
+            url, error = self._diff_ci(ci)
+
+            if error:
+                result['errors'].append(error)
+            else:
+                imported.append((self.imported_cis, url))
+                result['cis_imported'] += 1
+
+        for product in products:
+            key, error = self._diff_product(product)
+
+            if error:
+                result['errors'].append(error)
+            else:
+                imported.append((self.imported_products, key))
+                result['ps_imported'] += 1
+
+        return result, imported
+
+    def _diff_ci(self, ci_dict):
+        ci_url = ci_dict.get('url')
+
+        try:
+            ci_url = ci_dict['url']
+            # the same url may be listed in the seeds more than once
+            ci = (copy.copy(self.cis[ci_url]) if ci_url in self.cis
+                  else CiSystem(url=ci_url))
+
+            ci.username = ci_dict.get('username', '')
+            ci.password = ci_dict.get('password', '')
+            ci.is_active = ci_dict.get('is_active', False)
+            ci.sticky_failure = ci_dict.get('sticky_failure', False)
+            ci.name = ci_dict.get('name', '')
+            # uniqueness is guaranteed by the urls map
+            ci.full_clean(validate_unique=False)
+        except ValidationError as exc:
+            msg = (
+                'Can not import CI: "%s" from the seeds file. '
+                'Error(s) occured: %s'
+            )
+            LOGGER.error(msg, ci_url, exc)
+            return None, msg % (ci_url, exc)
+        except KeyError as exc:
+            msg = (
+                'Can not import CI: "%s" from the seeds file. '
+                'Required parameter is missed: %s'
+            )
+            LOGGER.error(msg, ci_url, exc)
+            return None, msg % (ci_url, exc)
+
+        rules = OrderedDict()
+
+        for rule_dict in ci_dict.get('rules', []):
+            try:
+                key = Rule.seed_key(ci_url, rule_dict)
+                rule = self.rules.get(key)
+
+                if rule is None:
+                    rule = Rule(
+                        name=key[1],
+                        rule_type=key[2],
+                        trigger_type=key[3],
+                        gerrit_refspec=key[4],
+                        gerrit_branch=key[5],
+                    )
+                    rule.full_clean(
+                        exclude=['ci_system'], validate_unique=False)
+            except (ValidationError, KeyError) as exc:
+                msg = 'Can not create rule during CI import: %s'
+                LOGGER.error(msg, exc)
+                return None, msg % exc
+
+            rules[key] = (rule, rule_dict.get('is_active', False))
+
+        self.imported_cis[ci_url] = self.cis[ci_url] = ci
+        self.ci_rules[ci_url] = rules
+
+        return ci_url, None
+
+    def _diff_product(self, product_dict):
+        product_name = product_dict.get('name', '')
+        version = product_dict.get('version', '')
+
+        try:
+            if not product_name:
+                raise KeyError('name')
+
+            key = (product_name, version)
+            product = (copy.copy(self.products[key]) if key in self.products
+                       else ProductCi(name=product_name, version=version))
+            product.is_active = product_dict.get('is_active', False)
+            product.full_clean(validate_unique=False)
+        except ValidationError as exc:
+            msg = (
+                'Can not import ProductCi: "%s" from the seeds file. '
+                'Error(s) occured: %s'
+            )
+            LOGGER.error(msg, product_name, exc)
+            return None, msg % (product_name, exc)
+        except KeyError as exc:
+            msg = (
+                'Can not import ProductCi: "%s" from the seeds file. '
+                'Required parameter is missed: %s'
+            )
+            LOGGER.error(msg, product_name, exc)
+            return None, msg % (product_name, exc)
+
+        rule_keys = []
+
+        for rule_dict in product_dict.get('rules', []):
+            product_rule = self._product_rule_key(rule_dict)
+            if product_rule is None:
+                return None, 'Product Status {} has invalid rules.'.format(
+                    product_name
+                )
+
+            rule_keys.append(product_rule)
+
+        self.imported_products[key] = self.products[key] = product
+        self.product_rules[key] = rule_keys
+
+        return key, None
+
+    def _product_rule_key(self, rule_dict):
+        try:
+            url = rule_dict['url']
+            key = Rule.seed_key(url, rule_dict)
+        except KeyError as exc:
+            LOGGER.error(
+                'Rule for Product Status configure improperly: %s', exc)
+            return None
+
+        if url not in self.imported_cis and url not in self.active_urls:
+            LOGGER.error(
+                'Can not find CiSystem mentioned in rule '
+                'for Product Status during import: %s', url)
+            return None
+
+        if key not in self.ci_rules.get(url, {}) and key not in self.rules:
+            LOGGER.error(
+                'Can not find the rule for Product Status '
+                'during import: %s', key)
+            return None
+
+        return key
+
+    def _ci_changes(self):
+        new_cis, changed, deactivated = [], [], []
+
+        for url, ci in self.imported_cis.items():
+            if ci.pk is None:
+                new_cis.append(ci)
+                continue
+
+            fields = [
+                field
+                for field, previous in zip(CI_FIELDS, self.previous_cis[url])
+                if getattr(ci, field) != previous
+            ]
+            if fields:
+                changed.append((ci, fields))
+
+        for url in self.active_urls - set(self.imported_cis):
+            deactivated.append(self.cis[url])
+
+        return new_cis, changed, deactivated
+
+    def _write_cis(self):
+        now = timezone.now()
+        new_cis, changed, deactivated = self._ci_changes()
+        groups = defaultdict(list)
+
+        for ci, _ in changed:
+            groups[tuple(getattr(ci, field) for field in CI_FIELDS)].append(
+                ci.pk)
+
+        for values, ids in groups.items():
+            CiSystem.objects.filter(id__in=ids).update(
+                updated_at=now, **dict(zip(CI_FIELDS, values)))
+
+        _update_in(CiSystem, [ci.pk for ci in deactivated],
+                   is_active=False, updated_at=now)
+
+        if new_cis:
+            CiSystem.objects.bulk_create(new_cis)
+
+            # primary keys are not set by bulk_create
+            for ci in CiSystem.objects.filter(
+                url__in=[ci.url for ci in new_cis]
+            ):
+                self.imported_cis[ci.url] = self.cis[ci.url] = ci
+
+    def _rule_changes(self):
+        new_rules, active = [], {True: [], False: []}
+
+        for url, rules in self.ci_rules.items():
+            for key, (rule, is_active) in rules.items():
+                if rule.pk is None:
+                    new_rules.append((key, is_active))
+                elif rule.is_active != is_active:
+                    active[is_active].append(key)
+
+        # rules of the imported CIs which are missed in the seeds
+        for key, rule in self.rules.items():
+            if (rule.pk and rule.is_active and key[0] in self.ci_rules and
+                    key not in self.ci_rules[key[0]]):
+                active[False].append(key)
+
+        return new_rules, active
+
+    def _write_rules(self):
+        new_rules, active = self._rule_changes()
+
+        for is_active, keys in active.items():
+            _update_in(Rule, [self.rules[key].pk for key in keys],
+                       is_active=is_active)
+
+        if new_rules:
+            created = []
+            for key, is_active in new_rules:
+                rule = self.ci_rules[key[0]][key][0]
+                rule.ci_system_id = self.imported_cis[key[0]].pk
+                rule.is_active = is_active
+                created.append(rule)
+
+            Rule.objects.bulk_create(created)
+
+            urls = {ci.pk: url for url, ci in self.imported_cis.items()}
+            for rule in Rule.objects.filter(
+                ci_system_id__in={rule.ci_system_id for rule in created}
+            ):
+                key = rule.index_key(urls[rule.ci_system_id])
+                self.rules[key] = rule
+
+    def _product_changes(self):
+        new_products, active = [], {True: [], False: []}
+
+        for key, product in self.imported_products.items():
+            if product.pk is None:
+                new_products.append(key)
+            elif product.is_active != self.previous_products[key]:
+                active[product.is_active].append(key)
+
+        active[False].extend(
+            key
+            for key, is_active in self.previous_products.items()
+            if is_active and key not in self.imported_products
+        )
+
+        return new_products, active
+
+    def _write_products(self):
+        now = timezone.now()
+        new_products, active = self._product_changes()
+
+        for is_active, keys in active.items():
+            _update_in(ProductCi, [self.products[key].pk for key in keys],
+                       is_active=is_active, updated_at=now)
+
+        if new_products:
+            ProductCi.objects.bulk_create(
+                [self.imported_products[key] for key in new_products])
+
+            keys = set(new_products)
+            for product in ProductCi.objects.filter(
+                name__in={name for name, _ in keys}
+            ):
+                key = (product.name, product.version)
+                if key in keys:
+                    self.imported_products[key] = self.products[key] = product
+
+    def _link_changes(self):
+        """Product rules links to add and to remove, keyed by seeds keys.
+
+        The links to remove have the id of the link as the last item.
+        """
+        wanted = {
+            key: set(rule_keys)
+            for key, rule_keys in self.product_rules.items()
+        }
+        products = {
+            self.imported_products[key].pk: key
+            for key in wanted if self.imported_products[key].pk
+        }
+        rules = {rule.pk: key for key, rule in self.rules.items()}
+        removed = []
+
+        for pk, product_id, rule_id in ProductCi.rules.through.objects.filter(
+            productci_id__in=list(products)
+        ).values_list('id', 'productci_id', 'rule_id'):
+            key, rule_key = products[product_id], rules.get(rule_id)
+
+            if rule_key in wanted[key]:
+                wanted[key].remove(rule_key)
+            else:
+                removed.append((key, rule_key, pk))
+
+        added = [
+            (product_key, wanted_key)
+            for product_key, wanted_keys in wanted.items()
+            for wanted_key in wanted_keys
+        ]
+
+        return added, removed
+
+    def _write_links(self, links):
+        added, removed = links
+        through = ProductCi.rules.through
+
+        if removed:
+            through.objects.filter(
+                id__in=[pk for _, _, pk in removed]).delete()
+
+        if added:
+            through.objects.bulk_create([
+                through(
+                    productci_id=self.imported_products[key].pk,
+                    rule_id=self.rules[rule_key].pk,
+                )
+                for key, rule_key in added
+            ])
+
+
+def _rule_text(key):
+    url, name, rule_type, trigger_type, refspec, branch = key
+    text = '{} {} ({}, {})'.format(
+        url, name,
+        dict(constants.RULE_TYPE_CHOICES).get(rule_type, rule_type),
+        dict(constants.TRIGGER_TYPE_CHOICES).get(trigger_type, trigger_type),
+    )
+
+    if refspec or branch:
+        text += ' {}:{}'.format(refspec, branch)
+
+    return text
+
+
+def _product_text(key):
+    return ' '.join(part for part in key if part)
+
+
+def _link_text(link):
+    key, rule_key = link
+    return '{}: {}'.format(
+        _product_text(key),
+        _rule_text(rule_key) if rule_key else 'unknown rule')
+
+
+def _update_in(model, ids, **values):
+    if ids:
+        model.objects.filter(id__in=ids).update(**values)
@@ -0,0 +1,179 @@
+import time
+
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+
+from ci_dashboard.models import (
+    CiSystem, ProductCi, ProductCiStatus, Rule, RuleCheck, Status
+)
+
+BENCHMARK_URL = 'http://benchmark.invalid/{}/'
+BENCHMARK_PRODUCT = 'benchmark'
+BATCH_SIZE = 5000
+
+# The "latest row per parent" indexes of migration 0006.
+LATEST_ROW_INDEXES = (
+    (Status, ('ci_system', 'created_at', 'id')),
+    (RuleCheck, ('rule', 'created_at', 'id')),
+    (ProductCiStatus, ('product_ci', 'version', 'created_at', 'id')),
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure "latest row per parent" queries over the statuses history. '
+        'Use --without-indexes to compare the results with the plans '
+        'the database falls back to without the composite indexes.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--populate', type=int, default=0, metavar='ROWS',
+            help='Create ROWS synthetic statuses, rule checks and product '
+                 'statuses before the measurement')
+        parser.add_argument(
+            '--parents', type=int, default=50,
+            help='Number of CIs, rules and products to spread the rows over')
+        parser.add_argument(
+            '--repeat', type=int, default=20,
+            help='Number of times every query is measured')
+        parser.add_argument(
+            '--without-indexes', action='store_true',
+            help='Measure the queries once more with the composite '
+                 '"latest row" indexes dropped. The indexes are created '
+                 'again afterwards, run it on a copy of the database')
+        parser.add_argument(
+            '--cleanup', action='store_true',
+            help='Delete the synthetic history and exit')
+
+    def handle(self, *args, **options):
+        if options['cleanup']:
+            CiSystem.objects.filter(
+                url__startswith=BENCHMARK_URL.format('')).delete()
+            ProductCi.objects.filter(name=BENCHMARK_PRODUCT).delete()
+            return
+
+        if options['populate']:
+            self._populate(options['populate'], options['parents'])
+
+        ci = CiSystem.objects.filter(
+            url__startswith=BENCHMARK_URL.format('')).first()
+        rule = Rule.objects.filter(ci_system=ci).first()
+        product = ProductCi.objects.filter(name=BENCHMARK_PRODUCT).first()
+
+        if not (ci and rule and product):
+            self.stderr.write('There is no history to measure, '
+                              'use --populate to create it.')
+            return
+
+        self.stdout.write('Statuses: %s, rule checks: %s, product statuses: '
+                          '%s' % (Status.objects.count(),
+                                  RuleCheck.objects.count(),
+                                  ProductCiStatus.objects.count()))
+
+        queries = (
+            ('status_set.last()', ci.status_set.all()),
+            ('rulecheck_set.last()', rule.rulecheck_set.all()),
+            ('productcistatus_set.last()', product.productcistatus_set.all()),
+            ('productcistatus_set.filter(version).last()',
+             product.productcistatus_set.filter(version=product.version)),
+        )
+
+        self.stdout.write('\nWith the composite indexes:')
+        for name, queryset in queries:
+            self._measure(name, queryset, options['repeat'])
+
+        if options['without_indexes']:
+            with self._latest_row_indexes_dropped():
+                self.stdout.write('\nWithout the composite indexes:')
+                for name, queryset in queries:
+                    self._measure(name, queryset, options['repeat'])
+
+    @contextmanager
+    def _latest_row_indexes_dropped(self):
+        """Drops the indexes of ``LATEST_ROW_INDEXES`` for the block.
+
+        Only these indexes are touched, the migrations state and the rest
+        of the schema are left as they are.
+        """
+        with connection.schema_editor() as editor:
+            for model, index in LATEST_ROW_INDEXES:
+                together = model._meta.index_together
+                editor.alter_index_together(
+                    model, together, [i for i in together if i != index])
+        try:
+            yield
+        finally:
+            with connection.schema_editor() as editor:
+                for model, index in LATEST_ROW_INDEXES:
+                    together = model._meta.index_together
+                    editor.alter_index_together(
+                        model, [i for i in together if i != index], together)
+
+    def _measure(self, name, queryset, repeat):
+        latest = queryset.reverse()[:1]
+        sql, params = latest.query.sql_with_params()
+
+        started = time.time()
+        for _ in range(repeat):
+            list(latest.all())
+        elapsed = (time.time() - started) / repeat * 1000
+
+        self.stdout.write('\n%s: %.2f ms' % (name, elapsed))
+
+        explain = 'EXPLAIN QUERY PLAN ' if connection.vendor == 'sqlite' \
+            else 'EXPLAIN '
+        with connection.cursor() as cursor:
+            cursor.execute(explain + sql, params)
+            for row in cursor.fetchall():
+                self.stdout.write('  ' + ' '.join(map(str, row)))
+
+    def _populate(self, rows, parents):
+        start = CiSystem.objects.filter(
+            url__startswith=BENCHMARK_URL.format('')).count()
+
+        cis = [
+            CiSystem.objects.create(url=BENCHMARK_URL.format(start + number))
+            for number in range(parents)
+        ]
+        rules = [Rule.objects.create(name='benchmark', ci_system=ci)
+                 for ci in cis]
+        products = [
+            ProductCi.objects.create(
+                name=BENCHMARK_PRODUCT, version=str(start + number))
+            for number in range(parents)
+        ]
+
+        for offset in range(0, rows, BATCH_SIZE):
+            numbers = range(offset, min(offset + BATCH_SIZE, rows))
+
+            with transaction.atomic():
+                self._populate_batch(numbers, rows, cis, rules, products)
+
+            self.stdout.write('Created %s rows of each type' % len(numbers))
+
+    @staticmethod
+    def _populate_batch(numbers, rows, cis, rules, products):
+        now = timezone.now()
+        parents = len(cis)
+
+        Status.objects.bulk_create(
+            Status(ci_system=cis[n % parents], summary='benchmark',
+                   last_changed_at=now)
+            for n in numbers
+        )
+        RuleCheck.objects.bulk_create(
+            RuleCheck(rule=rules[n % parents], build_number=n,
+                      created_at=now - timedelta(seconds=rows - n))
+            for n in numbers
+        )
+        ProductCiStatus.objects.bulk_create(
+            ProductCiStatus(product_ci=products[n % parents],
+                            version=products[n % parents].version,
+                            summary='benchmark')
+            for n in numbers
+        )
@@ -0,0 +1,50 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ci_dashboard import export
+
+
+class Command(BaseCommand):
+    help = 'Export statuses, product statuses or rule checks history'
+
+    def add_arguments(self, parser):
+        parser.add_argument('source', choices=sorted(export.EXPORT_SOURCES))
+        parser.add_argument(
+            '--format', dest='export_format', default='ndjson',
+            choices=export.EXPORT_FORMATS)
+        parser.add_argument(
+            '--from', dest='date_from',
+            help='Export rows created since ISO 8601 timestamp or date')
+        parser.add_argument(
+            '--to', dest='date_to',
+            help='Export rows created before ISO 8601 timestamp or till '
+                 'the end of the date')
+        parser.add_argument(
+            '--gzip', action='store_true',
+            help='Compress the output with gzip')
+        parser.add_argument(
+            '--output', '-o',
+            help='File to write to, standard output by default')
+
+    def handle(self, *args, **options):
+        try:
+            stream = export.export(
+                options['source'],
+                export_format=options['export_format'],
+                date_from=options['date_from'],
+                date_to=options['date_to'],
+                compress=options['gzip'],
+            )
+        except ValueError as exc:
+            raise CommandError(exc)
+
+        output = open(options['output'], 'wb') if options['output'] else \
+            getattr(sys.stdout, 'buffer', sys.stdout)
+
+        try:
+            for data in stream:
+                output.write(data)
+        finally:
+            if options['output']:
+                output.close()
@@ -1,18 +1,113 @@
+import logging
 import os
+import time
 
 from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+
+from ci_dashboard import seed_loader
+from ci_dashboard.importer import PLAN_SECTIONS
 from ci_dashboard.models import CiSystem
 
+LOGGER = logging.getLogger(__name__)
+
 
 class Command(BaseCommand):
-    help = 'Import config from yaml file'
+    help = 'Import config from yaml files or directories of them'
 
     def add_arguments(self, parser):
-        parser.add_argument('config', nargs=1, type=str)
+        parser.add_argument('config', nargs='+', type=str)
+        parser.add_argument(
+            '--force', action='store_true',
+            help='Import the config even if it was not changed')
+        parser.add_argument(
+            '--plan', action='store_true',
+            help='Show the changes the import would make without them')
+        parser.add_argument(
+            '--watch', action='store_true',
+            help='Keep running and import the config when it is changed')
+        parser.add_argument(
+            '--interval', type=float, default=5,
+            help='Seconds between the checks of the config in watch mode')
 
     def handle(self, *args, **options):
-        config = options['config'][0]
-        if os.path.exists(config):
-            CiSystem.create_from_seed_file(config)
+        config = options['config']
+        for path in config:
+            if not os.path.exists(path):
+                raise CommandError("Config %s not found" % path)
+
+        if options['plan'] and options['watch']:
+            raise CommandError('--plan can not be used with --watch')
+
+        if options['plan']:
+            self._print_plan(
+                CiSystem.plan_from_seeds(CiSystem.parse_seeds_file(config)))
+        elif options['watch']:
+            self._watch(config, options['interval'], options['force'])
         else:
-            raise CommandError("Config %s not found" % config)
+            CiSystem.create_from_seed_file(config, force=options['force'])
+
+    def _watch(self, config, interval, force):
+        watcher = seed_loader.SeedsWatcher(config)
+        broken = set()
+        pending = None
+
+        try:
+            while True:
+                # the database may close the connection between the checks
+                close_old_connections()
+                seeds = watcher.poll()
+
+                if watcher.broken != broken:
+                    broken = set(watcher.broken)
+                    for path in sorted(broken):
+                        self.stderr.write(
+                            'Waiting for %s to be fixed' % path)
+
+                if seeds is not None:
+                    pending = seeds
+
+                if pending is not None:
+                    try:
+                        result = CiSystem.create_from_seeds(
+                            pending, force=force)
+                    except Exception:
+                        LOGGER.exception('Can not import the config')
+                        self.stderr.write(
+                            'Import failed, retrying in %s seconds' % interval)
+                    else:
+                        self._print_result(result)
+                        pending = None
+                        # only the first import is forced
+                        force = False
+
+                time.sleep(interval)
+        except KeyboardInterrupt:
+            pass
+
+    def _print_result(self, result):
+        if result.get('unchanged'):
+            self.stdout.write('The config is unchanged')
+        else:
+            self.stdout.write(
+                'Imported %s of %s CI systems and %s of %s product statuses'
+                % (result['cis_imported'], result['cis_total'],
+                   result['ps_imported'], result['ps_total']))
+
+        for error in result['errors']:
+            self.stderr.write('error: %s' % error)
+
+    def _print_plan(self, plan):
+        changes = 0
+
+        for section, actions in PLAN_SECTIONS:
+            for action in actions:
+                for item in plan[section][action]:
+                    self.stdout.write('%s %s: %s' % (action, section, item))
+                    changes += 1
+
+        for error in plan['errors']:
+            self.stderr.write('error: %s' % error)
+
+        if not changes:
+            self.stdout.write('No changes')
@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ci_dashboard', '0002_usertoken'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StatusEvent',
+            fields=[
+                ('id', models.AutoField(verbose_name='ID', serialize=False, auto_created=True, primary_key=True)),
+                ('event_type', models.CharField(max_length=20, choices=[(b'ci_status', b'CI Status'), (b'product_status', b'Product Status'), (b'rule_check', b'Rule Check')])),
+                ('object_id', models.IntegerField()),
+                ('data', models.TextField(default='{}')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ('id',),
+            },
+        ),
+    ]
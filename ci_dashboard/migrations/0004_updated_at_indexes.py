@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ci_dashboard', '0003_statusevent'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='productcistatus',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AlterField(
+            model_name='status',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AlterIndexTogether(
+            name='productcistatus',
+            index_together=set([('updated_at', 'id')]),
+        ),
+        migrations.AlterIndexTogether(
+            name='rulecheck',
+            index_together=set([('updated_at', 'id')]),
+        ),
+        migrations.AlterIndexTogether(
+            name='status',
+            index_together=set([('updated_at', 'id')]),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ci_dashboard', '0004_updated_at_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='usertoken',
+            name='token',
+            field=models.UUIDField(unique=True),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ci_dashboard', '0005_usertoken_unique_token'),
+    ]
+
+    operations = [
+        migrations.AlterIndexTogether(
+            name='productcistatus',
+            index_together=set([('updated_at', 'id'), ('product_ci', 'version', 'created_at', 'id')]),
+        ),
+        migrations.AlterIndexTogether(
+            name='rulecheck',
+            index_together=set([('updated_at', 'id'), ('rule', 'created_at', 'id')]),
+        ),
+        migrations.AlterIndexTogether(
+            name='status',
+            index_together=set([('updated_at', 'id'), ('ci_system', 'created_at', 'id')]),
+        ),
+    ]
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+def merge_rule_check_runs(apps, schema_editor):
+    """Merges consecutive copies of the same run into one rule check."""
+    RuleCheck = apps.get_model('ci_dashboard', 'RuleCheck')
+    Through = RuleCheck.status.through
+
+    RuleCheck.objects.update(last_seen=models.F('updated_at'))
+
+    def merge(run):
+        run_id, _, last_seen, copies = run
+        if not copies:
+            return
+
+        Through.objects.filter(
+            rulecheck_id__in=copies
+        ).update(rulecheck_id=run_id)
+        RuleCheck.objects.filter(id__in=copies).delete()
+        RuleCheck.objects.filter(id=run_id).update(last_seen=last_seen)
+
+    rule_ids = RuleCheck.objects.order_by().values_list(
+        'rule_id', flat=True).distinct()
+
+    for rule_id in list(rule_ids):
+        run = None
+        rows = RuleCheck.objects.filter(rule_id=rule_id).order_by(
+            'created_at', 'id'
+        ).values_list('id', 'status_type', 'build_number', 'last_seen')
+
+        for pk, status_type, build_number, last_seen in rows.iterator():
+            if run and run[1] == (status_type, build_number):
+                run[2] = max(run[2], last_seen)
+                run[3].append(pk)
+                continue
+
+            if run:
+                merge(run)
+            run = [pk, (status_type, build_number), last_seen, []]
+
+        if run:
+            merge(run)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ci_dashboard', '0006_latest_row_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='rulecheck',
+            name='last_seen',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.RunPython(
+            merge_rule_check_runs,
+            migrations.RunPython.noop,
+        ),
+    ]
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ci_dashboard', '0007_rulecheck_last_seen'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='stats',
+            name='value',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='DailyRollup',
+            fields=[
+                ('id', models.AutoField(verbose_name='ID', serialize=False, auto_created=True, primary_key=True)),
+                ('scope', models.CharField(max_length=20, choices=[(b'rule', b'Rule'), (b'ci_system', b'CI System'), (b'product_ci', b'Product Status')])),
+                ('object_id', models.IntegerField()),
+                ('version', models.CharField(default='', max_length=255, blank=True)),
+                ('day', models.DateField()),
+                ('total', models.IntegerField(default=0)),
+                ('succeeded', models.IntegerField(default=0)),
+                ('failed', models.IntegerField(default=0)),
+                ('recoveries', models.IntegerField(default=0)),
+                ('recovery_seconds', models.BigIntegerField(default=0)),
+                ('success_seconds', models.BigIntegerField(default=0)),
+                ('fail_seconds', models.BigIntegerField(default=0)),
+                ('skip_seconds', models.BigIntegerField(default=0)),
+                ('aborted_seconds', models.BigIntegerField(default=0)),
+                ('in_progress_seconds', models.BigIntegerField(default=0)),
+                ('error_seconds', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'ordering': ('day', 'id'),
+            },
+        ),
+        migrations.CreateModel(
+            name='RollupState',
+            fields=[
+                ('id', models.AutoField(verbose_name='ID', serialize=False, auto_created=True, primary_key=True)),
+                ('scope', models.CharField(max_length=20, choices=[(b'rule', b'Rule'), (b'ci_system', b'CI System'), (b'product_ci', b'Product Status')])),
+                ('object_id', models.IntegerField()),
+                ('version', models.CharField(default='', max_length=255, blank=True)),
+                ('status_type', models.IntegerField(choices=[(1, b'Success'), (2, b'Failed'), (4, b'Skipped'), (8, b'Aborted'), (16, b'In Progress'), (32, b'Error')])),
+                ('changed_at', models.DateTimeField()),
+                ('failing_since', models.DateTimeField(null=True, blank=True)),
+            ],
+        ),
+        migrations.AlterUniqueTogether(
+            name='dailyrollup',
+            unique_together=set([('scope', 'object_id', 'version', 'day')]),
+        ),
+        migrations.AlterIndexTogether(
+            name='dailyrollup',
+            index_together=set([('scope', 'day')]),
+        ),
+        migrations.AlterUniqueTogether(
+            name='rollupstate',
+            unique_together=set([('scope', 'object_id', 'version')]),
+        ),
+    ]
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+STATUS_SUCCESS = 1
+STATUS_FAIL = 2
+# the FLAKINESS_WINDOW default at the time of the migration
+FLAKINESS_WINDOW = 30
+
+
+def score_latest_builds(apps, schema_editor):
+    """Scores every rule by its latest stored builds."""
+    RuleCheck = apps.get_model('ci_dashboard', 'RuleCheck')
+    RuleFlakiness = apps.get_model('ci_dashboard', 'RuleFlakiness')
+
+    rule_ids = RuleCheck.objects.order_by().values_list(
+        'rule_id', flat=True).distinct()
+
+    for rule_id in list(rule_ids):
+        outcomes, size, last_build_number = 0, 0, None
+
+        for build_number, status_type in RuleCheck.objects.filter(
+            rule_id=rule_id,
+            status_type__in=(STATUS_SUCCESS, STATUS_FAIL),
+        ).order_by('-id').values_list('build_number', 'status_type'):
+            if build_number == last_build_number:
+                continue  # older result of the same build
+            if last_build_number is None:
+                last_build_number = build_number
+            outcomes |= int(status_type == STATUS_FAIL) << size
+            size += 1
+            if size == FLAKINESS_WINDOW:
+                break
+
+        if not size:
+            continue
+
+        flips = bin((outcomes ^ outcomes >> 1) & ((1 << (size - 1)) - 1))
+        RuleFlakiness.objects.create(
+            rule_id=rule_id,
+            outcomes=outcomes,
+            size=size,
+            last_build_number=last_build_number,
+            score=float(flips.count('1')) / (size - 1) if size > 1 else 0,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ci_dashboard', '0008_daily_rollups'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RuleFlakiness',
+            fields=[
+                ('id', models.AutoField(verbose_name='ID', serialize=False, auto_created=True, primary_key=True)),
+                ('outcomes', models.BigIntegerField(default=0)),
+                ('size', models.IntegerField(default=0)),
+                ('last_build_number', models.IntegerField(default=0)),
+                ('score', models.FloatField(default=0, db_index=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('rule', models.OneToOneField(related_name='flakiness', to='ci_dashboard.Rule', on_delete=django.db.models.deletion.CASCADE)),
+            ],
+        ),
+        migrations.RunPython(
+            score_latest_builds,
+            migrations.RunPython.noop,
+        ),
+    ]
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def build_transitions(apps, schema_editor):
+    """Builds the intervals of every CI and product version from history."""
+    StatusTransition = apps.get_model('ci_dashboard', 'StatusTransition')
+    sources = (
+        (apps.get_model('ci_dashboard', 'Status'), ('ci_system_id',)),
+        (apps.get_model('ci_dashboard', 'ProductCiStatus'),
+         ('product_ci_id', 'version')),
+    )
+
+    for model, parent_fields in sources:
+        current = {}
+
+        for row in model.objects.order_by('created_at', 'id').values_list(
+            'status_type', 'created_at', *parent_fields
+        ).iterator():
+            status_type, created_at, parent = row[0], row[1], row[2:]
+            transition = current.get(parent)
+
+            if transition and transition.status_type == status_type:
+                continue
+
+            if transition:
+                transition.ended_at = created_at
+                transition.save()
+
+            current[parent] = StatusTransition.objects.create(
+                status_type=status_type,
+                started_at=created_at,
+                **dict(zip(parent_fields, parent))
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ci_dashboard', '0009_ruleflakiness'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StatusTransition',
+            fields=[
+                ('id', models.AutoField(verbose_name='ID', serialize=False, auto_created=True, primary_key=True)),
+                ('version', models.CharField(default='', max_length=255, blank=True)),
+                ('status_type', models.IntegerField(choices=[(1, b'Success'), (2, b'Failed'), (4, b'Skipped'), (8, b'Aborted'), (16, b'In Progress'), (32, b'Error')])),
+                ('started_at', models.DateTimeField()),
+                ('ended_at', models.DateTimeField(null=True, blank=True)),
+                ('ci_system', models.ForeignKey(blank=True, to='ci_dashboard.CiSystem', null=True, on_delete=django.db.models.deletion.CASCADE)),
+                ('product_ci', models.ForeignKey(blank=True, to='ci_dashboard.ProductCi', null=True, on_delete=django.db.models.deletion.CASCADE)),
+            ],
+            options={
+                'ordering': ('started_at', 'id'),
+            },
+        ),
+        migrations.RunPython(
+            build_transitions,
+            migrations.RunPython.noop,
+        ),
+    ]
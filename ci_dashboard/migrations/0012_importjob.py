@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.db.models.deletion
+from django.conf import settings
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('ci_dashboard', '0011_webhook'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportJob',
+            fields=[
+                ('id', models.AutoField(verbose_name='ID', serialize=False, auto_created=True, primary_key=True)),
+                ('seeds', models.TextField()),
+                ('state', models.CharField(default=b'pending', max_length=20, choices=[(b'pending', b'Pending'), (b'running', b'Running'), (b'done', b'Done'), (b'failed', b'Failed')])),
+                ('cis_total', models.IntegerField(default=0)),
+                ('cis_processed', models.IntegerField(default=0)),
+                ('cis_imported', models.IntegerField(default=0)),
+                ('ps_total', models.IntegerField(default=0)),
+                ('ps_processed', models.IntegerField(default=0)),
+                ('ps_imported', models.IntegerField(default=0)),
+                ('errors', models.TextField(default='', blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('finished_at', models.DateTimeField(null=True, blank=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.SET_NULL, blank=True, to=settings.AUTH_USER_MODEL, null=True)),
+            ],
+        ),
+    ]
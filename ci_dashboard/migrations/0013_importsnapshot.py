@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ci_dashboard', '0012_importjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportSnapshot',
+            fields=[
+                ('id', models.AutoField(verbose_name='ID', serialize=False, auto_created=True, primary_key=True)),
+                ('seeds_hash', models.CharField(max_length=64)),
+                ('sections', models.TextField(default='{}')),
+                ('result', models.TextField(default='{}')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='importjob',
+            name='unchanged',
+            field=models.BooleanField(default=False),
+        ),
+    ]
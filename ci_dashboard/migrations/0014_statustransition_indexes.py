@@ -0,0 +1,18 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ci_dashboard', '0013_importsnapshot'),
+    ]
+
+    operations = [
+        migrations.AlterIndexTogether(
+            name='statustransition',
+            index_together=set([('ci_system', 'ended_at'), ('product_ci', 'version', 'ended_at')]),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ci_dashboard', '0014_statustransition_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='importsnapshot',
+            name='sections',
+        ),
+        migrations.AddField(
+            model_name='importsnapshot',
+            name='state_hash',
+            field=models.CharField(default='', max_length=64),
+        ),
+    ]
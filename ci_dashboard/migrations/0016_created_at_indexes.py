@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ci_dashboard', '0015_importsnapshot_state_hash'),
+    ]
+
+    operations = [
+        migrations.AlterIndexTogether(
+            name='productcistatus',
+            index_together=set([('updated_at', 'id'), ('created_at', 'id'), ('product_ci', 'version', 'created_at', 'id')]),
+        ),
+        migrations.AlterIndexTogether(
+            name='rulecheck',
+            index_together=set([('updated_at', 'id'), ('created_at', 'id'), ('rule', 'created_at', 'id')]),
+        ),
+        migrations.AlterIndexTogether(
+            name='status',
+            index_together=set([('updated_at', 'id'), ('created_at', 'id'), ('ci_system', 'created_at', 'id')]),
+        ),
+    ]
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import calendar
+
+from django.db import migrations, models
+
+
+def convert_watermarks(apps, schema_editor):
+    """Turns the id watermarks into `created_at` ones.
+
+    The latest processed row of every object is looked up by its
+    `created_at`, so the rows read again in the overlap window are skipped.
+    """
+    Stats = apps.get_model('ci_dashboard', 'Stats')
+    RollupState = apps.get_model('ci_dashboard', 'RollupState')
+    sources = (
+        ('rule', apps.get_model('ci_dashboard', 'RuleCheck'), ('rule_id',)),
+        ('ci_system', apps.get_model('ci_dashboard', 'Status'),
+         ('ci_system_id',)),
+        ('product_ci', apps.get_model('ci_dashboard', 'ProductCiStatus'),
+         ('product_ci_id', 'version')),
+    )
+
+    for scope, model, parent_fields in sources:
+        watermark = Stats.objects.filter(name='rollups:' + scope).first()
+        if watermark is None or not watermark.value:
+            continue
+
+        last_id = watermark.value
+        latest = model.objects.filter(id__lte=last_id).order_by('-id').first()
+        watermark.value = (
+            calendar.timegm(latest.created_at.utctimetuple()) if latest else 0)
+        watermark.save()
+
+        for state in RollupState.objects.filter(scope=scope):
+            parent = (state.object_id, state.version)[:len(parent_fields)]
+            state.row_id = model.objects.filter(
+                id__lte=last_id,
+                created_at=state.changed_at,
+                **dict(zip(parent_fields, parent))
+            ).aggregate(row_id=models.Max('id'))['row_id'] or 0
+            state.save()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ci_dashboard', '0016_created_at_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='rollupstate',
+            name='row_id',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(
+            convert_watermarks,
+            migrations.RunPython.noop,
+        ),
+    ]
@@ -1,16 +1,21 @@
 from __future__ import unicode_literals
 
-import jsonschema
 import logging
 import yaml
 import uuid
 
+from collections import OrderedDict
 from django.conf import settings
 from django.contrib.auth.models import User
+from django.contrib.auth.signals import user_logged_in
+from django.core.cache import cache
 from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
 from django.core.urlresolvers import reverse
-from django.db import models, IntegrityError
-from django.db.models.signals import pre_delete, pre_save
+from django.db import models, transaction
+from django.db.models.signals import (
+    m2m_changed, post_delete, post_save, pre_save
+)
 from django.utils import timezone
 from django.utils.functional import cached_property
 from django.utils.timesince import timesince
@@ -20,22 +25,53 @@ from jenkins import Jenkins, JenkinsException
 import json
 
 from jenkins import NotFoundException
+import six
 from six.moves.urllib.request import Request
 
-from ci_dashboard import constants
+from ci_dashboard import constants, permissions, schema, seed_loader
+from ci_dashboard.cache import LocalCache
 
 LOGGER = logging.getLogger(__name__)
 
 
 class Stats(models.Model):
     name = models.CharField(max_length=255, unique=True)
+    value = models.BigIntegerField(default=0)
     updated_at = models.DateTimeField(auto_now=True)
 
 
+LAST_SYNC_CACHE_KEY = 'ci_dashboard:last_sync'
+LAST_SYNC_LOCAL_CACHE = LocalCache(settings.LAST_SYNC_LOCAL_CACHE_TIMEOUT)
+
+
 def update_last_sync_timestamp():
     last_sync, created = Stats.objects.get_or_create(name='last_sync')
     last_sync.save()
 
+    cache.set(LAST_SYNC_CACHE_KEY, last_sync.updated_at,
+              settings.LAST_SYNC_CACHE_TIMEOUT)
+    LAST_SYNC_LOCAL_CACHE.set(LAST_SYNC_CACHE_KEY, last_sync.updated_at)
+
+
+def last_sync_timestamp():
+    """The time of the latest sync, kept in the memory of every process
+    and in the Django cache before it is read from the database.
+    """
+    timestamp = LAST_SYNC_LOCAL_CACHE.get(LAST_SYNC_CACHE_KEY)
+
+    if timestamp is None:
+        timestamp = cache.get(LAST_SYNC_CACHE_KEY)
+
+        if timestamp is None:
+            last_sync, created = Stats.objects.get_or_create(name='last_sync')
+            timestamp = last_sync.updated_at
+            cache.set(LAST_SYNC_CACHE_KEY, timestamp,
+                      settings.LAST_SYNC_CACHE_TIMEOUT)
+
+        LAST_SYNC_LOCAL_CACHE.set(LAST_SYNC_CACHE_KEY, timestamp)
+
+    return timestamp
+
 
 class AbstractStatus(models.Model):
 
@@ -54,12 +90,16 @@ class AbstractStatus(models.Model):
     )
 
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(default=timezone.now)
+    updated_at = models.DateTimeField(auto_now=True)
     last_changed_at = models.DateTimeField(default=timezone.now)
 
     class Meta:
         abstract = True
         ordering = ('created_at', 'id')
+        index_together = (
+            ('updated_at', 'id'),
+            ('created_at', 'id'),
+        )
 
     def __unicode__(self):
         return self.text_for_type(self.status_type)
@@ -91,11 +131,38 @@ class AbstractStatus(models.Model):
 
         return author
 
+    @classmethod
+    def history_changed(cls, statuses):
+        """Updates the timelines after statuses were edited or deleted.
+
+        The timeline of every owner is rebuilt since its earliest changed
+        status and its current status is published again, so the live
+        dashboards do not keep showing a deleted or outdated one.
+        """
+        earliest = {}
+        for status in statuses:
+            parent = tuple(sorted(StatusTransition._parent(status).items()))
+            if (parent not in earliest or
+                    status.created_at < earliest[parent].created_at):
+                earliest[parent] = status
+
+        for parent, status in earliest.items():
+            StatusTransition.rebuild(status)
+
+            current = cls.objects.filter(**dict(parent)).last()
+            if current:
+                current.publish_event()
+
 
 class Status(AbstractStatus):
 
     ci_system = models.ForeignKey('CiSystem', on_delete=models.CASCADE)
 
+    class Meta(AbstractStatus.Meta):
+        index_together = AbstractStatus.Meta.index_together + (
+            ('ci_system', 'created_at', 'id'),
+        )
+
     def __unicode__(self):
         return '{status} (ci: "{ci}")'.format(
             status=super(Status, self).__unicode__(),
@@ -110,11 +177,166 @@ class Status(AbstractStatus):
     def failed_rule_checks(self):
         return self.rule_checks().filter(status_type=constants.STATUS_FAIL)
 
+    @classmethod
+    def latest_with_rule_checks_counts(cls, ci_systems):
+        """Latest status of every CI with its rule checks counted.
+
+        Counts are available as `rule_checks_count` and
+        `failed_rule_checks_count` attributes. Statuses are created in
+        order, so the latest one is the one with the greatest id.
+        """
+        latest_ids = cls.objects.filter(
+            ci_system__in=ci_systems
+        ).order_by().values('ci_system').annotate(
+            latest_id=models.Max('id')
+        ).values_list('latest_id', flat=True)
+
+        return cls.objects.filter(
+            id__in=list(latest_ids)
+        ).select_related(
+            'ci_system', 'user'
+        ).annotate(
+            rule_checks_count=models.Count('rulecheck'),
+            failed_rule_checks_count=models.Sum(
+                models.Case(
+                    models.When(
+                        rulecheck__status_type=constants.STATUS_FAIL,
+                        then=1
+                    ),
+                    default=0,
+                    output_field=models.IntegerField()
+                )
+            ),
+        ).order_by('ci_system__url')
+
+    def publish_event(self):
+        return StatusEvent.publish_ci_status(self)
+
+    def delete(self, *args, **kwargs):
+        rule_check_ids = list(self.rulecheck_set.values_list('id', flat=True))
+        super(Status, self).delete(*args, **kwargs)
+        RuleCheck.delete_orphans(rule_check_ids)
+
+    @classmethod
+    def delete_with_rule_checks(cls, ids):
+        """Deletes statuses and the rule checks no other status uses."""
+        rule_check_ids = list(
+            RuleCheck.status.through.objects.filter(
+                status_id__in=ids
+            ).values_list('rulecheck_id', flat=True).distinct()
+        )
+        cls.objects.filter(id__in=ids).delete()
+        RuleCheck.delete_orphans(rule_check_ids)
+
     @staticmethod
-    def delele_unused_rulechecks(sender, instance, **kwargs):
-        for rule_check in instance.rule_checks():
-            if rule_check.status.count() == 1:
-                rule_check.delete()
+    def type_by_name(text):
+        return next(
+            (status_type
+             for status_type, name
+             in constants.STATUS_TYPE_CHOICES
+             if name.lower() == text.lower()),
+            None
+        )
+
+    @classmethod
+    def create_manual(cls, records, user):
+        """Creates the manual statuses of the batch of records.
+
+        The records are validated together and nothing is created when
+        some of them are invalid. The statuses are written with one
+        insert, their timeline intervals and events once for the batch.
+        Returns the created statuses and the errors of the records.
+        """
+        statuses, errors = cls._manual_statuses(records, user)
+        if errors:
+            return [], errors
+
+        ci_ids = sorted({status.ci_system_id for status in statuses})
+
+        with transaction.atomic():
+            # concurrent batches for the same CI systems wait for this one
+            list(CiSystem.objects.select_for_update().filter(
+                id__in=ci_ids).values_list('id', flat=True))
+
+            last_id = cls.objects.aggregate(
+                last_id=models.Max('id'))['last_id'] or 0
+            cls.objects.bulk_create(statuses)
+
+            # primary keys are not set by bulk_create
+            statuses = list(cls.objects.filter(
+                id__gt=last_id,
+                ci_system_id__in=ci_ids,
+                is_manual=True,
+                user=user,
+                last_changed_at=statuses[0].last_changed_at,
+            ).select_related('user').order_by('id'))
+
+            StatusTransition.record_ci_statuses(statuses)
+            StatusEvent.publish_manual_statuses(statuses)
+
+        return statuses, []
+
+    @classmethod
+    def _manual_statuses(cls, records, user):
+        now = timezone.now()
+        statuses, errors = [], []
+
+        for position, record in enumerate(records):
+            status, error = cls._manual_status(record, user, now)
+
+            if error:
+                errors.append((position, error))
+            else:
+                statuses.append((position, status))
+
+        known_cis = set(CiSystem.objects.filter(
+            id__in={status.ci_system_id for _, status in statuses}
+        ).values_list('id', flat=True))
+
+        for position, status in statuses:
+            if status.ci_system_id not in known_cis:
+                errors.append((position, 'CI system {} not found.'.format(
+                    status.ci_system_id)))
+
+        return [valid for _, valid in statuses], [
+            'Status #{}: {}'.format(failed_position, message)
+            for failed_position, message in sorted(errors)
+        ]
+
+    @classmethod
+    def _manual_status(cls, record, user, now):
+        if not isinstance(record, dict):
+            return None, 'the status should be an object.'
+
+        ci_id = record.get('ci_system')
+        if (isinstance(ci_id, bool) or
+                not isinstance(ci_id, six.integer_types)):
+            return None, 'ci_system should be the id of the CI system.'
+
+        status_type = record.get('status_type')
+        if isinstance(status_type, six.string_types):
+            status_type = cls.type_by_name(status_type)
+
+        status = cls(
+            ci_system_id=ci_id,
+            status_type=status_type,
+            summary=record.get('summary', ''),
+            description=record.get('description', ''),
+            is_manual=True,
+            user=user,
+            last_changed_at=now,
+        )
+
+        try:
+            # the CI systems are checked for the whole batch at once
+            status.full_clean(exclude=['ci_system', 'user'])
+        except ValidationError as exc:
+            return None, ' '.join(
+                '{}: {}'.format(field, ' '.join(messages))
+                for field, messages in sorted(exc.message_dict.items())
+            )
+
+        return status, None
 
     @staticmethod
     def get_type_by_check_results(rule_checks_mask):
@@ -199,6 +421,25 @@ class Rule(models.Model):
             0
         )
 
+    @staticmethod
+    def seed_key(url, rule_dict):
+        """Identity of the rule in the seeds, follows the unique fields."""
+        return (
+            url,
+            rule_dict['name'],
+            Rule.type_by_name(
+                rule_dict.get('rule_type', constants.DEFAULT_RULE_TYPE)),
+            Rule.trigger_type_by_name(
+                rule_dict.get('trigger_type', constants.DEFAULT_TRIGGER_TYPE)),
+            rule_dict.get('gerrit_refspec', ''),
+            rule_dict.get('gerrit_branch', ''),
+        )
+
+    def index_key(self, url):
+        """`seed_key` of the rule for the url of its CI system."""
+        return (url, self.name, self.rule_type, self.trigger_type,
+                self.gerrit_refspec, self.gerrit_branch)
+
     @staticmethod
     def status_by_jenkins_text(text):
         return constants.JENKINS_STATUSES.get(
@@ -421,7 +662,10 @@ class RuleCheck(models.Model):
     last_successfull_build_link = models.URLField(blank=True, default='')
     last_failed_build_link = models.URLField(blank=True, default='')
 
+    # the check is stored once per run, `created_at` is the moment the run
+    # was seen first and `last_seen` is the latest sync that still saw it
     created_at = models.DateTimeField(default=timezone.now)
+    last_seen = models.DateTimeField(default=timezone.now)
     updated_at = models.DateTimeField(auto_now=True)
 
     def __eq__(self, other):
@@ -435,6 +679,11 @@ class RuleCheck(models.Model):
 
     class Meta:
         ordering = ('created_at', 'id')
+        index_together = (
+            ('updated_at', 'id'),
+            ('created_at', 'id'),
+            ('rule', 'created_at', 'id'),
+        )
 
     def __unicode__(self):
         text = '{status} (ci: "{ci}", rule: "{rule}")'
@@ -455,6 +704,32 @@ class RuleCheck(models.Model):
             constants.STATUS_ERROR
         )
 
+    def extend(self, rule_check):
+        """Extends the run by the later check of the same build."""
+        for field in ('running', 'queued', 'is_running_now',
+                      'last_successfull_build_link', 'last_failed_build_link'):
+            setattr(self, field, getattr(rule_check, field))
+
+        return self
+
+    @classmethod
+    def active_at(cls, moment, rules=None):
+        """Rule checks which were the latest ones of their rules at moment."""
+        queryset = cls.objects.filter(created_at__lte=moment)
+
+        if rules is not None:
+            queryset = queryset.filter(rule__in=rules)
+
+        return cls.objects.filter(
+            id__in=queryset.order_by().values('rule').annotate(
+                latest_id=models.Max('id')
+            ).values('latest_id')
+        ).select_related('rule')
+
+    @classmethod
+    def delete_orphans(cls, ids):
+        cls.objects.filter(id__in=ids, status__isnull=True).delete()
+
     def link_to_ci(self):
         rule = self.rule
 
@@ -463,6 +738,123 @@ class RuleCheck(models.Model):
                 rule.name)
 
 
+class RuleFlakiness(models.Model):
+    """Outcomes of the latest builds of a rule and their flip rate.
+
+    `outcomes` is a bit mask of the latest `size` builds: the lowest bit
+    is the latest build and set bits are failures. The score is the share
+    of consecutive builds with different outcomes.
+    """
+
+    rule = models.OneToOneField(Rule, on_delete=models.CASCADE,
+                                related_name='flakiness')
+    outcomes = models.BigIntegerField(default=0)
+    size = models.IntegerField(default=0)
+    last_build_number = models.IntegerField(default=0)
+    score = models.FloatField(default=0, db_index=True)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __unicode__(self):
+        return '{rule}: {score:.2f}'.format(rule=self.rule.name,
+                                            score=self.score)
+
+    @property
+    def failures(self):
+        return bin(self.outcomes).count('1')
+
+    def record(self, build_number, failed):
+        if self.size and build_number < self.last_build_number:
+            return False
+
+        window = settings.FLAKINESS_WINDOW
+
+        if self.size and build_number == self.last_build_number:
+            # the same build finished with another result
+            self.outcomes = (self.outcomes & ~1) | int(failed)
+        else:
+            self.outcomes = (
+                (self.outcomes << 1 | int(failed)) & ((1 << window) - 1))
+            self.size = min(self.size + 1, window)
+
+        self.last_build_number = build_number
+
+        pairs_mask = (1 << (self.size - 1)) - 1
+        flips = bin((self.outcomes ^ self.outcomes >> 1) & pairs_mask)
+        self.score = (
+            float(flips.count('1')) / (self.size - 1) if self.size > 1 else 0)
+
+        return True
+
+    @classmethod
+    def record_check(cls, rule_check):
+        if rule_check.status_type not in (constants.STATUS_SUCCESS,
+                                          constants.STATUS_FAIL):
+            return
+
+        flakiness, _ = cls.objects.get_or_create(rule_id=rule_check.rule_id)
+
+        if flakiness.record(
+            rule_check.build_number,
+            rule_check.status_type == constants.STATUS_FAIL
+        ):
+            flakiness.save()
+
+    @classmethod
+    def _top(cls, rule_groups, limit):
+        """The flakiest active rules of every group of rules."""
+        result = OrderedDict((key, []) for key in rule_groups)
+        groups_by_rule = {}
+
+        for key, rule_ids in rule_groups.items():
+            for rule_id in rule_ids:
+                groups_by_rule.setdefault(rule_id, []).append(key)
+
+        if not groups_by_rule:
+            return result
+
+        for flakiness in cls.objects.filter(
+            rule__in=list(groups_by_rule),
+            rule__is_active=True,
+            score__gt=0,
+        ).select_related('rule').order_by('-score', 'rule__name'):
+            for key in groups_by_rule[flakiness.rule_id]:
+                if len(result[key]) < limit:
+                    result[key].append(flakiness)
+
+        return result
+
+    @classmethod
+    def top_by_ci(cls, ci_systems, limit):
+        rule_groups = OrderedDict((ci.pk, []) for ci in ci_systems)
+
+        for rule_id, ci_id in Rule.objects.filter(
+            ci_system__in=list(rule_groups)
+        ).values_list('id', 'ci_system_id'):
+            rule_groups[ci_id].append(rule_id)
+
+        return cls._top(rule_groups, limit)
+
+    @classmethod
+    def top_by_product(cls, product_cis, limit):
+        rule_groups = OrderedDict((pci.pk, []) for pci in product_cis)
+
+        for rule_id, pci_id in ProductCi.rules.through.objects.filter(
+            productci__in=list(rule_groups)
+        ).values_list('rule_id', 'productci_id'):
+            rule_groups[pci_id].append(rule_id)
+
+        return cls._top(rule_groups, limit)
+
+
+def _importer():
+    # the importer works with the models defined here, so it is imported
+    # once they are
+    from ci_dashboard import importer
+
+    return importer
+
+
 class CiSystem(models.Model):
 
     url = models.URLField(unique=True)
@@ -499,11 +891,15 @@ class CiSystem(models.Model):
         return new_results
 
     def _set_skipped_status(self):
-        return self.status_set.create(
+        status = self.status_set.create(
             status_type=constants.STATUS_SKIP,
             summary='No rules configured or all of them are invalid.',
             last_changed_at=timezone.now(),
         )
+        StatusTransition.record(status)
+        StatusEvent.publish_ci_status(status)
+
+        return status
 
     def _get_status_type_for_results(self, statuses_types_list):
         # TODO: move checks severity to settings
@@ -548,6 +944,7 @@ class CiSystem(models.Model):
     def check_the_status(self):
         previous_status = self.latest_status()
         new_results = self._new_rulechecks_results()
+        old_results = {}
 
         # find previous status and its rule_checks to make sure that
         # theirs build_numbers are not the same
@@ -558,6 +955,11 @@ class CiSystem(models.Model):
             }
 
             if new_results == old_results:
+                # update() skips auto_now, the changes feed reads updated_at
+                now = timezone.now()
+                RuleCheck.objects.filter(
+                    id__in=[rc.id for rc in old_results.values()]
+                ).update(last_seen=now, updated_at=now)
                 return previous_status
 
         # in case all job checks are failed skip the status as wrong configured
@@ -586,9 +988,26 @@ class CiSystem(models.Model):
         )
 
         for rule_check in new_results:
+            previous_check = old_results.get(rule_check.rule.unique_name)
+
+            # the same run is still the latest one, extend its interval
+            # instead of storing a copy of it
+            if rule_check.pk is None and rule_check == previous_check:
+                rule_check = previous_check.extend(rule_check)
+
+            is_new = rule_check.pk is None
+            rule_check.last_seen = (
+                rule_check.created_at if is_new else timezone.now())
             rule_check.save()
             rule_check.status.add(status)
 
+            if is_new:
+                RuleFlakiness.record_check(rule_check)
+                StatusEvent.publish_rule_check(rule_check)
+
+        StatusTransition.record(status)
+        StatusEvent.publish_ci_status(status)
+
         return status
 
     @cached_property
@@ -620,11 +1039,16 @@ class CiSystem(models.Model):
 
     @staticmethod
     def parse_seeds_file(file_path):
+        """Merged seeds of the file, the directory or the list of them."""
         result = None
+        paths = (
+            [file_path] if isinstance(file_path, six.string_types)
+            else file_path
+        )
 
         try:
-            result = yaml.safe_load(open(file_path))
-        except IOError as exc:
+            result = seed_loader.load_files(paths)
+        except (IOError, OSError) as exc:
             LOGGER.exception(
                 'The file %s could not be found or read: %s',
                 file_path, exc
@@ -637,87 +1061,43 @@ class CiSystem(models.Model):
 
         return result
 
-    @classmethod
-    def create_rule_for_ci(cls, rules_list, ci):
-        created = False
-        result = []
-        new_rules = set()
-        previous_rules = set(
-            ci.rule_set.filter(is_active=True).values_list('id', flat=True)
-        )
-
-        for rule_dict in rules_list:
-            try:
-                rule, created = Rule.objects.get_or_create(
-                    name=rule_dict['name'],
-                    ci_system=ci,
-                    rule_type=Rule.type_by_name(
-                        rule_dict.get(
-                            'rule_type',
-                            constants.DEFAULT_RULE_TYPE
-                        )
-                    ),
-                    trigger_type=Rule.trigger_type_by_name(
-                        rule_dict.get(
-                            'trigger_type',
-                            constants.DEFAULT_TRIGGER_TYPE
-                        )
-                    ),
-                    gerrit_refspec=rule_dict.get('gerrit_refspec', ''),
-                    gerrit_branch=rule_dict.get('gerrit_branch', ''),
-                )
-
-                rule.is_active = rule_dict.get('is_active', False)
-                rule.full_clean()
-                result.append(rule)
-            except (IntegrityError, ValidationError, KeyError) as exc:
-                msg = 'Can not create rule during CI import: %s'
-                LOGGER.error(msg, exc)
-
-                if created:
-                    rule.delete()
-
-                return [], msg % exc
-
-        for rule in result:
-            rule.save()
-            new_rules.add(rule.id)
-
-        if previous_rules:
-            cls.deactivate_previous_rules(previous_rules, new_rules)
-
-        return result, None
-
-    @classmethod
-    def deactivate_previous_rules(cls, previous_rules, new_rules):
-        for rule_id in previous_rules - new_rules:
-            try:
-                rule = Rule.objects.get(id=rule_id)
-                rule.is_active = False
-                rule.save()
-            except Rule.DoesNotExist as exc:
-                LOGGER.error(
-                    'Can not deactivate unexistent rule during import: %s',
-                    exc)
-
     @staticmethod
     def parse_seeds_from_stream(stream):
+        """Merged seeds of the stream or of the list of streams."""
         result = None
+        streams = stream if isinstance(stream, list) else [stream]
 
         try:
-            result = yaml.safe_load(stream)
+            result = seed_loader.load_streams(streams)
         except yaml.YAMLError:
             LOGGER.exception('The file stream %s could not be parsed', stream)
 
         return result
 
     @classmethod
-    def create_from_seed_file(cls, file_path):
+    def create_from_seed_file(cls, file_path, force=False):
         seeds = cls.parse_seeds_file(file_path)
-        return cls.create_from_seeds(seeds)
+        return cls.create_from_seeds(seeds, force=force)
 
     @classmethod
-    def create_from_seeds(cls, seeds):
+    def create_from_seeds(cls, seeds, progress=None, force=False):
+        """Imports the CI systems and products from the seeds.
+
+        `progress` is called with the counters before the changes are
+        written and once they are committed. Seeds identical to the latest
+        imported ones are not imported again unless `force` is set or the
+        imported objects were changed since, the result of the previous
+        import is returned with `unchanged` key.
+        """
+        importer = _importer()
+
+        seeds_hash = importer.seeds_hash(seeds)
+
+        if not force:
+            unchanged = importer.unchanged_result(seeds_hash)
+            if unchanged:
+                return unchanged
+
         result = {
             'objects': [],
             'errors': [],
@@ -727,29 +1107,11 @@ class CiSystem(models.Model):
             'ps_imported': 0,
         }
 
-        if settings.JSON_SCHEMA:
-            try:
-                jsonschema.validate(seeds, settings.JSON_SCHEMA)
-            except jsonschema.ValidationError as exc:
-                # TODO: reraise own exception
-                msg = 'Import file does not follow json schema: %s' % exc
-                LOGGER.error(msg)
-                result['errors'].append(msg)
-                return result
-        else:
-            # TODO: reraise own exception
-            msg = ('Something went wrong with schema.json validation. '
-                   'Please contact the administrator.')
-            LOGGER.error(msg)
-            result['errors'].append(msg)
+        errors = cls._seeds_errors(seeds)
+        if errors:
+            result['errors'].extend(errors)
             return result
 
-        previous_cis = {ci.url for ci in cls.objects.all()}
-        previous_products_names = {
-            (p.name, p.version) for p in ProductCi.objects.all()
-        }
-        new_cis, new_products_names = set(), set()
-
         if seeds:
             cis, products, error = cls._construct_cis_from_import_dict(seeds)
             result['cis_total'] = len(cis)
@@ -759,34 +1121,51 @@ class CiSystem(models.Model):
                 result['errors'].append(error)
                 return result
 
-            for ci in cis:
-                new_ci, error = cls._import_ci(ci)
-                if error:
-                    result['errors'].append(error)
-                else:
-                    result['objects'].append(new_ci)
-                    result['cis_imported'] += 1
-                    new_cis.add(ci['url'])
-
-            for product in products:
-                new_product, error = cls._import_product_status(product)
-                if error:
-                    result['errors'].append(error)
-                else:
-                    result['objects'].append(new_product)
-                    result['ps_imported'] += 1
-                    new_products_names.add(
-                        (new_product.name, new_product.version)
-                    )
-
-            cls.deactivate_previous_cis(previous_cis, new_cis)
-            ProductCi.deactivate_previous_products(
-                previous_products_names,
-                new_products_names
-            )
+            result.update(importer.import_changed(
+                seeds_hash, cis, products, progress))
 
         return result
 
+    @classmethod
+    def plan_from_seeds(cls, seeds):
+        """Changes the import of the seeds would make, nothing is written.
+
+        The plan lists the CI systems, rules, products and product rules
+        which would be created, updated or deactivated.
+        """
+        importer = _importer()
+
+        errors = cls._seeds_errors(seeds)
+        if errors:
+            return importer.empty_plan(errors)
+
+        cis, products, error = cls._construct_cis_from_import_dict(
+            seeds or {})
+        if error:
+            return importer.empty_plan([error])
+
+        return importer.SeedImporter().plan(cis, products)
+
+    @classmethod
+    def _seeds_errors(cls, seeds):
+        validator = schema.get_validator()
+
+        if validator is None:
+            # TODO: reraise own exception
+            msg = ('Something went wrong with schema.json validation. '
+                   'Please contact the administrator.')
+            LOGGER.error(msg)
+            return [msg]
+
+        errors = []
+        for error in schema.schema_errors(seeds, validator):
+            # TODO: reraise own exception
+            msg = 'Import file does not follow json schema: %s' % error
+            LOGGER.error(msg)
+            errors.append(msg)
+
+        return errors
+
     @classmethod
     def _parse_job(cls, job, name, rule_type='Job'):
         filters = job.get('filter', {})
@@ -861,212 +1240,39 @@ class CiSystem(models.Model):
                 LOGGER.error(msg)
                 return jenkins_list, product_dicts, msg
 
-            jobs = jenkins_dict.get('query', {}).get('jobs', [])
-            views = jenkins_dict.get('query', {}).get('views', [])
+            query = jenkins_dict.get('query', {})
+            # the same job may be listed in several sections
+            rules = OrderedDict()
 
             try:
-                for job in jobs:
-                    for name in job['names']:
-                        rule = cls._parse_job(job, name)
-
-                        for key in job['dashboards']:
-                            # ci exist, get the name
-                            if key in cis_map.keys():
-                                ci['name'] = cis_map[key]['name']
-
-                            # rule in product
-                            if key in products.keys():
-                                rule['url'] = ci['url']
-                                products[key]['rules'].append(rule)
-                        ci['rules'].append(rule)
-
-                for job in views:
-                    for name in job['names']:
-                        rule = cls._parse_job(job, name, 'View')
-
-                        for key in job['dashboards']:
-                            # ci exist, get the name
-                            if key in cis_map.keys():
-                                ci['name'] = cis_map[key]['name']
-
-                            # rule in product
-                            if key in products.keys():
-                                rule['url'] = ci['url']
-                                products[key]['rules'].append(rule)
-                        ci['rules'].append(rule)
+                for jobs, rule_type in ((query.get('jobs', []), 'Job'),
+                                        (query.get('views', []), 'View')):
+                    for job in jobs:
+                        for name in job['names']:
+                            rule = cls._parse_job(job, name, rule_type)
+
+                            for key in job['dashboards']:
+                                # ci exist, get the name
+                                if key in cis_map:
+                                    ci['name'] = cis_map[key]['name']
+
+                                # rule in product
+                                if key in products:
+                                    rule['url'] = ci['url']
+                                    products[key]['rules'].append(rule)
+
+                            rules.setdefault(
+                                Rule.seed_key(ci['url'], rule), rule)
             except KeyError as exc:
                 msg = 'Can not create rule during CI import: %s' % exc
                 LOGGER.error(msg)
                 return jenkins_list, product_dicts, msg
 
-            for rule in ci['rules']:
-                if ci['rules'].count(rule) > 1:
-                    ci['rules'].remove(rule)
-
+            ci['rules'] = list(rules.values())
             ci_systems.append(ci)
 
         return ci_systems, products.values(), False
 
-    @classmethod
-    def _import_ci(cls, ci):
-        try:
-            ci_url = ci['url']
-
-            try:
-                new_ci = cls.objects.get(url=ci_url)
-            except cls.DoesNotExist:
-                new_ci = cls(url=ci_url)
-
-            new_ci.username = ci.get('username', '')
-            new_ci.password = ci.get('password', '')
-            new_ci.is_active = ci.get('is_active', False)
-            new_ci.sticky_failure = ci.get('sticky_failure', False)
-            new_ci.name = ci.get('name', '')
-            new_ci.full_clean()
-            new_ci.save()
-
-            rules, error = cls.create_rule_for_ci(
-                ci.get('rules', []), new_ci
-            )
-            if error:
-                return None, error
-        except (IntegrityError, ValidationError) as exc:
-            msg = (
-                'Can not import CI: "%s" from the seeds file. '
-                'Error(s) occured: %s'
-            )
-            LOGGER.error(msg, ci_url, exc)
-            return None, msg % (ci_url, exc)
-        except KeyError as exc:
-            msg = (
-                'Can not import CI: "%s" from the seeds file. '
-                'Required parameter is missed: %s'
-            )
-            LOGGER.error(msg, ci_url, exc)
-            return None, msg % (ci_url, exc)
-
-        return new_ci, None
-
-    @classmethod
-    def _import_product_status(cls, product):
-        product_name = product.get('name', '')
-        version = product.get('version', '')
-
-        try:
-            if not product_name:
-                raise KeyError('name')
-
-            try:
-                new_product = ProductCi.objects.get(
-                    name=product_name,
-                    version=version
-                )
-            except ProductCi.DoesNotExist:
-                new_product = ProductCi(name=product_name, version=version)
-
-            new_product.is_active = product.get('is_active', False)
-            new_product.full_clean()
-            new_product.save()
-
-            product_rules, error = cls.find_rules_for_product(
-                product.get('rules', [])
-            )
-            if error is not True:
-                new_product.rules = product_rules
-                new_product.save()
-            else:
-                return None, 'Product Status {} has invalid rules.'.format(
-                   new_product.name
-                )
-        except (IntegrityError, ValidationError) as exc:
-            msg = (
-                'Can not import ProductCi: "%s" from the seeds file. '
-                'Error(s) occured: %s'
-            )
-            LOGGER.error(msg, product_name, exc)
-            return None, msg % (product_name, exc)
-        except KeyError as exc:
-            msg = (
-                'Can not import ProductCi: "%s" from the seeds file. '
-                'Required parameter is missed: %s'
-            )
-            LOGGER.error(msg, product_name, exc)
-            return None, msg % (product_name, exc)
-
-        return new_product, None
-
-    @classmethod
-    def find_rules_for_product(cls, rules_dicts):
-        rules = []
-
-        for rule_dict in rules_dicts:
-            rule, error = cls._rule_by_dict(rule_dict)
-
-            if error:
-                return [], True
-
-            rules.append(rule)
-
-        return rules, False
-
-    @classmethod
-    def _rule_by_dict(cls, rule_dict):
-        try:
-            ci = cls.objects.get(url=rule_dict['url'], is_active=True)
-
-            rule = Rule.objects.get(
-                name=rule_dict['name'],
-                rule_type=Rule.type_by_name(
-                    rule_dict.get(
-                        'rule_type',
-                        constants.DEFAULT_RULE_TYPE
-                    )
-                ),
-                ci_system_id=ci.pk,
-                trigger_type=Rule.trigger_type_by_name(
-                    rule_dict.get(
-                        'trigger_type',
-                        constants.DEFAULT_TRIGGER_TYPE
-                    )
-                ),
-                gerrit_refspec=rule_dict.get('gerrit_refspec', ''),
-                gerrit_branch=rule_dict.get('gerrit_branch', ''),
-            )
-        except cls.DoesNotExist as exc:
-            LOGGER.error(
-                'Can not find CiSystem mentioned in rule '
-                'for Product Status during import: %s',
-                exc)
-        except Rule.DoesNotExist as exc:
-            LOGGER.error(
-                'Can not find the rule for Product Status '
-                'during import: %s',
-                exc
-            )
-        except cls.MultipleObjectsReturned as exc:
-            LOGGER.error(
-                'Inconsistency detected! Duplicate active CI system with the '
-                'same name: %s', exc)
-        except KeyError as exc:
-            LOGGER.error(
-                'Rule for Product Status configure improperly: %s', exc)
-        else:
-            return rule, False
-
-        return None, True
-
-    @classmethod
-    def deactivate_previous_cis(cls, previous_cis, new_cis):
-        for url in previous_cis - new_cis:
-            try:
-                ci = cls.objects.get(url=url)
-                ci.is_active = False
-                ci.save()
-            except cls.DoesNotExist as exc:
-                LOGGER.error(
-                    'Can not deactivate unexistent ci during import: %s', exc
-                )
-
 
 class ProductCi(models.Model):
 
@@ -1098,10 +1304,12 @@ class ProductCi(models.Model):
             status_type = self._get_status_for_checks(checks)
 
             if self._should_change_status(status_type):
-                self.productcistatus_set.create(
+                status = self.productcistatus_set.create(
                     summary=summary or default_summary,
                     status_type=status_type,
                 )
+                StatusTransition.record(status)
+                StatusEvent.publish_product_status(status)
 
     def _should_change_status(self, new_status_type):
         previous_status = self.productcistatus_set.last()
@@ -1173,26 +1381,17 @@ class ProductCi(models.Model):
     def current_status_text(self):
         return Status.text_for_type(self.current_status_type())
 
-    @classmethod
-    def deactivate_previous_products(cls, old_names, new_names):
-        for name, version in old_names - new_names:
-            try:
-                p = cls.objects.get(name=name, version=version, is_active=True)
-                p.is_active = False
-                p.save()
-            except cls.DoesNotExist as exc:
-                LOGGER.error(
-                    'Can not deactivate unexistent Product Status '
-                    'during import: %s',
-                    exc
-                )
-
 
 class ProductCiStatus(AbstractStatus):
 
     product_ci = models.ForeignKey(ProductCi, on_delete=models.CASCADE)
     version = models.CharField(max_length=255, default='')
 
+    class Meta(AbstractStatus.Meta):
+        index_together = AbstractStatus.Meta.index_together + (
+            ('product_ci', 'version', 'created_at', 'id'),
+        )
+
     def __unicode__(self):
         return '{status} (product: "{ci}")'.format(
             status=super(ProductCiStatus, self).__unicode__(),
@@ -1201,21 +1400,675 @@ class ProductCiStatus(AbstractStatus):
     def get_absolute_url(self):
         return reverse('product_ci_status_detail', kwargs={'pk': self.pk})
 
+    def publish_event(self):
+        return StatusEvent.publish_product_status(self)
+
     @staticmethod
     def set_version(sender, instance, **kwargs):
         if not instance.version:
             instance.version = instance.product_ci.version
 
 
+TOKEN_LOCAL_CACHE = LocalCache(settings.TOKEN_LOCAL_CACHE_TIMEOUT,
+                               max_size=settings.TOKEN_LOCAL_CACHE_SIZE)
+
+
 class UserToken(models.Model):
-    token = models.UUIDField()
+    token = models.UUIDField(unique=True)
     user = models.OneToOneField(User)
 
+    @staticmethod
+    def cache_key(token):
+        return 'ci_dashboard:token:{}'.format(token.hex)
+
+    @classmethod
+    def user_id_for_token(cls, token):
+        """Id of the token owner, None for unknown tokens.
+
+        The mapping is kept only in the memory of the process, for
+        `TOKEN_LOCAL_CACHE_TIMEOUT` seconds. A regenerated or deleted
+        token is forgotten by the process which changed it, the other
+        processes accept it until their entry expires.
+        """
+        try:
+            token = uuid.UUID(token)
+        except ValueError:
+            return None
+
+        key = cls.cache_key(token)
+        user_id = TOKEN_LOCAL_CACHE.get(key)
+
+        if user_id is None:
+            user_id = cls.objects.filter(
+                token=token
+            ).values_list('user_id', flat=True).first()
+
+            if user_id is None:
+                return None
+
+            TOKEN_LOCAL_CACHE.set(key, user_id)
+
+        return user_id
+
+    @classmethod
+    def forget(cls, token):
+        TOKEN_LOCAL_CACHE.delete(cls.cache_key(token))
+
     @staticmethod
     def gen_token(sender, instance, *args, **kwargs):
+        if instance.pk:
+            for token in UserToken.objects.filter(
+                pk=instance.pk
+            ).values_list('token', flat=True):
+                UserToken.forget(token)
+
         instance.token = uuid.uuid4()
 
+    @staticmethod
+    def forget_token(sender, instance, *args, **kwargs):
+        UserToken.forget(instance.token)
+
+
+class StatusEvent(models.Model):
+    """Status change pushed to the live dashboards.
+
+    Rows are only appended, so the primary key is used as the position
+    of the event in the stream.
+    """
+
+    event_type = models.CharField(max_length=20,
+                                  choices=constants.EVENT_TYPE_CHOICES)
+    object_id = models.IntegerField()
+    data = models.TextField(default='{}')
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ('id',)
+
+    def __unicode__(self):
+        return '#{id} {event_type} ({object_id})'.format(
+            id=self.pk,
+            event_type=self.event_type,
+            object_id=self.object_id)
+
+    def payload(self):
+        return json.loads(self.data)
+
+    def as_dict(self):
+        return {
+            'id': self.pk,
+            'event_type': self.event_type,
+            'object_id': self.object_id,
+            'created_at': self.created_at,
+            'data': self.payload(),
+        }
+
+    @classmethod
+    def latest_id(cls):
+        event = cls.objects.only('id').last()
+        return event.pk if event else 0
+
+    @classmethod
+    def publish(cls, event_type, object_id, data):
+        return cls.objects.create(
+            event_type=event_type,
+            object_id=object_id,
+            data=json.dumps(data, cls=DjangoJSONEncoder),
+        )
+
+    @staticmethod
+    def _previous_status_type(statuses, status):
+        return statuses.filter(id__lt=status.pk).values_list(
+            'status_type', flat=True).last()
+
+    @classmethod
+    def publish_ci_status(cls, status):
+        previous_type = cls._previous_status_type(
+            Status.objects.filter(ci_system_id=status.ci_system_id), status)
+
+        return cls.publish(
+            constants.EVENT_CI_STATUS,
+            status.ci_system_id,
+            cls._ci_status_data(
+                status, previous_type,
+                status.rule_checks().count(),
+                status.failed_rule_checks().count(),
+            ))
+
+    @classmethod
+    def publish_manual_statuses(cls, statuses):
+        """Publishes the events of the new manual statuses at once.
+
+        The statuses are in the order they were created, manual statuses
+        have no rule checks. The previous status types are loaded once for
+        the batch and the events are written with one insert.
+        """
+        if not statuses:
+            return []
+
+        latest_ids = Status.objects.filter(
+            ci_system_id__in={status.ci_system_id for status in statuses},
+            id__lt=min(status.pk for status in statuses),
+        ).order_by().values('ci_system').annotate(
+            latest_id=models.Max('id')
+        ).values_list('latest_id', flat=True)
+        previous_types = dict(Status.objects.filter(
+            id__in=list(latest_ids)
+        ).values_list('ci_system_id', 'status_type'))
+
+        events = []
+        for status in statuses:
+            events.append(cls(
+                event_type=constants.EVENT_CI_STATUS,
+                object_id=status.ci_system_id,
+                data=json.dumps(cls._ci_status_data(
+                    status, previous_types.get(status.ci_system_id), 0, 0
+                ), cls=DjangoJSONEncoder),
+            ))
+            previous_types[status.ci_system_id] = status.status_type
+
+        cls.objects.bulk_create(events)
+
+        return events
+
+    @staticmethod
+    def _ci_status_data(status, previous_type, rule_checks,
+                        failed_rule_checks):
+        return {
+            'ci_system': status.ci_system_id,
+            'status': status.pk,
+            'status_type': status.status_type,
+            'previous_status_type': previous_type,
+            'status_text': status.status_text(),
+            'summary': status.summary,
+            'is_manual': status.is_manual,
+            'author': status.author_username(),
+            'last_changed_at': status.last_changed_at,
+            'rule_checks': rule_checks,
+            'failed_rule_checks': failed_rule_checks,
+        }
+
+    @classmethod
+    def publish_product_status(cls, status):
+        previous_type = cls._previous_status_type(
+            ProductCiStatus.objects.filter(
+                product_ci_id=status.product_ci_id,
+                version=status.version,
+            ),
+            status
+        )
+
+        return cls.publish(
+            constants.EVENT_PRODUCT_STATUS,
+            status.product_ci_id,
+            {
+                'product_ci': status.product_ci_id,
+                'version': status.version,
+                'status': status.pk,
+                'status_type': status.status_type,
+                'previous_status_type': previous_type,
+                'status_text': status.status_text(),
+                'summary': status.summary,
+                'last_changed_at': status.last_changed_at,
+            })
+
+    @classmethod
+    def publish_rule_check(cls, rule_check):
+        return cls.publish(constants.EVENT_RULE_CHECK, rule_check.rule_id, {
+            'rule': rule_check.rule_id,
+            'rule_check': rule_check.pk,
+            'status_type': rule_check.status_type,
+            'status_text': rule_check.status_text,
+            'build_number': rule_check.build_number,
+        })
+
+
+class Webhook(models.Model):
+    """Endpoint the status events are posted to in batches.
+
+    `last_event_id` is the last event delivered, new webhooks start with
+    the events published after they were added.
+    """
+
+    url = models.URLField(unique=True)
+    event_types = models.CharField(
+        max_length=255, blank=True, default='',
+        help_text='Comma separated event types, all events when empty')
+    is_active = models.BooleanField(default=True)
+    last_event_id = models.IntegerField(default=0)
+    last_error = models.TextField(blank=True, default='')
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __unicode__(self):
+        return self.url
+
+    def event_types_list(self):
+        return [
+            event_type.strip()
+            for event_type in self.event_types.split(',')
+            if event_type.strip()
+        ]
+
+    def pending_events(self, limit):
+        events = StatusEvent.objects.filter(id__gt=self.last_event_id)
+
+        if self.event_types_list():
+            events = events.filter(event_type__in=self.event_types_list())
+
+        return list(events[:limit])
+
+    @staticmethod
+    def start_from_latest_event(sender, instance, *args, **kwargs):
+        if instance.pk is None and not instance.last_event_id:
+            instance.last_event_id = StatusEvent.latest_id()
+
+
+class ImportJob(models.Model):
+    """Seeds import queued to run in a celery worker.
+
+    The counters are updated before the changes are written and once they
+    are committed, the final ones match the result of
+    `CiSystem.create_from_seeds`. The seeds, credentials included, are
+    cleared when the job is finished.
+    """
+
+    seeds = models.TextField()
+    user = models.ForeignKey(User, null=True, blank=True,
+                             on_delete=models.SET_NULL)
+    state = models.CharField(max_length=20,
+                             default=constants.IMPORT_PENDING,
+                             choices=constants.IMPORT_STATE_CHOICES)
+
+    unchanged = models.BooleanField(default=False)
+
+    cis_total = models.IntegerField(default=0)
+    cis_processed = models.IntegerField(default=0)
+    cis_imported = models.IntegerField(default=0)
+    ps_total = models.IntegerField(default=0)
+    ps_processed = models.IntegerField(default=0)
+    ps_imported = models.IntegerField(default=0)
+    errors = models.TextField(blank=True, default='')
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    PROGRESS_FIELDS = (
+        'cis_total', 'cis_processed', 'cis_imported',
+        'ps_total', 'ps_processed', 'ps_imported',
+    )
+
+    def __unicode__(self):
+        return 'Import #{} ({})'.format(self.pk, self.state)
+
+    def errors_list(self):
+        return json.loads(self.errors) if self.errors else []
+
+    def is_finished(self):
+        return self.state in (constants.IMPORT_DONE, constants.IMPORT_FAILED)
+
+    def summary(self):
+        return ('The seeds are unchanged. ' if self.unchanged else '') + (
+            '{cis_imported} of total {cis_total} Ci Systems and '
+            '{ps_imported} of total {ps_total} Product Statuses '
+            'were imported.'
+        ).format(
+            cis_imported=self.cis_imported,
+            cis_total=self.cis_total,
+            ps_imported=self.ps_imported,
+            ps_total=self.ps_total,
+        )
+
+    def _set_progress(self, progress):
+        for field in self.PROGRESS_FIELDS:
+            setattr(self, field, progress.get(field, 0))
+        self.errors = json.dumps(progress.get('errors', []))
+
+    def update_progress(self, progress):
+        self._set_progress(progress)
+        self.save(update_fields=self.PROGRESS_FIELDS + (
+            'errors', 'updated_at'))
+
+    def run(self):
+        self.state = constants.IMPORT_RUNNING
+        self.save(update_fields=['state', 'updated_at'])
+
+        try:
+            result = CiSystem.create_from_seeds(
+                json.loads(self.seeds), progress=self.update_progress)
+        except Exception as exc:
+            LOGGER.exception('Import job %s failed', self.pk)
+            self.state = constants.IMPORT_FAILED
+            self.errors = json.dumps(
+                self.errors_list() + ['Import failed: %s' % exc])
+        else:
+            result['cis_processed'] = result['cis_total']
+            result['ps_processed'] = result['ps_total']
+            self._set_progress(result)
+            self.unchanged = result.get('unchanged', False)
+            self.state = constants.IMPORT_DONE
+
+        self.seeds = ''
+        self.finished_at = timezone.now()
+        self.save()
+
+    def as_dict(self):
+        data = {
+            'id': self.pk,
+            'state': self.state,
+            'unchanged': self.unchanged,
+            'errors': self.errors_list(),
+            'created_at': self.created_at,
+            'finished_at': self.finished_at,
+        }
+        data.update(
+            (field, getattr(self, field)) for field in self.PROGRESS_FIELDS)
+
+        if self.state == constants.IMPORT_DONE:
+            data['success_message'] = self.summary()
+
+        return data
+
+
+class ImportSnapshot(models.Model):
+    """Seeds applied by the latest import and the objects built from them.
+
+    `state_hash` is the hash of the CI systems, rules, products and product
+    rules right after the import, `result` keeps the import result with the
+    objects stored as `[model, id]` pairs.
+    """
+
+    seeds_hash = models.CharField(max_length=64)
+    state_hash = models.CharField(max_length=64, default='')
+    result = models.TextField(default='{}')
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def result_dict(self):
+        return json.loads(self.result)
+
+
+class DailyRollup(models.Model):
+    """Reliability counters of a rule, CI or product version for a day.
+
+    `total` counts the checks or statuses written that day, they are
+    written only on changes. The `*_seconds` fields hold the time spent in
+    every status type.
+    """
+
+    scope = models.CharField(max_length=20,
+                             choices=constants.ROLLUP_SCOPE_CHOICES)
+    object_id = models.IntegerField()
+    version = models.CharField(max_length=255, default='', blank=True)
+    day = models.DateField()
+
+    total = models.IntegerField(default=0)
+    succeeded = models.IntegerField(default=0)
+    failed = models.IntegerField(default=0)
+    recoveries = models.IntegerField(default=0)
+    recovery_seconds = models.BigIntegerField(default=0)
+
+    success_seconds = models.BigIntegerField(default=0)
+    fail_seconds = models.BigIntegerField(default=0)
+    skip_seconds = models.BigIntegerField(default=0)
+    aborted_seconds = models.BigIntegerField(default=0)
+    in_progress_seconds = models.BigIntegerField(default=0)
+    error_seconds = models.BigIntegerField(default=0)
+
+    SECONDS_FIELDS = {
+        constants.STATUS_SUCCESS: 'success_seconds',
+        constants.STATUS_FAIL: 'fail_seconds',
+        constants.STATUS_SKIP: 'skip_seconds',
+        constants.STATUS_ABORTED: 'aborted_seconds',
+        constants.STATUS_IN_PROGRESS: 'in_progress_seconds',
+        constants.STATUS_ERROR: 'error_seconds',
+    }
+
+    class Meta:
+        ordering = ('day', 'id')
+        unique_together = ('scope', 'object_id', 'version', 'day')
+        index_together = (('scope', 'day'),)
+
+    def __unicode__(self):
+        return '{scope} #{object_id} {version} ({day})'.format(
+            scope=self.scope,
+            object_id=self.object_id,
+            version=self.version,
+            day=self.day)
+
+
+class RollupState(models.Model):
+    """The latest processed status of an object the rollups are kept for."""
+
+    scope = models.CharField(max_length=20,
+                             choices=constants.ROLLUP_SCOPE_CHOICES)
+    object_id = models.IntegerField()
+    version = models.CharField(max_length=255, default='', blank=True)
+
+    status_type = models.IntegerField(choices=constants.STATUS_TYPE_CHOICES)
+    changed_at = models.DateTimeField()
+    row_id = models.IntegerField(default=0)
+    failing_since = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        unique_together = ('scope', 'object_id', 'version')
+
+
+class StatusTransition(models.Model):
+    """Interval during which a CI or a product version kept a status type.
+
+    Intervals are maintained as statuses are written, the current one has
+    no `ended_at`.
+    """
+
+    ci_system = models.ForeignKey(CiSystem, null=True, blank=True,
+                                  on_delete=models.CASCADE)
+    product_ci = models.ForeignKey(ProductCi, null=True, blank=True,
+                                   on_delete=models.CASCADE)
+    version = models.CharField(max_length=255, default='', blank=True)
+
+    status_type = models.IntegerField(choices=constants.STATUS_TYPE_CHOICES)
+    started_at = models.DateTimeField()
+    ended_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ('started_at', 'id')
+        index_together = (
+            ('ci_system', 'ended_at'),
+            ('product_ci', 'version', 'ended_at'),
+        )
+
+    @staticmethod
+    def _parent(status):
+        if isinstance(status, ProductCiStatus):
+            return {
+                'product_ci_id': status.product_ci_id,
+                'version': status.version,
+            }
+
+        return {'ci_system_id': status.ci_system_id}
+
+    @classmethod
+    def record(cls, status):
+        """Extends the timeline of the status owner by the new status."""
+        parent = cls._parent(status)
+        current = cls.objects.filter(ended_at__isnull=True, **parent).last()
+
+        if current and current.started_at > status.created_at:
+            return cls.rebuild(status)
+
+        cls._append(current, parent, status.status_type, status.created_at)
+
+    @classmethod
+    def record_ci_statuses(cls, statuses):
+        """Extends the timelines of the CI systems by the batch of statuses.
+
+        The statuses are in the order they were created. The current
+        intervals are loaded with one query, the ended ones are closed
+        with one update and the new ones are written with one insert.
+        """
+        by_ci = OrderedDict()
+        for status in statuses:
+            by_ci.setdefault(status.ci_system_id, []).append(status)
+
+        current = {
+            transition.ci_system_id: transition
+            for transition in cls.objects.filter(
+                ended_at__isnull=True, ci_system_id__in=list(by_ci))
+        }
+        ended = {}
+        created = []
+
+        for ci_id, ci_statuses in by_ci.items():
+            transition = current.get(ci_id)
+            first = ci_statuses[0]
+
+            if transition and transition.started_at > first.created_at:
+                cls.rebuild(first)
+                continue
+
+            for status in ci_statuses:
+                if (transition and
+                        transition.status_type == status.status_type):
+                    continue
+
+                if transition and transition.pk:
+                    ended[transition.pk] = status.created_at
+                elif transition:
+                    transition.ended_at = status.created_at
+
+                transition = cls(
+                    ci_system_id=ci_id,
+                    status_type=status.status_type,
+                    started_at=status.created_at,
+                )
+                created.append(transition)
+
+        if ended:
+            cls.objects.filter(id__in=list(ended)).update(
+                ended_at=models.Case(
+                    *[
+                        models.When(id=pk, then=models.Value(
+                            ended_at, output_field=models.DateTimeField()))
+                        for pk, ended_at in ended.items()
+                    ],
+                    output_field=models.DateTimeField()
+                ))
+
+        cls.objects.bulk_create(created)
+
+    @classmethod
+    def rebuild(cls, status, since=None):
+        """Rebuilds the timeline of the status owner after it was changed.
+
+        Only the intervals since the status was created, or since `since`
+        when it is given, are rebuilt, the status itself may be deleted
+        already.
+        """
+        parent = cls._parent(status)
+        since = since or status.created_at
+
+        cls.objects.filter(started_at__gte=since, **parent).delete()
+        current = cls.objects.filter(**parent).last()
+
+        if current:
+            current.ended_at = None
+            current.save()
+
+        for status_type, created_at in type(status).objects.filter(
+            created_at__gte=since, **parent
+        ).order_by('created_at', 'id').values_list(
+            'status_type', 'created_at'
+        ):
+            current = cls._append(current, parent, status_type, created_at)
+
+    @classmethod
+    def _append(cls, current, parent, status_type, changed_at):
+        if current and current.status_type == status_type:
+            return current
+
+        if current:
+            current.ended_at = changed_at
+            current.save()
+
+        return cls.objects.create(
+            status_type=status_type,
+            started_at=changed_at,
+            **parent
+        )
+
+    @classmethod
+    def in_period(cls, since):
+        return cls.objects.filter(
+            models.Q(ended_at__isnull=True) | models.Q(ended_at__gt=since))
+
+    @staticmethod
+    def segments(transitions, since, until):
+        """Transitions clipped to the period with their share of it."""
+        period = (until - since).total_seconds()
+        result = []
+
+        for transition in transitions:
+            started_at = max(transition.started_at, since)
+            ended_at = min(transition.ended_at or until, until)
+
+            if ended_at <= started_at:
+                continue
+
+            result.append({
+                'status_type': transition.status_type,
+                'started_at': started_at,
+                'ended_at': ended_at,
+                'is_current': transition.ended_at is None,
+                'width': 100 * (ended_at - started_at).total_seconds() / period,
+            })
+
+        return result
+
+    @classmethod
+    def sparklines_by_ci(cls, ci_systems, since, until):
+        sparklines = {ci.pk: [] for ci in ci_systems}
+
+        for transition in cls.in_period(since).filter(
+            ci_system__in=list(sparklines)
+        ):
+            sparklines[transition.ci_system_id].append(transition)
+
+        return {
+            pk: cls.segments(transitions, since, until)
+            for pk, transitions in sparklines.items()
+        }
+
+    @classmethod
+    def sparklines_by_product(cls, product_cis, since, until):
+        sparklines = {(pci.pk, pci.version): [] for pci in product_cis}
+
+        for transition in cls.in_period(since).filter(
+            product_ci__in=[pci.pk for pci in product_cis]
+        ):
+            key = (transition.product_ci_id, transition.version)
+            if key in sparklines:
+                sparklines[key].append(transition)
+
+        return {
+            key: cls.segments(transitions, since, until)
+            for key, transitions in sparklines.items()
+        }
+
 
 pre_save.connect(ProductCiStatus.set_version, sender=ProductCiStatus)
-pre_delete.connect(Status.delele_unused_rulechecks, sender=Status)
 pre_save.connect(UserToken.gen_token, sender=UserToken)
+pre_save.connect(Webhook.start_from_latest_event, sender=Webhook)
+post_delete.connect(UserToken.forget_token, sender=UserToken)
+post_save.connect(permissions.on_user_saved, sender=User)
+user_logged_in.connect(permissions.on_user_logged_in)
+m2m_changed.connect(permissions.on_user_groups_changed,
+                    sender=User.groups.through)
+
+if 'django_auth_ldap.backend.LDAPBackend' in settings.AUTHENTICATION_BACKENDS:
+    from django_auth_ldap.backend import populate_user
+
+    populate_user.connect(permissions.on_ldap_user_populated)
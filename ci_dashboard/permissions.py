@@ -0,0 +1,81 @@
+"""Staff permission checks cached between the requests of a user.
+
+The checks are forgotten when the user or the groups change, but with a
+per-process cache only in the process that changed them, the other ones
+see the change after `STAFF_CHECK_CACHE_TIMEOUT`.
+"""
+
+from __future__ import unicode_literals
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+def _cache_key(user_pk):
+    return 'ci_dashboard:can_manage_statuses:{}'.format(user_pk)
+
+
+def _check_staff_groups(user):
+    if getattr(user, 'ldap_user', None):  # ldap users should have ldap groups
+        return bool(set(settings.STAFF_GROUPS) & user.ldap_user.group_names)
+
+    # all others should belong to django group (if added manually)
+    # or be the superuser
+    return bool(
+        set(settings.STAFF_GROUPS) & {g.name for g in user.groups.all()}
+    ) or user.is_superuser
+
+
+def can_manage_statuses(user):
+    if not user.pk:
+        return False
+
+    # templates check it several times during the same request
+    result = getattr(user, '_can_manage_statuses', None)
+
+    if result is None:
+        result = cache.get(_cache_key(user.pk))
+
+        if result is None:
+            result = _check_staff_groups(user)
+            cache.set(_cache_key(user.pk), result,
+                      settings.STAFF_CHECK_CACHE_TIMEOUT)
+
+        user._can_manage_statuses = result
+
+    return result
+
+
+def forget_user(user):
+    cache.delete(_cache_key(user.pk))
+
+
+def on_user_saved(sender, instance, **kwargs):
+    # `is_superuser` and the ldap groups are changed by the user saves
+    forget_user(instance)
+
+
+def on_user_logged_in(sender, user, **kwargs):
+    forget_user(user)
+
+
+def on_ldap_user_populated(sender, user, **kwargs):
+    if user.pk:
+        forget_user(user)
+
+
+def on_user_groups_changed(sender, instance, action, reverse, pk_set,
+                           **kwargs):
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+
+    if not reverse:
+        forget_user(instance)
+    elif action == 'pre_clear':
+        # users of the group are not known after it is cleared
+        cache.delete_many([
+            _cache_key(user_pk)
+            for user_pk in instance.user_set.values_list('pk', flat=True)
+        ])
+    else:
+        cache.delete_many([_cache_key(user_pk) for user_pk in pk_set])
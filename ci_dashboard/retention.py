@@ -0,0 +1,229 @@
+"""History retention: compacts old statuses according to the policies.
+
+Policies are configured per model in the `HISTORY_RETENTION` setting:
+
+* `keep_all_days` - every row younger than this is kept
+* `keep_changes_days` - older rows are kept only when their status type
+  differs from the previous row of the same parent, `None` keeps the
+  changes forever
+* rows older than `keep_changes_days` are reduced to the last row of
+  every day
+
+Manual statuses and the latest row of every parent are never deleted.
+The timeline of a parent is rebuilt when some of its status changes are
+deleted.
+Status events are deleted by age too, except the ones an active webhook
+has not delivered yet, and so are the finished import jobs.
+Rows are deleted in batches, each in its own transaction, so tables are
+not locked for long.
+"""
+
+from __future__ import unicode_literals
+
+import logging
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import models, transaction
+from django.utils import timezone
+
+from ci_dashboard import cursors
+from ci_dashboard.models import ProductCiStatus, RuleCheck, Status
+from ci_dashboard.constants import IMPORT_DONE, IMPORT_FAILED
+from ci_dashboard.models import ImportJob, StatusEvent, StatusTransition
+from ci_dashboard.models import Webhook
+
+LOGGER = logging.getLogger(__name__)
+
+# rule checks are written right before they are linked to a status
+ORPHAN_RULE_CHECKS_DELAY = timedelta(hours=1)
+
+
+def _delete_product_statuses(ids):
+    ProductCiStatus.objects.filter(id__in=ids).delete()
+
+
+RETENTION_MODELS = (
+    ('status', Status, ('ci_system',), Status.delete_with_rule_checks),
+    ('product_ci_status', ProductCiStatus, ('product_ci', 'version'),
+     _delete_product_statuses),
+)
+
+
+def apply_retention(policies=None, batch_size=None, now=None):
+    """Applies the retention policies, returns deleted rows counts."""
+    if policies is None:
+        policies = settings.HISTORY_RETENTION
+    batch_size = batch_size or settings.HISTORY_RETENTION_BATCH_SIZE
+    now = now or timezone.now()
+    deleted = {}
+
+    for name, model, parent_fields, delete in RETENTION_MODELS:
+        policy = policies.get(name) or {}
+
+        if policy.get('keep_all_days') is not None:
+            deleted[name] = _compact(
+                model, parent_fields, delete, policy, now, batch_size)
+
+    deleted['rule_check'] = _delete_in_batches(
+        RuleCheck.objects.filter(
+            status__isnull=True,
+            created_at__lt=now - ORPHAN_RULE_CHECKS_DELAY,
+        ),
+        lambda ids: RuleCheck.objects.filter(id__in=ids).delete(),
+        batch_size
+    )
+
+    policy = policies.get('status_event') or {}
+    if policy.get('keep_all_days') is not None:
+        events = StatusEvent.objects.filter(
+            created_at__lt=now - timedelta(days=policy['keep_all_days'])
+        )
+        # events are delivered to webhooks in id order
+        delivered_id = Webhook.objects.filter(is_active=True).aggregate(
+            delivered_id=models.Min('last_event_id'))['delivered_id']
+        if delivered_id is not None:
+            events = events.filter(id__lte=delivered_id)
+
+        deleted['status_event'] = _delete_in_batches(
+            events,
+            lambda ids: StatusEvent.objects.filter(id__in=ids).delete(),
+            batch_size
+        )
+
+    policy = policies.get('import_job') or {}
+    if policy.get('keep_all_days') is not None:
+        deleted['import_job'] = _delete_in_batches(
+            ImportJob.objects.filter(
+                state__in=(IMPORT_DONE, IMPORT_FAILED),
+                finished_at__lt=now - timedelta(days=policy['keep_all_days'])
+            ),
+            lambda ids: ImportJob.objects.filter(id__in=ids).delete(),
+            batch_size
+        )
+
+    return deleted
+
+
+def _compact(model, parent_fields, delete, policy, now, batch_size):
+    keep_all_since = now - timedelta(days=policy['keep_all_days'])
+    changes_since = None
+    if policy.get('keep_changes_days') is not None:
+        changes_since = now - timedelta(days=policy['keep_changes_days'])
+
+    protected_ids = set(
+        model.objects.order_by().values(*parent_fields).annotate(
+            latest_id=models.Max('id')
+        ).values_list('latest_id', flat=True)
+    )
+
+    previous_types = {}
+    # the last row seen for the parent in the daily part of the history
+    day_rows = {}
+    # the earliest deleted change of the parent, its timeline is rebuilt
+    rebuild_since = {}
+    deleter = _BatchDeleter(delete, batch_size)
+
+    rows = _iter_rows(
+        model.objects.filter(created_at__lt=keep_all_since),
+        ('id', 'created_at', 'status_type', 'is_manual') + parent_fields,
+        batch_size
+    )
+
+    for row in rows:
+        pk, created_at, status_type, is_manual = row[:4]
+        parent = row[4:]
+        is_protected = is_manual or pk in protected_ids
+        is_change = previous_types.get(parent) != status_type
+        previous_types[parent] = status_type
+
+        if changes_since is None or created_at >= changes_since:
+            if not is_change and not is_protected:
+                deleter.add(pk)
+            continue
+
+        day = created_at.date()
+        previous_day, previous_pk, previous_at, previous_is_change = \
+            day_rows.get(parent, (None, None, None, False))
+
+        if previous_day == day and previous_pk:
+            deleter.add(previous_pk)
+
+            if previous_is_change:
+                rebuild_since.setdefault(parent, previous_at)
+
+        day_rows[parent] = (
+            day, None if is_protected else pk, created_at, is_change)
+
+    deleter.flush()
+
+    for parent, since in rebuild_since.items():
+        # the latest status of the parent is never deleted
+        StatusTransition.rebuild(
+            model.objects.filter(**dict(zip(parent_fields, parent))).last(),
+            since
+        )
+
+    return deleter.deleted
+
+
+def _iter_rows(queryset, fields, chunk_size):
+    """Yields rows in `(created_at, id)` order reading them by chunks."""
+    position = None
+
+    while True:
+        chunk = queryset
+        if position:
+            chunk = chunk.filter(cursors.after('created_at', position))
+
+        rows = list(
+            chunk.order_by('created_at', 'id').values_list(*fields)[
+                :chunk_size]
+        )
+        if not rows:
+            return
+
+        for row in rows:
+            yield row
+
+        position = (rows[-1][1], rows[-1][0])
+
+
+def _delete_in_batches(queryset, delete, batch_size):
+    deleted = 0
+
+    while True:
+        ids = list(queryset.values_list('id', flat=True)[:batch_size])
+        if not ids:
+            return deleted
+
+        with transaction.atomic():
+            delete(ids)
+        deleted += len(ids)
+
+
+class _BatchDeleter(object):
+
+    def __init__(self, delete, batch_size):
+        self.delete = delete
+        self.batch_size = batch_size
+        self.deleted = 0
+        self._ids = []
+
+    def add(self, pk):
+        self._ids.append(pk)
+
+        if len(self._ids) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self._ids:
+            return
+
+        with transaction.atomic():
+            self.delete(self._ids)
+
+        LOGGER.debug('History retention deleted %s rows', len(self._ids))
+        self.deleted += len(self._ids)
+        self._ids = []
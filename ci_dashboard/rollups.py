@@ -0,0 +1,248 @@
+"""Daily reliability rollups of rules, CI systems and product versions.
+
+Rule checks and statuses are processed in the `(created_at, id)` order
+starting from the watermark kept in `Stats`, the latest processed
+`created_at`. Rows are stamped before their transactions commit, so every
+run reads again the rows created up to `ROLLUPS_OVERLAP` seconds before
+the watermark. The latest processed row of every object is kept in
+`RollupState` to skip the rows already counted and to continue the
+intervals and failure streaks of the object in the next run. A row of an
+object older than its latest processed row is not counted.
+
+Time in a status is counted up to the next status of the object, so the
+current status of an object is not counted until it changes. Statuses are
+written only when they change, so the pass rate is the share of the time
+spent passed out of the time spent passed or failed, not of the rows.
+
+Rows are counted once, when they are first processed: later edits or
+deletes of already rolled up statuses are not reflected in the rollups.
+The watermark row is locked while a batch is applied, so concurrent runs
+do not count the same rows twice.
+"""
+
+from __future__ import unicode_literals
+
+import calendar
+import logging
+
+from collections import defaultdict, Counter
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.db import models, transaction
+from django.utils import timezone
+
+from ci_dashboard import constants, cursors
+from ci_dashboard.models import DailyRollup, ProductCiStatus, RollupState
+from ci_dashboard.models import RuleCheck, Stats, Status
+
+LOGGER = logging.getLogger(__name__)
+
+ROLLUP_SOURCES = (
+    (constants.ROLLUP_RULE, RuleCheck, ('rule_id',)),
+    (constants.ROLLUP_CI_SYSTEM, Status, ('ci_system_id',)),
+    (constants.ROLLUP_PRODUCT_CI, ProductCiStatus,
+     ('product_ci_id', 'version')),
+)
+
+COUNTER_FIELDS = (
+    'total', 'succeeded', 'failed', 'recoveries', 'recovery_seconds',
+) + tuple(sorted(DailyRollup.SECONDS_FIELDS.values()))
+
+
+def update_rollups(batch_size=None):
+    """Rolls up the rows written since the last run, returns their counts."""
+    batch_size = batch_size or settings.ROLLUPS_BATCH_SIZE
+    processed = {}
+
+    for scope, model, parent_fields in ROLLUP_SOURCES:
+        processed[scope] = _update_scope(
+            scope, model, parent_fields, batch_size)
+
+    return processed
+
+
+def _update_scope(scope, model, parent_fields, batch_size):
+    name = 'rollups:' + scope
+    Stats.objects.get_or_create(name=name)
+    processed = 0
+    position = None
+
+    while True:
+        with transaction.atomic():
+            watermark = Stats.objects.select_for_update().get(name=name)
+            queryset = model.objects.all()
+
+            if position:
+                queryset = queryset.filter(
+                    cursors.after('created_at', position))
+            elif watermark.value:
+                queryset = queryset.filter(created_at__gte=_from_timestamp(
+                    watermark.value - settings.ROLLUPS_OVERLAP))
+
+            rows = list(queryset.order_by('created_at', 'id').values_list(
+                'id', 'created_at', 'status_type', *parent_fields
+            )[:batch_size])
+            if not rows:
+                return processed
+
+            applied = _apply_rows(scope, rows)
+            watermark.value = max(watermark.value, _timestamp(rows[-1][1]))
+            watermark.save()
+
+        LOGGER.debug('Rolled up %s %s rows', applied, scope)
+        processed += applied
+        position = (rows[-1][1], rows[-1][0])
+
+
+def _apply_rows(scope, rows):
+    states = {
+        (state.object_id, state.version): state
+        for state in RollupState.objects.filter(
+            scope=scope,
+            object_id__in={row[3] for row in rows},
+        )
+    }
+    days = defaultdict(Counter)
+    changed = set()
+    applied = 0
+
+    for row in rows:
+        pk, created_at, status_type, object_id = row[:4]
+        key = (object_id, row[4] if len(row) > 4 else '')
+        state = states.get(key)
+
+        # counted already, or written late behind the processed rows
+        if state is not None and (
+                (created_at, pk) <= (state.changed_at, state.row_id)):
+            continue
+
+        counters = days[key + (created_at.date(),)]
+
+        counters['total'] += 1
+        if status_type == constants.STATUS_SUCCESS:
+            counters['succeeded'] += 1
+        elif status_type == constants.STATUS_FAIL:
+            counters['failed'] += 1
+
+        if state is None:
+            state = states[key] = RollupState(
+                scope=scope, object_id=key[0], version=key[1])
+        else:
+            _add_duration(days, key, state.status_type,
+                          state.changed_at, created_at)
+
+            if (state.failing_since and
+                    status_type == constants.STATUS_SUCCESS):
+                counters['recoveries'] += 1
+                counters['recovery_seconds'] += _seconds(
+                    created_at - state.failing_since)
+
+        if status_type == constants.STATUS_FAIL:
+            state.failing_since = state.failing_since or created_at
+        elif status_type == constants.STATUS_SUCCESS:
+            state.failing_since = None
+
+        state.status_type = status_type
+        state.changed_at = created_at
+        state.row_id = pk
+        changed.add(key)
+        applied += 1
+
+    for key in changed:
+        states[key].save()
+
+    for (object_id, version, day), counters in days.items():
+        _add_to_rollup(scope, object_id, version, day, counters)
+
+    return applied
+
+
+def _add_duration(days, key, status_type, start, end):
+    """Splits the time spent in the status type by days."""
+    field = DailyRollup.SECONDS_FIELDS.get(status_type)
+
+    while field and start < end:
+        next_day = timezone.make_aware(
+            datetime.combine(start.date() + timedelta(days=1), time()),
+            timezone.utc)
+        days[key + (start.date(),)][field] += _seconds(
+            min(end, next_day) - start)
+        start = next_day
+
+
+def _add_to_rollup(scope, object_id, version, day, counters):
+    lookup = {
+        'scope': scope,
+        'object_id': object_id,
+        'version': version,
+        'day': day,
+    }
+
+    updated = DailyRollup.objects.filter(**lookup).update(**{
+        field: models.F(field) + value
+        for field, value in counters.items()
+    })
+
+    if not updated:
+        lookup.update(counters)
+        DailyRollup.objects.create(**lookup)
+
+
+def _seconds(delta):
+    return int(delta.total_seconds())
+
+
+def _timestamp(moment):
+    return calendar.timegm(moment.utctimetuple())
+
+
+def _from_timestamp(value):
+    return timezone.make_aware(datetime.utcfromtimestamp(value), timezone.utc)
+
+
+def summarize(scope, days, object_ids=None):
+    """Reliability summaries of the scope objects for the last days.
+
+    Returns a dict of summaries keyed by `(object_id, version)`.
+    """
+    since = timezone.now().date() - timedelta(days=days - 1)
+    queryset = DailyRollup.objects.filter(scope=scope, day__gte=since)
+
+    if object_ids is not None:
+        queryset = queryset.filter(object_id__in=object_ids)
+
+    rows = queryset.order_by().values('object_id', 'version').annotate(
+        **{field: models.Sum(field) for field in COUNTER_FIELDS})
+
+    return {
+        (row['object_id'], row['version']): _summary(row) for row in rows
+    }
+
+
+def daily_series(scope, object_id, days, version=''):
+    """Summaries of every day of the last days, oldest first."""
+    since = timezone.now().date() - timedelta(days=days - 1)
+
+    return [
+        dict(_summary(row), day=row['day'])
+        for row in DailyRollup.objects.filter(
+            scope=scope,
+            object_id=object_id,
+            version=version,
+            day__gte=since,
+        ).order_by('day').values('day', *COUNTER_FIELDS)
+    ]
+
+
+def _summary(row):
+    summary = {field: row[field] for field in COUNTER_FIELDS}
+    rated_seconds = row['success_seconds'] + row['fail_seconds']
+    summary['pass_rate'] = (
+        float(row['success_seconds']) / rated_seconds
+        if rated_seconds else None)
+    summary['mttr_seconds'] = (
+        row['recovery_seconds'] // row['recoveries']
+        if row['recoveries'] else None)
+
+    return summary
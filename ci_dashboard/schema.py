@@ -0,0 +1,83 @@
+"""Validation of the seeds against the import json schema.
+
+The schema is read and its validator is built once per process, when the
+first seeds are validated.
+"""
+
+from __future__ import unicode_literals
+
+import json
+import logging
+import threading
+
+import jsonschema
+
+from django.conf import settings
+
+LOGGER = logging.getLogger(__name__)
+
+_VALIDATOR = None
+_LOCK = threading.Lock()
+
+
+def _load_schema(path):
+    try:
+        with open(path) as f:
+            return json.loads(f.read())
+    except IOError as exc:
+        LOGGER.error(
+            'Can not read `schema.json` file for import validation: %s', exc)
+    except ValueError as exc:
+        LOGGER.error('Can not parse `schema.json` file %s', exc)
+    return None
+
+
+def get_validator():
+    """The cached seeds validator, None when the schema is broken."""
+    global _VALIDATOR
+
+    if _VALIDATOR is None:
+        with _LOCK:
+            if _VALIDATOR is None:
+                _VALIDATOR = _build_validator(settings.JSON_SCHEMA_PATH)
+
+    return _VALIDATOR
+
+
+def _build_validator(path):
+    schema = _load_schema(path)
+    if schema is None:
+        return None
+
+    validator_class = jsonschema.validators.validator_for(schema)
+
+    try:
+        validator_class.check_schema(schema)
+    except jsonschema.SchemaError as exc:
+        LOGGER.error('Invalid `schema.json` file: %s', exc)
+        return None
+
+    return validator_class(schema)
+
+
+def reset_validator():
+    global _VALIDATOR
+
+    with _LOCK:
+        _VALIDATOR = None
+
+
+def schema_errors(seeds, validator):
+    """Messages of all the schema violations of the seeds."""
+    errors = sorted(
+        validator.iter_errors(seeds),
+        key=lambda error: ['%s' % part for part in error.absolute_path],
+    )
+
+    return [
+        '%s (at %s)' % (
+            error.message,
+            '/'.join('%s' % part for part in error.absolute_path) or 'root',
+        )
+        for error in errors
+    ]
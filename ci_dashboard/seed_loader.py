@@ -0,0 +1,310 @@
+"""Loading of the seeds from one or several YAML files.
+
+The seeds are parsed with the libyaml based loader when PyYAML is built
+with it. Every `sources.jenkins` entry is composed and constructed on its
+own, so the node tree of a big file is never kept as a whole. The seeds
+of several files, or of several documents of one file, are merged into
+one seeds dict.
+
+`SeedsWatcher` keeps the seeds of every file and parses again only the
+files changed since it looked at them last time. The merged seeds of all
+the files are imported as a whole: the importer compares them with every
+CI system and product in the database and writes the differences.
+"""
+
+from __future__ import unicode_literals
+
+import copy
+import logging
+import os
+
+from collections import OrderedDict
+
+import yaml
+
+LOGGER = logging.getLogger(__name__)
+
+Loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+SEED_EXTENSIONS = ('.yaml', '.yml')
+
+
+def seed_paths(paths):
+    """The seed files of the paths, directories are expanded.
+
+    The YAML files of a directory are listed in the order of their names.
+    """
+    result = []
+
+    for path in paths:
+        if os.path.isdir(path):
+            result.extend(
+                os.path.join(path, name)
+                for name in sorted(os.listdir(path))
+                if name.endswith(SEED_EXTENSIONS)
+            )
+        else:
+            result.append(path)
+
+    return result
+
+
+def load_files(paths):
+    """The merged seeds of the files and of the directories of `paths`.
+
+    IOError and YAMLError are raised when some file can not be read.
+    """
+    return merge(_load_file(path) for path in seed_paths(paths))
+
+
+def _load_file(path):
+    with open(path, 'rb') as f:
+        return load(f)
+
+
+def load_streams(streams):
+    """The merged seeds of the streams."""
+    return merge(load(stream) for stream in streams)
+
+
+def load(stream):
+    """The merged seeds of all the documents of the stream."""
+    reader = _SeedsReader(stream)
+
+    try:
+        return merge(reader.documents())
+    finally:
+        reader.dispose()
+
+
+def merge(documents):
+    """Merges the seeds, lists are joined and mappings are merged.
+
+    None when there are no seeds at all.
+    """
+    result = None
+
+    for seeds in documents:
+        if seeds is None:
+            continue
+        result = seeds if result is None else _merge(result, seeds)
+
+    return result
+
+
+def _merge(target, value):
+    if isinstance(target, dict) and isinstance(value, dict):
+        for key, item in value.items():
+            target[key] = (
+                _merge(target[key], item) if key in target else item)
+        return target
+
+    if isinstance(target, list) and isinstance(value, list):
+        target.extend(value)
+        return target
+
+    return value
+
+
+class SeedsWatcher(object):
+    """Merged seeds of the files which are parsed again when changed.
+
+    A file is changed when its modification time or size differs, the
+    files added to or removed from the watched directories are noticed
+    as well. Only the parsing is saved for the unchanged files, their
+    seeds are still part of every import.
+    """
+
+    def __init__(self, paths):
+        self.paths = paths
+        self.stamps = OrderedDict()
+        self.seeds = {}
+        self.broken = set()
+
+    def poll(self):
+        """The merged seeds if some file was changed since the last poll.
+
+        None when nothing was changed, when there are no seeds left or
+        while some file can not be parsed, the seeds without that file
+        would deactivate its objects.
+        """
+        stamps = OrderedDict()
+        for path in seed_paths(self.paths):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                # removed after the directory was listed
+                continue
+            stamps[path] = (stat.st_mtime, stat.st_size)
+
+        if stamps == self.stamps:
+            return None
+
+        changed = [
+            path for path, stamp in stamps.items()
+            if self.stamps.get(path) != stamp
+        ]
+        self.stamps = stamps
+
+        for path in set(self.seeds) - set(stamps):
+            del self.seeds[path]
+        self.broken &= set(stamps)
+
+        for path in changed:
+            try:
+                self.seeds[path] = _load_file(path)
+            except (IOError, OSError, yaml.YAMLError) as exc:
+                LOGGER.error(
+                    'The file %s could not be parsed: %s', path, exc)
+                self.seeds.pop(path, None)
+                self.broken.add(path)
+            else:
+                self.broken.discard(path)
+
+        if self.broken:
+            return None
+
+        # merge joins the lists of the first seeds in place
+        return merge(copy.deepcopy(self.seeds[path]) for path in stamps)
+
+
+class _SeedsReader(object):
+    """Builds the seeds documents from the events of the loader.
+
+    The composer of the loader builds the nodes of the whole document
+    before they are constructed, here the nodes are composed from the
+    parser events and constructed one `sources.jenkins` entry at a time.
+    """
+
+    def __init__(self, stream):
+        self.loader = Loader(stream)
+        self.anchors = {}
+
+    def dispose(self):
+        self.loader.dispose()
+
+    def documents(self):
+        loader = self.loader
+        # StreamStartEvent
+        loader.get_event()
+
+        while not loader.check_event(yaml.StreamEndEvent):
+            # DocumentStartEvent
+            loader.get_event()
+            yield self._mapping(self._document_item)
+            # DocumentEndEvent
+            loader.get_event()
+            self.anchors = {}
+
+        loader.get_event()
+
+    def _mapping(self, item):
+        """Constructs the mapping key by key, other nodes as a whole."""
+        loader = self.loader
+
+        if not loader.check_event(yaml.MappingStartEvent):
+            return self._construct()
+
+        event = loader.get_event()
+        if event.anchor is not None or event.tag not in (None, '!'):
+            # anchored or tagged mappings are left to the constructor
+            return loader.construct_document(self._mapping_node(event))
+
+        result = {}
+        while not loader.check_event(yaml.MappingEndEvent):
+            key = self._construct()
+            result[key] = item(key)
+        loader.get_event()
+
+        return result
+
+    def _document_item(self, key):
+        if key == 'sources':
+            return self._mapping(self._source_item)
+        return self._construct()
+
+    def _source_item(self, key):
+        loader = self.loader
+
+        if key != 'jenkins' or not loader.check_event(
+            yaml.SequenceStartEvent
+        ):
+            return self._construct()
+
+        event = loader.get_event()
+        if event.anchor is not None:
+            return loader.construct_document(self._sequence_node(event))
+
+        entries = []
+        while not loader.check_event(yaml.SequenceEndEvent):
+            entries.append(self._construct())
+        loader.get_event()
+
+        return entries
+
+    def _construct(self):
+        return self.loader.construct_document(self._node())
+
+    def _node(self):
+        loader = self.loader
+        event = loader.get_event()
+
+        if isinstance(event, yaml.AliasEvent):
+            if event.anchor not in self.anchors:
+                raise yaml.composer.ComposerError(
+                    None, None, 'found undefined alias %r' % event.anchor,
+                    event.start_mark)
+            return self.anchors[event.anchor]
+
+        if isinstance(event, yaml.ScalarEvent):
+            tag = event.tag
+            if tag is None or tag == '!':
+                tag = loader.resolve(
+                    yaml.ScalarNode, event.value, event.implicit)
+            node = yaml.ScalarNode(
+                tag, event.value, event.start_mark, event.end_mark,
+                style=event.style)
+            self._anchor(event, node)
+            return node
+
+        if isinstance(event, yaml.SequenceStartEvent):
+            return self._sequence_node(event)
+
+        return self._mapping_node(event)
+
+    def _sequence_node(self, event):
+        loader = self.loader
+        tag = event.tag
+        if tag is None or tag == '!':
+            tag = loader.resolve(yaml.SequenceNode, None, event.implicit)
+
+        node = yaml.SequenceNode(
+            tag, [], event.start_mark, None, flow_style=event.flow_style)
+        self._anchor(event, node)
+
+        while not loader.check_event(yaml.SequenceEndEvent):
+            node.value.append(self._node())
+        node.end_mark = loader.get_event().end_mark
+
+        return node
+
+    def _mapping_node(self, event):
+        loader = self.loader
+        tag = event.tag
+        if tag is None or tag == '!':
+            tag = loader.resolve(yaml.MappingNode, None, event.implicit)
+
+        node = yaml.MappingNode(
+            tag, [], event.start_mark, None, flow_style=event.flow_style)
+        self._anchor(event, node)
+
+        while not loader.check_event(yaml.MappingEndEvent):
+            key = self._node()
+            node.value.append((key, self._node()))
+        node.end_mark = loader.get_event().end_mark
+
+        return node
+
+    def _anchor(self, event, node):
+        if event.anchor is not None:
+            self.anchors[event.anchor] = node
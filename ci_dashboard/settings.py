@@ -9,15 +9,11 @@ https://docs.djangoproject.com/en/1.6/ref/settings/
 """
 
 import os
-import logging
-import json
 
 import site_settings
 
 from django.contrib.messages import constants as messages
 
-LOGGER = logging.getLogger(__name__)
-
 PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
 
 STATIC_URL = '/static/'
@@ -142,23 +138,58 @@ CELERY_ENABLE_UTC = True
 
 STAFF_GROUPS = ('ci', 'devops-all')
 
+# `last_sync` timestamp rendered on every page
+LAST_SYNC_CACHE_TIMEOUT = 60  # seconds, shared cache
+LAST_SYNC_LOCAL_CACHE_TIMEOUT = 30  # seconds, process memory
+
+# `Token` header authentication, token to user id mapping kept in the
+# memory of every process. Revoked or regenerated tokens keep working in
+# the other processes for up to this delay.
+TOKEN_LOCAL_CACHE_TIMEOUT = 30  # seconds
+TOKEN_LOCAL_CACHE_SIZE = 1000
+
+# staff groups membership checks, cached per user between the requests.
+# Without a shared cache the other processes see the changes of the user
+# or of the groups for up to this delay.
+STAFF_CHECK_CACHE_TIMEOUT = 60  # seconds
+
+# History retention, see ci_dashboard.retention for the policies format
+HISTORY_RETENTION = {
+    'status': {'keep_all_days': 30, 'keep_changes_days': 365},
+    'product_ci_status': {'keep_all_days': 30, 'keep_changes_days': 365},
+    'status_event': {'keep_all_days': 7},
+    'import_job': {'keep_all_days': 30},
+}
+HISTORY_RETENTION_BATCH_SIZE = 1000
+
+# History export, rows read from the database at once
+EXPORT_CHUNK_SIZE = 2000
+
+# Daily reliability rollups
+ROLLUPS_BATCH_SIZE = 1000
+ROLLUPS_OVERLAP = 900  # seconds, rows committed later than their created_at
 
-def _load_schema(path):
-    try:
-        with open(path) as f:
-            return json.loads(f.read())
-    except IOError as exc:
-        LOGGER.error(
-            'Can not read `schema.json` file for import validation: %s', exc)
-    except ValueError as exc:
-        LOGGER.error('Can not parse `schema.json` file %s', exc)
-    return None
+# Periods in days the reliability and timeline pages could show
+REPORT_DAYS = (7, 30, 90)
+SPARKLINE_DAYS = 7
 
+# Flaky rules detection
+FLAKINESS_WINDOW = 30  # latest builds of a rule scored, at most 62
+FLAKY_RULES_LIMIT = 5  # flaky rules shown per CI or product
 
+# Live dashboard updates, polled from the events API
+LIVE_UPDATES_INTERVAL = 10  # seconds between the polls of a dashboard
+
+# Status events delivery to the webhooks
+WEBHOOKS_BATCH_SIZE = 100  # events posted in one request
+WEBHOOKS_TIMEOUT = 10  # seconds
+WEBHOOKS_LOCK_TIMEOUT = 300  # seconds, guards against overlapping runs
+
+
+# The seeds import schema, read when the first import is validated
 SCHEMA_PATH = os.path.join(os.path.dirname(__file__), 'schema.json')
 DEFAULT_SCHEMA_PATH = '/usr/share/ci-status/schema.json'
-
-JSON_SCHEMA = _load_schema(
+JSON_SCHEMA_PATH = (
     SCHEMA_PATH if os.path.exists(SCHEMA_PATH) else DEFAULT_SCHEMA_PATH
 )
 
@@ -3,7 +3,9 @@ from __future__ import absolute_import
 import logging
 from celery import shared_task
 
-from ci_dashboard.models import CiSystem, ProductCi, update_last_sync_timestamp
+from ci_dashboard import retention, rollups, webhooks
+from ci_dashboard.models import CiSystem, ImportJob, ProductCi
+from ci_dashboard.models import update_last_sync_timestamp
 
 LOGGER = logging.getLogger(__name__)
 
@@ -15,6 +17,29 @@ def synchronize():
     update_last_sync_timestamp()
 
 
+@shared_task(ignore_result=True)
+def apply_history_retention():
+    deleted = retention.apply_retention()
+    LOGGER.info('History retention deleted rows: %s', deleted)
+
+
+@shared_task(ignore_result=True)
+def update_rollups():
+    processed = rollups.update_rollups()
+    LOGGER.info('Rolled up rows: %s', processed)
+
+
+@shared_task(ignore_result=True)
+def dispatch_webhooks():
+    delivered = webhooks.dispatch()
+    LOGGER.info('Status events delivered to webhooks: %s', delivered)
+
+
+@shared_task(ignore_result=True)
+def run_import_job(job_id):
+    ImportJob.objects.get(pk=job_id).run()
+
+
 def _update_cis():
     ci_systems = CiSystem.objects.filter(is_active=True)
 
@@ -1,7 +1,6 @@
 from django import template
-from django.conf import settings
 
-from ci_dashboard import constants
+from ci_dashboard import constants, permissions
 
 from ci_dashboard.models import Status
 
@@ -29,14 +28,7 @@ def status_color(status):
 
 @register.filter(name='can_manage_statuses')
 def can_manage_statuses(user):
-    if getattr(user, 'ldap_user', None):  # ldap users should have ldap groups
-        return bool(set(settings.STAFF_GROUPS) & user.ldap_user.group_names)
-
-    # all others should belong to django group (if added manually)
-    # or be the superuser
-    return bool(
-        set(settings.STAFF_GROUPS) & {g.name for g in user.groups.all()}
-    ) or user.is_superuser
+    return permissions.can_manage_statuses(user)
 
 
 @register.filter('fieldtype')
@@ -80,3 +72,23 @@ def badge_code_by_color(color):
         result = 'E'
 
     return result
+
+
+@register.filter(name='percentage')
+def percentage(value):
+    return '-' if value is None else '{:.1f}%'.format(value * 100)
+
+
+@register.filter(name='duration')
+def duration(seconds):
+    if seconds is None:
+        return '-'
+
+    minutes, _ = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    days, hours = divmod(hours, 24)
+
+    if days:
+        return '{}d {}h'.format(days, hours)
+
+    return '{}h {}m'.format(hours, minutes)
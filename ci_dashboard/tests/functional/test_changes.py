@@ -0,0 +1,70 @@
+import json
+
+from django.core.urlresolvers import reverse
+from django.test import Client, TestCase
+
+from ci_dashboard.models import CiSystem, Rule, RuleCheck, Status
+
+
+class ChangesFunctionalTests(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.ci = CiSystem.objects.create(url='http://localhost/')
+
+    def _get_changes(self, **params):
+        response = self.client.get(reverse('api_changes'), params)
+        self.assertEqual(response.status_code, 200)
+        return json.loads(response.content)['data']
+
+    def test_returns_all_rows_without_cursor(self):
+        status = Status.objects.create(summary='Auto', ci_system=self.ci)
+        rule = Rule.objects.create(name='kilo', ci_system=self.ci)
+        rule_check = RuleCheck.objects.create(rule=rule)
+        rule_check.status.add(status)
+
+        data = self._get_changes()
+
+        self.assertEqual([s['id'] for s in data['statuses']], [status.pk])
+        self.assertEqual(data['product_statuses'], [])
+        self.assertEqual(data['rule_checks'][0]['statuses'], [status.pk])
+        self.assertFalse(data['has_more'])
+
+    def test_cursor_returns_only_new_changes(self):
+        Status.objects.create(summary='Old', ci_system=self.ci)
+        cursor = self._get_changes()['cursor']
+
+        new_status = Status.objects.create(summary='New', ci_system=self.ci)
+        data = self._get_changes(cursor=cursor)
+
+        self.assertEqual([s['id'] for s in data['statuses']], [new_status.pk])
+
+        data = self._get_changes(cursor=data['cursor'])
+        self.assertEqual(data['statuses'], [])
+
+    def test_changed_rows_are_returned_again(self):
+        status = Status.objects.create(summary='Auto', ci_system=self.ci)
+        cursor = self._get_changes()['cursor']
+
+        status.summary = 'Edited'
+        status.save()
+        data = self._get_changes(cursor=cursor)
+
+        self.assertEqual(data['statuses'][0]['summary'], 'Edited')
+
+    def test_limit_sets_has_more(self):
+        for _ in range(3):
+            Status.objects.create(summary='Auto', ci_system=self.ci)
+
+        data = self._get_changes(limit=2)
+        self.assertTrue(data['has_more'])
+        self.assertEqual(len(data['statuses']), 2)
+
+        data = self._get_changes(limit=2, cursor=data['cursor'])
+        self.assertEqual(len(data['statuses']), 1)
+
+    def test_invalid_cursor_is_rejected(self):
+        response = self.client.get(reverse('api_changes'), {'cursor': '!'})
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.get(reverse('api_changes'), {'since': 'now'})
+        self.assertEqual(response.status_code, 400)
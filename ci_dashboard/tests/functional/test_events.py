@@ -0,0 +1,50 @@
+import json
+
+from django.core.urlresolvers import reverse
+from django.test import Client, TestCase
+
+from ci_dashboard.models import CiSystem, StatusEvent
+
+
+class EventsFunctionalTests(TestCase):
+    def setUp(self):
+        self.client = Client()
+        ci = CiSystem.objects.create(url='http://localhost/', is_active=True)
+        status = ci.status_set.create(summary='Auto')
+        self.events = [
+            StatusEvent.publish_ci_status(status) for _ in range(3)
+        ]
+
+    def _get_events(self, **params):
+        response = self.client.get(reverse('api_events'), params)
+        self.assertEqual(response.status_code, 200)
+        return json.loads(response.content)['data']
+
+    def test_events_read_after_last_id(self):
+        data = self._get_events(limit=2)
+
+        self.assertEqual(
+            [event['id'] for event in data['events']],
+            [self.events[0].pk, self.events[1].pk]
+        )
+        self.assertTrue(data['has_more'])
+
+        data = self._get_events(after=data['last_id'])
+        self.assertEqual(
+            [event['id'] for event in data['events']], [self.events[2].pk])
+        self.assertFalse(data['has_more'])
+
+        data = self._get_events(after=data['last_id'])
+        self.assertEqual(data['events'], [])
+        self.assertEqual(data['last_id'], self.events[2].pk)
+
+    def test_invalid_position_is_rejected(self):
+        response = self.client.get(reverse('api_events'), {'after': 'x'})
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_dashboard_polls_after_latest_event(self):
+        response = self.client.get(reverse('ci_dashboard_dashboard'))
+
+        self.assertContains(
+            response, 'data-last-event-id="{}"'.format(self.events[-1].pk))
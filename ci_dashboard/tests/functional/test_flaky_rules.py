@@ -0,0 +1,33 @@
+import json
+
+from django.core.urlresolvers import reverse
+from django.test import Client, TestCase
+
+from ci_dashboard.models import CiSystem, RuleFlakiness
+
+
+class FlakyRulesFunctionalTests(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.ci = CiSystem.objects.create(url='http://localhost/',
+                                          is_active=True)
+        rule = self.ci.rule_set.create(name='kilo', is_active=True)
+        RuleFlakiness.objects.create(
+            rule=rule, outcomes=0b10, size=2, last_build_number=2, score=1)
+
+    def test_flaky_rules_api_returns_top_rules_of_ci(self):
+        response = self.client.get(
+            reverse('api_flaky_rules'), {'ci': self.ci.pk})
+        self.assertEqual(response.status_code, 200)
+
+        data = json.loads(response.content)['data']
+        self.assertEqual(data['products'], {})
+        self.assertEqual(
+            [(r['name'], r['score'], r['failures'])
+             for r in data['ci_systems'][str(self.ci.pk)]],
+            [('kilo', 1, 1)]
+        )
+
+    def test_flaky_rules_api_validates_limit(self):
+        response = self.client.get(reverse('api_flaky_rules'), {'limit': 0})
+        self.assertEqual(response.status_code, 400)
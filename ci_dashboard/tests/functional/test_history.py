@@ -0,0 +1,89 @@
+import json
+
+from django.contrib.auth.models import User
+from django.core.urlresolvers import reverse
+from django.test import Client, TestCase
+
+from ci_dashboard.constants import STATUS_FAIL, STATUS_SUCCESS
+from ci_dashboard.models import CiSystem, Status
+
+
+class HistoryFunctionalTests(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.ci = CiSystem.objects.create(url='http://localhost/')
+        self.statuses = [
+            Status.objects.create(
+                summary=str(number),
+                ci_system=self.ci,
+                status_type=STATUS_FAIL if number % 2 else STATUS_SUCCESS
+            )
+            for number in range(5)
+        ]
+
+    def _get_history(self, **params):
+        response = self.client.get(
+            reverse('api_history', kwargs={'pk': self.ci.pk}), params)
+        self.assertEqual(response.status_code, 200)
+        return json.loads(response.content)['data']
+
+    def test_history_pages_newest_first(self):
+        data = self._get_history(limit=2)
+
+        self.assertEqual([s['summary'] for s in data['statuses']], ['4', '3'])
+        self.assertIsNone(data['newer'])
+
+        data = self._get_history(limit=2, before=data['older'])
+        self.assertEqual([s['summary'] for s in data['statuses']], ['2', '1'])
+
+        data = self._get_history(limit=2, before=data['older'])
+        self.assertEqual([s['summary'] for s in data['statuses']], ['0'])
+        self.assertIsNone(data['older'])
+
+        data = self._get_history(limit=2, after=data['newer'])
+        self.assertEqual([s['summary'] for s in data['statuses']], ['2', '1'])
+        self.assertIsNotNone(data['newer'])
+
+    def test_history_filtered_by_status_type(self):
+        data = self._get_history(status_type=STATUS_FAIL)
+
+        self.assertEqual([s['summary'] for s in data['statuses']], ['3', '1'])
+
+    def test_history_filtered_by_dates(self):
+        data = self._get_history(**{'from': '2000-01-01', 'to': '2000-01-02'})
+
+        self.assertEqual(data['statuses'], [])
+
+    def test_invalid_cursor_is_rejected(self):
+        response = self.client.get(
+            reverse('api_history', kwargs={'pk': self.ci.pk}),
+            {'before': 'invalid'})
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_history_page(self):
+        response = self.client.get(
+            reverse('ci_status_history', kwargs={'pk': self.ci.pk}))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['statuses']), 5)
+        self.assertIsNone(response.context['older'])
+
+    def test_history_export_requires_authentication(self):
+        response = self.client.get(
+            reverse('api_export_history', kwargs={'source': 'statuses'}))
+
+        self.assertEqual(response.status_code, 401)
+
+    def test_history_export_streams_rows(self):
+        User.objects.create_user('tempo', 'temporary@gmail.com', 'tempo')
+        self.client.login(username='tempo', password='tempo')
+
+        response = self.client.get(
+            reverse('api_export_history', kwargs={'source': 'statuses'}),
+            {'format': 'csv'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(
+            len(b''.join(response.streaming_content).splitlines()), 6)
@@ -0,0 +1,100 @@
+import json
+
+import mock
+
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.urlresolvers import reverse
+from django.test import Client, TestCase
+
+from ci_dashboard import constants
+from ci_dashboard.models import CiSystem, ImportJob
+
+SEEDS = b"""
+sources:
+  jenkins:
+    - url: https://product-ci.abc.net/
+      query:
+        jobs: []
+"""
+
+
+class ImportJobsFunctionalTests(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_superuser(
+            'tempo', 'temporary@gmail.com', 'tempo')
+
+    @mock.patch('ci_dashboard.tasks.run_import_job.delay')
+    def test_import_file_queues_job(self, delay):
+        self.client.login(username='tempo', password='tempo')
+
+        response = self.client.post(
+            reverse('import_file'),
+            {'file': SimpleUploadedFile('seeds.yaml', SEEDS)},
+            HTTP_ACCEPT='application/json',
+        )
+
+        job = ImportJob.objects.get()
+        self.assertEqual(json.loads(response.content.decode('utf-8')), {
+            'status': 'queued',
+            'job_id': job.pk,
+            'status_url': reverse('api_import_job', args=[job.pk]),
+        })
+        self.assertEqual(job.user, self.user)
+        self.assertEqual(job.state, constants.IMPORT_PENDING)
+        delay.assert_called_once_with(job.pk)
+
+    @mock.patch('ci_dashboard.tasks.run_import_job.delay')
+    def test_import_file_api_returns_plan(self, delay):
+        response = self.client.post(reverse('api_import_file'), {
+            'file': SimpleUploadedFile('seeds.yaml', SEEDS),
+            'username': 'tempo',
+            'password': 'tempo',
+            'plan': '1',
+        })
+
+        self.assertEqual(response.status_code, 200)
+        plan = json.loads(response.content.decode('utf-8'))['data']['plan']
+        self.assertEqual(sorted(plan), [
+            'cis', 'errors', 'product_rules', 'products', 'rules'])
+        self.assertFalse(ImportJob.objects.exists())
+        self.assertFalse(CiSystem.objects.exists())
+        self.assertFalse(delay.called)
+
+    @mock.patch('ci_dashboard.tasks.run_import_job.delay')
+    def test_import_file_api_false_plan_queues_job(self, delay):
+        response = self.client.post(reverse('api_import_file'), {
+            'file': SimpleUploadedFile('seeds.yaml', SEEDS),
+            'username': 'tempo',
+            'password': 'tempo',
+            'plan': 'false',
+        })
+
+        self.assertEqual(response.status_code, 202)
+        delay.assert_called_once_with(ImportJob.objects.get().pk)
+
+    def test_import_job_status_requires_authentication(self):
+        job = ImportJob.objects.create(seeds='{}')
+
+        response = self.client.get(reverse('api_import_job', args=[job.pk]))
+
+        self.assertEqual(response.status_code, 401)
+
+    def test_import_job_status_is_shown_to_its_author(self):
+        author = User.objects.create_user('author', 'a@gmail.com', 'author')
+        User.objects.create_user('other', 'o@gmail.com', 'other')
+        job = ImportJob.objects.create(
+            seeds='{}', user=author, cis_total=3, cis_processed=1)
+        url = reverse('api_import_job', args=[job.pk])
+
+        self.client.login(username='other', password='other')
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+        self.client.login(username='author', password='author')
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.content.decode('utf-8'))['data']
+        self.assertEqual(data['state'], constants.IMPORT_PENDING)
+        self.assertEqual((data['cis_total'], data['cis_processed']), (3, 1))
@@ -0,0 +1,45 @@
+import json
+
+from django.core.urlresolvers import reverse
+from django.test import Client, TestCase
+
+from ci_dashboard.constants import ROLLUP_CI_SYSTEM, STATUS_FAIL
+from ci_dashboard.constants import STATUS_SUCCESS
+from ci_dashboard.models import CiSystem, Status
+from ci_dashboard.rollups import update_rollups
+
+
+class ReliabilityFunctionalTests(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.ci = CiSystem.objects.create(url='http://localhost/',
+                                          is_active=True)
+
+        for status_type in (STATUS_SUCCESS, STATUS_FAIL, STATUS_SUCCESS):
+            Status.objects.create(summary='Auto', ci_system=self.ci,
+                                  status_type=status_type)
+        update_rollups()
+
+    def test_reliability_api_returns_summary_and_series(self):
+        response = self.client.get(reverse('api_reliability', kwargs={
+            'scope': ROLLUP_CI_SYSTEM, 'pk': self.ci.pk,
+        }), {'days': 7})
+        self.assertEqual(response.status_code, 200)
+
+        data = json.loads(response.content)['data']
+        self.assertEqual(data['days'], 7)
+        self.assertEqual(data['summary']['total'], 3)
+        self.assertEqual(data['summary']['recoveries'], 1)
+        self.assertEqual(len(data['daily']), 1)
+
+    def test_reliability_api_rejects_unknown_scope(self):
+        response = self.client.get(reverse('api_reliability', kwargs={
+            'scope': 'unknown', 'pk': self.ci.pk,
+        }))
+        self.assertEqual(response.status_code, 404)
+
+    def test_reliability_page_lists_ci_systems(self):
+        response = self.client.get(reverse('reliability'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, self.ci.url)
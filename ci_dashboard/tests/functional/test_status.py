@@ -1,8 +1,12 @@
+import json
+
 from django.contrib.auth.models import User
 from django.core.urlresolvers import reverse
 from django.test import Client, TestCase
 
-from ci_dashboard.models import CiSystem, Status
+from ci_dashboard.constants import STATUS_FAIL, STATUS_SUCCESS
+from ci_dashboard.models import CiSystem, Status, StatusEvent, StatusTransition
+from ci_dashboard.models import UserToken
 
 
 class StatusFunctionalTests(TestCase):
@@ -40,3 +44,98 @@ class StatusFunctionalTests(TestCase):
             'status_type': 1
         })
         self.assertRedirects(response, reverse('admin:login') + '?next=' + reverse('status_new'))
+
+
+class StatusesBulkFunctionalTests(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.ci = CiSystem.objects.create(url='http://localhost/')
+        self.user = User.objects.create_superuser(
+            'tempo', 'temporary@gmail.com', 'tempo')
+        self.token = UserToken.objects.create(user=self.user).token
+
+    def _post(self, data, **headers):
+        return self.client.post(
+            reverse('api_statuses'), json.dumps(data),
+            content_type='application/json', **headers)
+
+    def test_statuses_are_created_with_token(self):
+        response = self._post({'statuses': [
+            {'ci_system': self.ci.pk, 'status_type': 2, 'summary': 'down'},
+            {'ci_system': self.ci.pk, 'status_type': 1, 'summary': 'up'},
+        ]}, HTTP_TOKEN=self.token.hex)
+
+        self.assertEqual(response.status_code, 201)
+        data = json.loads(response.content.decode('utf-8'))['data']
+        self.assertEqual(
+            [status['id'] for status in data['statuses']],
+            list(Status.objects.values_list('id', flat=True))
+        )
+        self.assertTrue(all(
+            status['user'] == self.user.pk and status['is_manual']
+            for status in data['statuses']
+        ))
+
+    def test_statuses_require_authentication(self):
+        response = self._post({'statuses': [
+            {'ci_system': self.ci.pk, 'status_type': 2, 'summary': 'down'},
+        ]})
+
+        self.assertEqual(response.status_code, 401)
+        self.assertFalse(Status.objects.exists())
+
+    def test_session_requests_are_checked_for_csrf(self):
+        self.client = Client(enforce_csrf_checks=True)
+        self.client.login(username=self.user.username, password='tempo')
+        statuses = {'statuses': [
+            {'ci_system': self.ci.pk, 'status_type': 2, 'summary': 'down'},
+        ]}
+
+        self.assertEqual(self._post(statuses).status_code, 403)
+        self.assertFalse(Status.objects.exists())
+
+        response = self._post(statuses, HTTP_TOKEN=self.token.hex)
+        self.assertEqual(response.status_code, 201)
+
+    def test_invalid_batch_is_rejected(self):
+        response = self._post({'statuses': [
+            {'ci_system': self.ci.pk, 'status_type': 2, 'summary': 'down'},
+            {'ci_system': self.ci.pk, 'status_type': 2},
+        ]}, HTTP_TOKEN=self.token.hex)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertTrue(json.loads(
+            response.content.decode('utf-8'))['errors'][0].startswith(
+                'Status #1:'))
+        self.assertFalse(Status.objects.exists())
+
+
+class StatusAdminFunctionalTests(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.ci = CiSystem.objects.create(url='http://localhost/')
+        user = User.objects.create_superuser(
+            'tempo', 'temporary@gmail.com', 'tempo')
+        self.client.login(username=user.username, password='tempo')
+
+    def test_deleted_statuses_leave_the_timeline(self):
+        passed = Status.objects.create(
+            summary='Auto', ci_system=self.ci, status_type=STATUS_SUCCESS)
+        failed = Status.objects.create(
+            summary='Auto', ci_system=self.ci, status_type=STATUS_FAIL)
+        for status in (passed, failed):
+            StatusTransition.record(status)
+
+        self.client.post(reverse('admin:ci_dashboard_status_changelist'), {
+            'action': 'delete_selected',
+            '_selected_action': [failed.pk],
+            'post': 'yes',
+        })
+
+        self.assertEqual(
+            list(StatusTransition.objects.values_list(
+                'status_type', 'ended_at')),
+            [(STATUS_SUCCESS, None)]
+        )
+        self.assertEqual(StatusEvent.objects.get().payload()['status'],
+                         passed.pk)
@@ -0,0 +1,38 @@
+from django.core.urlresolvers import reverse
+from django.test import Client, TestCase
+
+from ci_dashboard.constants import STATUS_FAIL
+from ci_dashboard.models import CiSystem, ProductCi, StatusTransition
+
+
+class TimelineFunctionalTests(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.ci = CiSystem.objects.create(url='http://localhost/',
+                                          is_active=True)
+        StatusTransition.record(self.ci.status_set.create(
+            summary='Auto', status_type=STATUS_FAIL))
+
+    def test_ci_timeline_shows_intervals(self):
+        response = self.client.get(
+            reverse('timeline', kwargs={'scope': 'ci_system',
+                                        'pk': self.ci.pk}),
+            {'days': 30}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['days'], 30)
+        self.assertEqual(
+            [s['status_type'] for s in response.context['segments']],
+            [STATUS_FAIL]
+        )
+
+    def test_product_timeline_defaults_to_product_version(self):
+        pci = ProductCi.objects.create(name='Product', version='9.0')
+
+        response = self.client.get(reverse(
+            'timeline', kwargs={'scope': 'product_ci', 'pk': pci.pk}))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['version'], '9.0')
+        self.assertEqual(response.context['segments'], [])
@@ -295,6 +295,60 @@ class CiSystemTests(TestCase):
             before
         )  # new records created
 
+    def test_ci_stores_unchanged_rule_check_once(self):
+        """The same run of a rule is shared by the following statuses"""
+        ci = CiSystem.objects.create(url=VALID_URL)
+        kilo = ci.rule_set.create(name='kilo', is_active=True)
+        liberty = ci.rule_set.create(name='liberty', is_active=True)
+
+        def check_rule(liberty_build, liberty_status):
+            def check(rule, server):
+                if rule == kilo:
+                    return RuleCheck(rule=rule, build_number=547,
+                                     status_type=constants.STATUS_SUCCESS)
+
+                return RuleCheck(rule=rule, build_number=liberty_build,
+                                 status_type=liberty_status)
+
+            return mock.patch.object(
+                Rule, 'check_rule', autospec=True, side_effect=check)
+
+        with check_rule(10, constants.STATUS_FAIL):
+            first_status = ci.check_the_status()
+
+        kilo_check = kilo.rulecheck_set.get()
+
+        with check_rule(11, constants.STATUS_SUCCESS):
+            last_status = ci.check_the_status()
+
+        self.assertNotEqual(first_status, last_status)
+        self.assertEqual(kilo.rulecheck_set.count(), 1)
+        self.assertEqual(liberty.rulecheck_set.count(), 2)
+
+        extended_check = kilo.rulecheck_set.get()
+        self.assertEqual(
+            set(extended_check.status.all()), {first_status, last_status})
+        self.assertEqual(extended_check.created_at, kilo_check.created_at)
+        self.assertGreater(extended_check.last_seen, kilo_check.last_seen)
+
+    def test_ci_extends_rule_checks_of_unchanged_status(self):
+        ci = CiSystem.objects.create(url=VALID_URL)
+        rule = ci.rule_set.create(name='kilo', is_active=True)
+
+        with mock.patch.object(
+                Rule, 'check_rule', autospec=True,
+                side_effect=lambda rule, server: RuleCheck(
+                    rule=rule, build_number=547,
+                    status_type=constants.STATUS_SUCCESS)):
+            first_status = ci.check_the_status()
+            first_check = rule.rulecheck_set.get()
+            last_status = ci.check_the_status()
+
+        self.assertEqual(first_status, last_status)
+        check = rule.rulecheck_set.get()
+        self.assertGreater(check.last_seen, first_check.last_seen)
+        self.assertEqual(check.updated_at, check.last_seen)
+
     @mock.patch.object(Rule, 'check_job_rule')
     def test_ci_status_saves_all_rule_checks(self, _job_mock):
         """Just check that we could analyse the status by its RuleChecks"""
@@ -592,44 +646,6 @@ class CiSystemTests(TestCase):
             '9.0.test_all'
         )
 
-    def test_could_create_rules_by_attributes_list(self):
-        """Helper method that creates Rules by imported data"""
-        ci = CiSystem.objects.create(url=VALID_URL, name='1')
-        rule = Rule.objects.create(
-            name='test_job',
-            ci_system=ci,
-            is_active=True
-        )
-
-        result1 = CiSystem.create_rule_for_ci(
-            [{'name': 'test_job', 'rule_type': 'job'}], ci
-        )
-        self.assertEqual(result1[0][0].name, rule.name)
-        self.assertIsNone(result1[1])
-
-        result2 = CiSystem.create_rule_for_ci(
-            [{
-                'name': 'test_job2', 'rule_type': 'View'
-            }, {
-                'name': 'test_job3', 'rule_type': 'Job'
-            }],
-            ci
-        )
-        self.assertEqual(result2[0][0].name, 'test_job2')
-        self.assertEqual(result2[0][1].name, 'test_job3')
-        self.assertIsNone(result2[1])
-
-        result3 = CiSystem.create_rule_for_ci(
-            [{
-                'name': 'test_job4', 'rule_type': 'View'
-            }, {
-                'name': 'test_job5', 'rule_type': 'Invalid'
-            }],
-            ci
-        )
-        self.assertEqual(result3[0], [])
-        self.assertIsNotNone(result3[1])
-
     @mock.patch.object(CiSystem, 'parse_seeds_file')
     def test_cis_creation_with_rules_assigned(self, _seed_file_mock):
         """Check correct rules assignment during the import"""
@@ -664,34 +680,42 @@ class CiSystemTests(TestCase):
             '8.0.test_all'
         )
 
-    def test_deactivate_previous_cis(self):
-        """Check deactivation method for CI's"""
-        previous = {'http://1.com/', 'http://2.com/', 'http://3.com/'}
-        for name in previous:
-            CiSystem.objects.create(url=name, name=name, is_active=True)
-
-        new = {'http://4.com/', 'http://1.com/', 'http://5.com/'}
-        CiSystem.deactivate_previous_cis(previous, new)
-        self.assertEqual(CiSystem.objects.filter(is_active=True).count(), 1)
-
-    def test_deactivate_previous_rules(self):
-        """Check deactivation method for CI rules"""
-        ci = CiSystem.objects.create(url=VALID_URL, is_active=True)
+    def test_construct_cis_deduplicates_rules(self):
+        """Rules listed several times are imported once in the seeds order"""
+        seeds = {
+            'dashboards': {
+                'products': [{
+                    'version': '9.0',
+                    'sections': [{'title': 'Product', 'key': 'ps9'}]
+                }]
+            },
+            'sources': {
+                'jenkins': [{
+                    'url': VALID_URL,
+                    'query': {
+                        'jobs': [{
+                            'names': ['a', 'a', 'a', 'b'],
+                            'dashboards': ['ps9'],
+                        }, {
+                            'names': ['b', 'c'],
+                            'dashboards': [],
+                        }],
+                        'views': [{
+                            'names': ['a'],
+                            'dashboards': [],
+                        }],
+                    }
+                }]
+            }
+        }
 
-        for name in '123':
-            Rule.objects.create(
-                name=name,
-                ci_system=ci,
-                is_active=True,
-            )
-        previous = set(
-            Rule.objects.filter(is_active=True).values_list('id', flat=True)
-        )
+        cis, products, error = CiSystem._construct_cis_from_import_dict(seeds)
 
-        CiSystem.deactivate_previous_rules(
-            previous, {'x10', Rule.objects.first().id, 'x5'}
+        self.assertFalse(error)
+        self.assertEqual(
+            [(rule['name'], rule['rule_type']) for rule in cis[0]['rules']],
+            [('a', 'Job'), ('b', 'Job'), ('c', 'Job'), ('a', 'View')]
         )
-        self.assertEqual(Rule.objects.filter(is_active=True).count(), 1)
 
     def test_parse_seeds_from_stream(self):
         """Test import from file upload steam"""
@@ -703,190 +727,6 @@ class CiSystemTests(TestCase):
             self.assertIsInstance(seeds, dict)
             self.assertTrue('dashboards' in seeds)
 
-    def test_find_rules_for_product(self):
-        """Test for method that searches Rules objects by its attributes"""
-        cis_names = '123'
-        for name in cis_names:
-            ci = CiSystem.objects.create(
-                url=VALID_URL + '_' + name,
-                name=name,
-                is_active=True,
-            )
-            Rule.objects.create(
-                name='rule_' + name,
-                ci_system=ci,
-                is_active=True,
-            )
-
-        rules, error = CiSystem.find_rules_for_product([{
-            'name': 'rule_1',
-            'url': VALID_URL + '_1',
-        }, {
-            'name': 'rule_3',
-            'url': VALID_URL + '_unknown',
-        }])
-
-        self.assertTrue(error)
-        self.assertEqual(rules, [])  # error because of missed ci
-
-        rules, error = CiSystem.find_rules_for_product([{
-            'name': 'rule_1',
-            'url': VALID_URL + '_1',
-        }, {
-            'name': 'rule_10',
-            'url': VALID_URL + '_10',
-        }])
-
-        self.assertTrue(error)
-        self.assertEqual(rules, [])  # error because of missed rule
-
-        rules, error = CiSystem.find_rules_for_product([{
-            'name': 'rule_1',
-            'url': VALID_URL + '_1',
-        }, {
-            'name': 'rule_2',
-            'url': VALID_URL + '_2',
-        }, {
-            'name': 'rule_3',
-            'url': VALID_URL + '_3',
-        }])
-
-        self.assertFalse(error)
-        self.assertEqual(len(rules), 3)  # all good
-
-    def test_create_rule_for_ci_with_existent_rules(self):
-        """Check that rules are reused if exists"""
-        rule_names = '123'
-        ci = CiSystem.objects.create(
-            url=VALID_URL,
-            name='ci',
-            is_active=True,
-        )
-        for name in rule_names:
-            Rule.objects.create(
-                name='rule_' + name,
-                ci_system=ci,
-                is_active=True,
-            )
-
-        before = Rule.objects.count()
-        rules, error = CiSystem.create_rule_for_ci([{
-            'name': 'rule_1',
-            'ci_system_name': 'ci',
-        }, {
-            'name': 'rule_2',
-            'ci_system_name': 'ci',
-        }, {
-            'name': 'rule_3',
-            'ci_system_name': 'ci',
-        }], ci)
-
-        self.assertFalse(error)
-        self.assertEqual(len(rules), 3)
-        self.assertEqual(Rule.objects.count(), before)  # no new ones
-
-    def test_create_rule_for_ci_with_mixed_rules(self):
-        """Check that rules are reused if exists and created otherwise"""
-        rule_names = '12'
-        ci = CiSystem.objects.create(
-            url=VALID_URL,
-            name='ci',
-            is_active=True,
-        )
-        for name in rule_names:
-            Rule.objects.create(
-                name='rule_' + name,
-                ci_system=ci,
-                is_active=True,
-            )
-
-        before = Rule.objects.count()
-        rules, error = CiSystem.create_rule_for_ci([{
-            'name': 'rule_1',
-            'ci_system_name': 'ci',
-        }, {
-            'name': 'rule_2',
-            'ci_system_name': 'ci',
-        }, {
-            'name': 'rule_3',
-            'ci_system_name': 'ci',
-        }], ci)
-
-        self.assertFalse(error)
-        self.assertEqual(len(rules), 3)
-        self.assertEqual(Rule.objects.count(), before + 1)  # only one created
-
-    def test_create_rule_for_ci_with_wrong_rules(self):
-        """Error occurs if we try to create new rule by wrong attributes"""
-        rule_names = '12'
-        ci = CiSystem.objects.create(
-            url=VALID_URL,
-            name='ci',
-            is_active=True,
-        )
-        for name in rule_names:
-            Rule.objects.create(
-                name='rule_' + name,
-                ci_system=ci,
-                is_active=True,
-            )
-
-        before = Rule.objects.count()
-        rules, error = CiSystem.create_rule_for_ci([{
-            'version': '2',
-        }, {
-            'name': 'rule_1',
-        }], ci)
-
-        self.assertTrue(error)
-        self.assertEqual(len(rules), 0)
-        self.assertEqual(Rule.objects.count(), before)
-
-        before = Rule.objects.count()
-        rules, error = CiSystem.create_rule_for_ci([{
-            'name': 'rule_1',
-        }, {
-            'name': 'rule_3',
-            'rule_type': 'unknown',
-        }], ci)
-
-        self.assertTrue(error)
-        self.assertEqual(len(rules), 0)
-        self.assertEqual(Rule.objects.count(), before)
-
-    def test_create_rule_for_ci_deactivate_previous_rules(self):
-        """To keep the history we deactivate all previous unused rules"""
-        rule_names = '12'
-        ci = CiSystem.objects.create(
-            url=VALID_URL,
-            name='ci',
-            is_active=True,
-        )
-        for name in rule_names:
-            Rule.objects.create(
-                name='rule_' + name,
-                ci_system=ci,
-                is_active=True,
-            )
-
-        before = Rule.objects.filter(is_active=True).count()
-
-        rules, error = CiSystem.create_rule_for_ci([{
-            'name': 'rule_1',
-            'version': '1',
-            'ci_system_name': 'ci',
-            'is_active': True,
-        }, {
-            'name': 'rule_3',
-            'version': '3',
-            'ci_system_name': 'ci',
-        }], ci)
-
-        self.assertFalse(error)
-        self.assertEqual(len(rules), 2)
-        self.assertEqual(Rule.objects.count(), before + 1)
-        self.assertEqual(Rule.objects.filter(is_active=True).count(), 1)
-
     def test_create_from_seeds_with_empty_seeds(self):
         result = CiSystem.create_from_seeds({})
         self.assertEqual(result['objects'], [])
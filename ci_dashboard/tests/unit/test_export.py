@@ -0,0 +1,68 @@
+import json
+import zlib
+
+from datetime import datetime
+
+from django.test import TestCase
+from django.utils import timezone
+
+from ci_dashboard.constants import STATUS_FAIL, STATUS_SUCCESS
+from ci_dashboard.export import ExportError, export
+from ci_dashboard.models import CiSystem, Status
+
+
+class ExportTests(TestCase):
+
+    def setUp(self):
+        self.ci = CiSystem.objects.create(url='http://localhost/', name='CI')
+        self.statuses = [
+            Status.objects.create(
+                summary='Status %s' % number,
+                ci_system=self.ci,
+                status_type=STATUS_FAIL if number % 2 else STATUS_SUCCESS,
+            )
+            for number in range(5)
+        ]
+
+    def _lines(self, **kwargs):
+        return b''.join(export('statuses', **kwargs)).decode(
+            'utf-8').splitlines()
+
+    def test_ndjson_export_reads_history_by_chunks(self):
+        rows = [json.loads(line) for line in self._lines(chunk_size=2)]
+
+        self.assertEqual(
+            [row['id'] for row in rows], [s.pk for s in self.statuses])
+        self.assertEqual(rows[1]['ci_system'], self.ci.pk)
+        self.assertEqual(rows[1]['status_type'], STATUS_FAIL)
+
+    def test_csv_export_starts_with_header(self):
+        lines = self._lines(export_format='csv')
+
+        self.assertEqual(len(lines), 6)
+        self.assertTrue(lines[0].startswith('id,ci_system,status_type,'))
+        self.assertTrue(lines[1].startswith(
+            '{},{},{},Status 0,'.format(
+                self.statuses[0].pk, self.ci.pk, STATUS_SUCCESS)))
+
+    def test_export_filtered_by_dates(self):
+        Status.objects.filter(pk=self.statuses[0].pk).update(
+            created_at=timezone.make_aware(
+                datetime(2016, 5, 1, 10), timezone.utc))
+
+        self.assertEqual(
+            len(self._lines(date_from='2016-05-01', date_to='2016-05-01')), 1)
+        self.assertEqual(len(self._lines(date_from='2016-05-02')), 4)
+
+    def test_gzip_export(self):
+        data = b''.join(export('statuses', compress=True))
+
+        self.assertEqual(
+            len(zlib.decompress(data, 16 + zlib.MAX_WBITS).splitlines()), 5)
+
+    def test_unknown_source_and_format_rejected(self):
+        with self.assertRaises(ExportError):
+            export('users')
+
+        with self.assertRaises(ExportError):
+            export('statuses', export_format='xml')
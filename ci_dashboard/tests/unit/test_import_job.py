@@ -0,0 +1,83 @@
+import json
+
+import mock
+
+from django.test import TestCase
+
+from ci_dashboard import constants
+from ci_dashboard.models import CiSystem, ImportJob
+
+SEEDS = {
+    'dashboards': {
+        'ci_systems': [{'key': 'prodci', 'title': 'Product CI'}],
+    },
+    'sources': {
+        'jenkins': [{
+            'url': 'https://product-ci.abc.net/',
+            'query': {
+                'jobs': [{'names': ['8.0.test_all'], 'dashboards': ['prodci']}]
+            },
+        }, {
+            'url': 'https://',  # invalid url
+            'query': {'jobs': []},
+        }]
+    }
+}
+
+
+class ImportJobTests(TestCase):
+
+    def test_run_stores_import_result(self):
+        job = ImportJob.objects.create(seeds=json.dumps(SEEDS))
+
+        job.run()
+        job.refresh_from_db()
+
+        self.assertEqual(job.state, constants.IMPORT_DONE)
+        self.assertEqual((job.cis_total, job.cis_processed, job.cis_imported),
+                         (2, 2, 1))
+        self.assertEqual(len(job.errors_list()), 1)
+        self.assertIsNotNone(job.finished_at)
+        self.assertEqual(
+            job.as_dict()['success_message'],
+            '1 of total 2 Ci Systems and 0 of total 0 Product Statuses '
+            'were imported.'
+        )
+        self.assertEqual(CiSystem.objects.count(), 1)
+
+    def test_run_reports_progress(self):
+        job = ImportJob.objects.create(seeds=json.dumps(SEEDS))
+        progress = []
+
+        def save(*args, **kwargs):
+            progress.append((job.state, job.cis_processed))
+
+        with mock.patch.object(job, 'save', side_effect=save):
+            job.run()
+
+        self.assertEqual(progress, [
+            (constants.IMPORT_RUNNING, 0),
+            (constants.IMPORT_RUNNING, 0),
+            (constants.IMPORT_RUNNING, 2),
+            (constants.IMPORT_DONE, 2),
+        ])
+
+    def test_seeds_cleared_when_finished(self):
+        job = ImportJob.objects.create(seeds=json.dumps(SEEDS))
+
+        job.run()
+        job.refresh_from_db()
+
+        self.assertEqual(job.seeds, '')
+
+    def test_run_marks_failed_job(self):
+        job = ImportJob.objects.create(seeds=json.dumps(SEEDS))
+
+        with mock.patch.object(CiSystem, 'create_from_seeds',
+                               side_effect=RuntimeError('boom')):
+            job.run()
+
+        job.refresh_from_db()
+        self.assertEqual(job.state, constants.IMPORT_FAILED)
+        self.assertEqual(job.errors_list(), ['Import failed: boom'])
+        self.assertFalse('success_message' in job.as_dict())
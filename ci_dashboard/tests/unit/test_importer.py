@@ -0,0 +1,261 @@
+import mock
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from ci_dashboard.importer import SeedImporter
+from ci_dashboard.models import CiSystem, ProductCi, Rule
+
+URL = 'https://product-ci.abc.net/'
+
+
+def ci_dict(names, url=URL, name='Product CI'):
+    return {
+        'name': name,
+        'url': url,
+        'username': '',
+        'password': '',
+        'is_active': True,
+        'rules': [
+            {'name': rule_name, 'rule_type': 'Job', 'is_active': True}
+            for rule_name in names
+        ],
+    }
+
+
+def product_dict(names, url=URL):
+    return {
+        'name': 'Product',
+        'version': '9.0',
+        'is_active': True,
+        'rules': [
+            {'name': rule_name, 'rule_type': 'Job', 'url': url}
+            for rule_name in names
+        ],
+    }
+
+
+class SeedImporterTests(TestCase):
+
+    def _import(self, cis, products=()):
+        return SeedImporter().run(cis, products)
+
+    def _queries(self, cis, products=()):
+        with CaptureQueriesContext(connection) as queries:
+            self._import(cis, products)
+        return len(queries)
+
+    def test_new_objects_are_created(self):
+        result = self._import(
+            [ci_dict(['a', 'b'])], [product_dict(['b'])])
+
+        ci, product = CiSystem.objects.get(), ProductCi.objects.get()
+        self.assertEqual(result['objects'], [ci, product])
+        self.assertEqual(result['cis_imported'], 1)
+        self.assertEqual(result['ps_imported'], 1)
+        self.assertEqual(
+            set(ci.rule_set.filter(is_active=True).values_list(
+                'name', flat=True)),
+            {'a', 'b'}
+        )
+        self.assertEqual(
+            list(product.rules.values_list('name', flat=True)), ['b'])
+
+    def test_queries_do_not_grow_with_rules(self):
+        few = self._queries([ci_dict(['a', 'b'])], [product_dict(['a'])])
+        CiSystem.objects.all().delete()
+        ProductCi.objects.all().delete()
+
+        many = self._queries(
+            [ci_dict(['r%s' % i for i in range(50)])],
+            [product_dict(['r%s' % i for i in range(50)])]
+        )
+
+        self.assertEqual(few, many)
+
+    def test_unchanged_seeds_are_not_written(self):
+        cis, products = [ci_dict(['a', 'b'])], [product_dict(['a'])]
+        self._import(cis, products)
+
+        with CaptureQueriesContext(connection) as queries:
+            self._import(cis, products)
+
+        self.assertFalse([
+            query for query in queries
+            if query['sql'].startswith(('INSERT', 'UPDATE', 'DELETE'))
+        ])
+
+    def test_reimport_deactivates_missed_objects(self):
+        self._import(
+            [ci_dict(['a', 'b']), ci_dict([], url='https://old.abc.net/')],
+            [product_dict(['a', 'b'])]
+        )
+
+        self._import([ci_dict(['b', 'c'])], [product_dict(['c'])])
+
+        self.assertEqual(
+            set(Rule.objects.filter(is_active=True).values_list(
+                'name', flat=True)),
+            {'b', 'c'}
+        )
+        self.assertFalse(CiSystem.objects.get(url='https://old.abc.net/')
+                         .is_active)
+        self.assertEqual(
+            list(ProductCi.objects.get().rules.values_list('name', flat=True)),
+            ['c']
+        )
+
+    def test_invalid_duplicate_does_not_change_imported_ci(self):
+        result = self._import([
+            ci_dict(['a']),
+            ci_dict(['a'], name='*' * 100),
+        ])
+
+        self.assertEqual(result['cis_imported'], 1)
+        self.assertTrue('Can not import CI' in result['errors'][0])
+        self.assertEqual(CiSystem.objects.get().name, 'Product CI')
+
+    def test_product_with_unknown_rule_is_not_imported(self):
+        result = self._import([ci_dict(['a'])], [product_dict(['x'])])
+
+        self.assertEqual(result['ps_imported'], 0)
+        self.assertEqual(
+            result['errors'], ['Product Status Product has invalid rules.'])
+        self.assertFalse(ProductCi.objects.exists())
+
+
+class ImportPlanTests(TestCase):
+
+    def test_plan_does_not_write(self):
+        with CaptureQueriesContext(connection) as queries:
+            plan = SeedImporter().plan(
+                [ci_dict(['a'])], [product_dict(['a'])])
+
+        self.assertFalse([
+            query for query in queries
+            if query['sql'].startswith(('INSERT', 'UPDATE', 'DELETE'))
+        ])
+        self.assertFalse(CiSystem.objects.exists())
+        self.assertEqual(plan['cis']['create'], [URL])
+        self.assertEqual(plan['rules']['create'], [URL + ' a (Job, Timer)'])
+        self.assertEqual(plan['products']['create'], ['Product 9.0'])
+        self.assertEqual(
+            plan['product_rules']['add'],
+            ['Product 9.0: ' + URL + ' a (Job, Timer)']
+        )
+
+    def test_plan_lists_changes_of_imported_objects(self):
+        SeedImporter().run(
+            [ci_dict(['a', 'b']), ci_dict([], url='https://old.abc.net/')],
+            [product_dict(['a'])]
+        )
+
+        plan = SeedImporter().plan(
+            [ci_dict(['b', 'c'], name='New name')], [product_dict(['c'])])
+
+        self.assertEqual(plan['cis'], {
+            'create': [],
+            'update': [URL + ' (name)'],
+            'deactivate': ['https://old.abc.net/'],
+        })
+        self.assertEqual(plan['rules'], {
+            'create': [URL + ' c (Job, Timer)'],
+            'activate': [],
+            'deactivate': [URL + ' a (Job, Timer)'],
+        })
+        self.assertEqual(plan['product_rules'], {
+            'add': ['Product 9.0: ' + URL + ' c (Job, Timer)'],
+            'remove': ['Product 9.0: ' + URL + ' a (Job, Timer)'],
+        })
+        self.assertEqual(plan['errors'], [])
+
+    def test_plan_of_invalid_seeds_has_errors_only(self):
+        with mock.patch('ci_dashboard.schema.get_validator',
+                        return_value=None):
+            plan = CiSystem.plan_from_seeds({})
+
+        self.assertEqual(plan['cis']['create'], [])
+        self.assertEqual(len(plan['errors']), 1)
+
+
+class ImportSnapshotTests(TestCase):
+
+    def _seeds(self, *urls):
+        return {
+            'dashboards': {
+                'ci_systems': [{'key': 'ci', 'title': 'CI'}],
+            },
+            'sources': {
+                'jenkins': [{
+                    'url': url,
+                    'query': {
+                        'jobs': [{'names': ['test'], 'dashboards': ['ci']}]
+                    },
+                } for url in urls]
+            }
+        }
+
+    def test_same_seeds_are_not_imported_again(self):
+        seeds = self._seeds(URL, 'https://infra-ci.abc.net/')
+        result = CiSystem.create_from_seeds(seeds)
+
+        with CaptureQueriesContext(connection) as queries:
+            unchanged = CiSystem.create_from_seeds(seeds)
+
+        self.assertTrue(unchanged['unchanged'])
+        self.assertEqual(unchanged['objects'], result['objects'])
+        self.assertEqual(unchanged['cis_imported'], 2)
+        self.assertEqual(len(queries), 6)
+
+    def test_deactivated_objects_are_imported_again(self):
+        seeds = self._seeds(URL)
+        CiSystem.create_from_seeds(seeds)
+        CiSystem.objects.update(is_active=False)
+
+        result = CiSystem.create_from_seeds(seeds)
+
+        self.assertFalse('unchanged' in result)
+        self.assertTrue(CiSystem.objects.get().is_active)
+
+    def test_objects_changed_by_hand_are_imported_again(self):
+        seeds = self._seeds(URL, 'https://infra-ci.abc.net/')
+        CiSystem.create_from_seeds(seeds)
+        Rule.objects.filter(ci_system__url=URL).update(is_active=False)
+        CiSystem.objects.filter(url=URL).update(username='admin')
+
+        result = CiSystem.create_from_seeds(seeds)
+
+        self.assertFalse('unchanged' in result)
+        self.assertTrue(Rule.objects.get(ci_system__url=URL).is_active)
+        self.assertEqual(CiSystem.objects.get(url=URL).username, '')
+        self.assertTrue(CiSystem.create_from_seeds(seeds)['unchanged'])
+
+    def test_changed_seeds_are_compared_with_the_objects(self):
+        CiSystem.create_from_seeds(
+            self._seeds(URL, 'https://infra-ci.abc.net/'))
+        Rule.objects.filter(ci_system__url=URL).update(is_active=False)
+
+        result = CiSystem.create_from_seeds(
+            self._seeds(URL, 'https://new-ci.abc.net/'))
+
+        self.assertEqual(result['cis_imported'], 2)
+        self.assertTrue(Rule.objects.get(ci_system__url=URL).is_active)
+        self.assertEqual(
+            set(CiSystem.objects.filter(is_active=True).values_list(
+                'url', flat=True)),
+            {URL, 'https://new-ci.abc.net/'}
+        )
+
+    def test_force_imports_same_seeds(self):
+        seeds = self._seeds(URL)
+        CiSystem.create_from_seeds(seeds)
+
+        with mock.patch.object(
+            SeedImporter, '_diff_ci', autospec=True,
+            side_effect=SeedImporter._diff_ci,
+        ) as diff_ci:
+            result = CiSystem.create_from_seeds(seeds, force=True)
+
+        self.assertFalse('unchanged' in result)
+        self.assertEqual(diff_ci.call_count, 1)
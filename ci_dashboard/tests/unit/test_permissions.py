@@ -0,0 +1,69 @@
+from django.contrib.auth.models import AnonymousUser, Group, User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from ci_dashboard.permissions import can_manage_statuses
+
+
+@override_settings(STAFF_GROUPS=('ci',))
+class CanManageStatusesTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.group = Group.objects.create(name='ci')
+        self.user = User.objects.create(username='tasty')
+
+    def _fresh_user(self):
+        return User.objects.get(pk=self.user.pk)
+
+    def test_anonymous_user_can_not_manage_statuses(self):
+        self.assertFalse(can_manage_statuses(AnonymousUser()))
+
+    def test_staff_group_members_can_manage_statuses(self):
+        self.assertFalse(can_manage_statuses(self._fresh_user()))
+
+        self.user.groups.add(self.group)
+        self.assertTrue(can_manage_statuses(self._fresh_user()))
+
+    def test_superuser_can_manage_statuses(self):
+        superuser = User.objects.create_superuser(
+            'admin', 'admin@example.com', 'admin')
+
+        self.assertTrue(can_manage_statuses(superuser))
+
+    def test_check_is_cached_between_requests(self):
+        can_manage_statuses(self._fresh_user())
+        user = self._fresh_user()
+
+        with self.assertNumQueries(0):
+            can_manage_statuses(user)
+            can_manage_statuses(user)
+
+    def test_cache_invalidated_when_groups_change(self):
+        self.assertFalse(can_manage_statuses(self._fresh_user()))
+
+        self.group.user_set.add(self.user)
+        self.assertTrue(can_manage_statuses(self._fresh_user()))
+
+        self.group.user_set.clear()
+        self.assertFalse(can_manage_statuses(self._fresh_user()))
+
+    def test_cache_invalidated_on_login(self):
+        self.user.set_password('tasty')
+        self.user.save()
+        self.assertFalse(can_manage_statuses(self._fresh_user()))
+
+        # membership changed outside of the django signals
+        User.groups.through.objects.create(
+            user_id=self.user.pk, group_id=self.group.pk)
+        self.client.login(username='tasty', password='tasty')
+
+        self.assertTrue(can_manage_statuses(self._fresh_user()))
+
+    def test_cache_invalidated_when_user_changes(self):
+        self.assertFalse(can_manage_statuses(self._fresh_user()))
+
+        self.user.is_superuser = True
+        self.user.save()
+
+        self.assertTrue(can_manage_statuses(self._fresh_user()))
@@ -87,16 +87,6 @@ class ProductStatusTests(TestCase):
 
         self.assertEqual(ps.latest_rule_checks(), [])
 
-    def test_deactivate_previous_products(self):
-        """Test for method the deactivates previous unused Product's"""
-        previous = {('p1', 'v1'), ('p2',  'v2'), ('p3', 'v3')}
-        for name, ver in previous:
-            ProductCi.objects.create(name=name, version=ver, is_active=True)
-
-        new = {('p4', 'v4'), ('p1',  'v1'), ('p2', 'v22')}
-        ProductCi.deactivate_previous_products(previous, new)
-        self.assertEqual(ProductCi.objects.filter(is_active=True).count(), 1)
-
     def test_update_status(self):
         """New ProductCiStatus assignment test"""
         ps = ProductCi.objects.create(name='first')
@@ -0,0 +1,166 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from ci_dashboard.constants import (
+    EVENT_CI_STATUS, IMPORT_DONE, IMPORT_PENDING, STATUS_FAIL, STATUS_SUCCESS
+)
+from ci_dashboard.models import CiSystem, ProductCi, Rule, RuleCheck, Status
+from ci_dashboard.models import ImportJob, StatusEvent, StatusTransition
+from ci_dashboard.models import Webhook
+from ci_dashboard.retention import apply_retention
+
+
+POLICIES = {
+    'status': {'keep_all_days': 30, 'keep_changes_days': 365},
+    'product_ci_status': {'keep_all_days': 30, 'keep_changes_days': None},
+}
+
+
+class RetentionTests(TestCase):
+
+    def setUp(self):
+        self.now = timezone.now()
+        self.ci = CiSystem.objects.create(url='http://localhost/', name='CI')
+        self.rule = Rule.objects.create(name='kilo', ci_system=self.ci)
+
+    def _make_status(self, days_ago, status_type=STATUS_SUCCESS, **kwargs):
+        status = Status.objects.create(
+            summary='Auto',
+            ci_system=self.ci,
+            status_type=status_type,
+            **kwargs
+        )
+        Status.objects.filter(pk=status.pk).update(
+            created_at=self.now - timedelta(days=days_ago))
+        return status
+
+    def _remaining(self):
+        return list(Status.objects.values_list('id', flat=True))
+
+    def test_recent_history_is_kept(self):
+        statuses = [self._make_status(days_ago) for days_ago in (3, 2, 1)]
+
+        apply_retention(POLICIES, now=self.now)
+
+        self.assertEqual(self._remaining(), [s.pk for s in statuses])
+
+    def test_only_changes_are_kept_after_keep_all_days(self):
+        first = self._make_status(50, STATUS_FAIL)
+        self._make_status(49, STATUS_FAIL)
+        change = self._make_status(48, STATUS_SUCCESS)
+        self._make_status(47, STATUS_SUCCESS)
+        latest = self._make_status(1, STATUS_SUCCESS)
+
+        deleted = apply_retention(POLICIES, now=self.now)
+
+        self.assertEqual(self._remaining(), [first.pk, change.pk, latest.pk])
+        self.assertEqual(deleted['status'], 2)
+
+    def test_last_status_of_the_day_is_kept_after_keep_changes_days(self):
+        self._make_status(400, STATUS_FAIL)
+        last_of_day = self._make_status(400, STATUS_SUCCESS)
+        next_day = self._make_status(399, STATUS_FAIL)
+
+        apply_retention(POLICIES, now=self.now)
+
+        self.assertEqual(self._remaining(), [last_of_day.pk, next_day.pk])
+
+    def test_timeline_rebuilt_after_changes_deleted(self):
+        self._make_status(400, STATUS_SUCCESS)
+        failed = self._make_status(399, STATUS_FAIL)
+        self._make_status(399, STATUS_SUCCESS)
+        self._make_status(1, STATUS_SUCCESS)
+        StatusTransition.rebuild(Status.objects.first())
+
+        apply_retention(POLICIES, now=self.now)
+
+        self.assertEqual(
+            list(StatusTransition.objects.filter(
+                ci_system=self.ci).values_list('status_type', 'ended_at')),
+            [(STATUS_SUCCESS, None)]
+        )
+        self.assertNotIn(failed.pk, self._remaining())
+
+    def test_manual_and_latest_statuses_are_kept(self):
+        first = self._make_status(50)
+        manual = self._make_status(49, is_manual=True)
+        latest = self._make_status(48)
+
+        apply_retention(POLICIES, now=self.now)
+
+        self.assertEqual(self._remaining(), [first.pk, manual.pk, latest.pk])
+
+    def test_unused_rule_checks_deleted_with_statuses(self):
+        self._make_status(50)
+        deleted_status = self._make_status(49)
+        latest = self._make_status(1)
+
+        shared_check = RuleCheck.objects.create(rule=self.rule)
+        shared_check.status.add(deleted_status, latest)
+        unused_check = RuleCheck.objects.create(rule=self.rule)
+        unused_check.status.add(deleted_status)
+
+        apply_retention(POLICIES, now=self.now)
+
+        self.assertEqual(
+            list(RuleCheck.objects.values_list('id', flat=True)),
+            [shared_check.pk]
+        )
+
+    def test_product_statuses_keep_changes_forever(self):
+        pci = ProductCi.objects.create(name='Product', version='9.0')
+        for days_ago, status_type in ((500, STATUS_FAIL),
+                                      (499, STATUS_FAIL),
+                                      (498, STATUS_SUCCESS)):
+            status = pci.productcistatus_set.create(
+                summary='Auto', status_type=status_type)
+            pci.productcistatus_set.filter(pk=status.pk).update(
+                created_at=self.now - timedelta(days=days_ago))
+
+        apply_retention(POLICIES, now=self.now)
+
+        self.assertEqual(
+            list(pci.productcistatus_set.values_list(
+                'status_type', flat=True)),
+            [STATUS_FAIL, STATUS_SUCCESS]
+        )
+
+    def test_undelivered_events_are_kept(self):
+        events = [
+            StatusEvent.objects.create(event_type=EVENT_CI_STATUS, object_id=1)
+            for _ in range(3)
+        ]
+        StatusEvent.objects.update(created_at=self.now - timedelta(days=30))
+        Webhook.objects.create(url='http://hooks.invalid/',
+                               last_event_id=events[0].pk)
+        Webhook.objects.create(url='http://old.invalid/', is_active=False)
+
+        deleted = apply_retention(
+            {'status_event': {'keep_all_days': 7}}, now=self.now)
+
+        self.assertEqual(deleted['status_event'], 1)
+        self.assertEqual(
+            list(StatusEvent.objects.values_list('id', flat=True)),
+            [event.pk for event in events[1:]]
+        )
+
+    def test_finished_import_jobs_are_deleted(self):
+        old = ImportJob.objects.create(
+            state=IMPORT_DONE, finished_at=self.now - timedelta(days=40))
+        recent = ImportJob.objects.create(
+            state=IMPORT_DONE, finished_at=self.now - timedelta(days=1))
+        pending = ImportJob.objects.create(state=IMPORT_PENDING)
+        ImportJob.objects.filter(pk=pending.pk).update(
+            created_at=self.now - timedelta(days=40))
+
+        deleted = apply_retention(
+            {'import_job': {'keep_all_days': 30}}, now=self.now)
+
+        self.assertEqual(deleted['import_job'], 1)
+        self.assertFalse(ImportJob.objects.filter(pk=old.pk).exists())
+        self.assertEqual(
+            set(ImportJob.objects.values_list('id', flat=True)),
+            {recent.pk, pending.pk}
+        )
@@ -0,0 +1,111 @@
+from datetime import datetime
+import mock
+
+from django.test import TestCase
+from django.utils import timezone
+
+from ci_dashboard.constants import ROLLUP_CI_SYSTEM, ROLLUP_RULE
+from ci_dashboard.constants import STATUS_FAIL, STATUS_SUCCESS
+from ci_dashboard.models import CiSystem, DailyRollup, Rule, RuleCheck, Status
+from ci_dashboard.rollups import summarize, update_rollups
+
+
+def at(day, hour=0, minute=0):
+    return timezone.make_aware(
+        datetime(2016, 5, day, hour, minute), timezone.utc)
+
+
+class RollupsTests(TestCase):
+
+    def setUp(self):
+        self.ci = CiSystem.objects.create(url='http://localhost/', name='CI')
+
+    def _make_status(self, created_at, status_type):
+        status = Status.objects.create(
+            summary='Auto', ci_system=self.ci, status_type=status_type)
+        Status.objects.filter(pk=status.pk).update(created_at=created_at)
+        return status
+
+    def _rollup(self, day):
+        return DailyRollup.objects.get(
+            scope=ROLLUP_CI_SYSTEM, object_id=self.ci.pk, day=day.date())
+
+    def test_statuses_counted_by_days(self):
+        self._make_status(at(1, 10), STATUS_SUCCESS)
+        self._make_status(at(1, 12), STATUS_FAIL)
+        self._make_status(at(2, 6), STATUS_SUCCESS)
+
+        update_rollups()
+
+        first_day, second_day = self._rollup(at(1)), self._rollup(at(2))
+        self.assertEqual(
+            (first_day.total, first_day.succeeded, first_day.failed),
+            (2, 1, 1)
+        )
+        self.assertEqual(first_day.success_seconds, 2 * 3600)
+        # the failure lasted over midnight
+        self.assertEqual(first_day.fail_seconds, 12 * 3600)
+        self.assertEqual(second_day.fail_seconds, 6 * 3600)
+        self.assertEqual(
+            (second_day.recoveries, second_day.recovery_seconds),
+            (1, 18 * 3600)
+        )
+
+    def test_only_new_rows_are_processed(self):
+        self._make_status(at(1, 10), STATUS_FAIL)
+        self.assertEqual(update_rollups()[ROLLUP_CI_SYSTEM], 1)
+        self.assertEqual(update_rollups()[ROLLUP_CI_SYSTEM], 0)
+
+        self._make_status(at(1, 11), STATUS_FAIL)
+        self._make_status(at(1, 14), STATUS_SUCCESS)
+        self.assertEqual(update_rollups()[ROLLUP_CI_SYSTEM], 2)
+
+        rollup = self._rollup(at(1))
+        self.assertEqual((rollup.total, rollup.failed), (3, 2))
+        self.assertEqual(rollup.fail_seconds, 4 * 3600)
+        # failure streak is continued from the previous run
+        self.assertEqual(rollup.recovery_seconds, 4 * 3600)
+
+    def test_rule_checks_rolled_up_per_rule(self):
+        rule = Rule.objects.create(name='kilo', ci_system=self.ci)
+        RuleCheck.objects.create(
+            rule=rule, status_type=STATUS_FAIL, created_at=at(3, 1))
+        RuleCheck.objects.create(
+            rule=rule, status_type=STATUS_SUCCESS, created_at=at(3, 2))
+
+        update_rollups()
+
+        rollup = DailyRollup.objects.get(scope=ROLLUP_RULE, object_id=rule.pk)
+        self.assertEqual((rollup.total, rollup.recoveries), (2, 1))
+        self.assertEqual(rollup.fail_seconds, 3600)
+
+    def test_rows_committed_late_are_processed(self):
+        other_ci = CiSystem.objects.create(url='http://other/', name='Other')
+        late_pk = self._make_status(at(1, 9), STATUS_FAIL).pk
+        Status.objects.filter(pk=late_pk).delete()
+        self._make_status(at(1, 10), STATUS_FAIL)
+        self.assertEqual(update_rollups()[ROLLUP_CI_SYSTEM], 1)
+
+        # a lower id committed after the newer row was rolled up
+        Status.objects.create(
+            pk=late_pk, summary='Auto', ci_system=other_ci,
+            status_type=STATUS_FAIL)
+        Status.objects.filter(pk=late_pk).update(created_at=at(1, 9, 55))
+
+        self.assertEqual(update_rollups()[ROLLUP_CI_SYSTEM], 1)
+        self.assertEqual(update_rollups()[ROLLUP_CI_SYSTEM], 0)
+        self.assertEqual(DailyRollup.objects.get(
+            scope=ROLLUP_CI_SYSTEM, object_id=other_ci.pk).failed, 1)
+
+    def test_pass_rate_counts_time_in_status(self):
+        self._make_status(at(1, 0), STATUS_SUCCESS)
+        self._make_status(at(1, 18), STATUS_FAIL)
+        self._make_status(at(1, 19), STATUS_FAIL)
+        self._make_status(at(1, 23), STATUS_SUCCESS)
+
+        update_rollups()
+
+        with mock.patch.object(timezone, 'now', return_value=at(1, 23)):
+            summary = summarize(ROLLUP_CI_SYSTEM, 1)[(self.ci.pk, '')]
+        self.assertEqual(summary['total'], 4)
+        self.assertEqual(summary['pass_rate'], 18.0 / 23)
@@ -1,5 +1,8 @@
+from datetime import timedelta
+
 from django.core.exceptions import ValidationError
 from django.test import TestCase
+from django.utils import timezone
 
 from ci_dashboard.models import CiSystem, Status
 from ci_dashboard.models import Rule, RuleCheck
@@ -73,3 +76,22 @@ class RuleCheckTests(TestCase):
 
         rule.delete()
         self.assertEqual(RuleCheck.objects.count(), before - 1)
+
+    def test_active_at_returns_latest_checks_of_rules_at_moment(self):
+        now = timezone.now()
+        other_rule = Rule.objects.create(name='liberty', ci_system=self.ci)
+
+        first = RuleCheck.objects.create(
+            rule=self.rule, created_at=now - timedelta(hours=3))
+        second = RuleCheck.objects.create(
+            rule=self.rule, created_at=now - timedelta(hours=1))
+        other = RuleCheck.objects.create(
+            rule=other_rule, created_at=now - timedelta(hours=2))
+
+        self.assertEqual(
+            set(RuleCheck.active_at(now - timedelta(hours=2))),
+            {first, other}
+        )
+        self.assertEqual(set(RuleCheck.active_at(now)), {second, other})
+        self.assertEqual(
+            list(RuleCheck.active_at(now, rules=[other_rule])), [other])
@@ -0,0 +1,81 @@
+from django.test import TestCase, override_settings
+
+from ci_dashboard.constants import STATUS_FAIL, STATUS_SKIP, STATUS_SUCCESS
+from ci_dashboard.models import CiSystem, ProductCi, Rule, RuleCheck
+from ci_dashboard.models import RuleFlakiness
+
+
+class RuleFlakinessTests(TestCase):
+
+    def setUp(self):
+        self.ci = CiSystem.objects.create(url='http://localhost/', name='CI')
+        self.rule = Rule.objects.create(
+            name='kilo', ci_system=self.ci, is_active=True)
+
+    def _record(self, rule, *results):
+        for build_number, status_type in results:
+            RuleFlakiness.record_check(RuleCheck(
+                rule=rule,
+                build_number=build_number,
+                status_type=status_type,
+            ))
+
+        return RuleFlakiness.objects.get(rule=rule)
+
+    def test_score_is_flip_rate_of_builds(self):
+        flakiness = self._record(
+            self.rule,
+            (1, STATUS_SUCCESS),
+            (2, STATUS_FAIL),
+            (3, STATUS_SUCCESS),
+            (4, STATUS_SUCCESS),
+            (5, STATUS_SUCCESS),
+        )
+
+        self.assertEqual((flakiness.size, flakiness.failures), (5, 1))
+        self.assertEqual(flakiness.score, 0.5)
+
+    def test_latest_result_of_the_same_build_replaces_previous(self):
+        flakiness = self._record(
+            self.rule,
+            (1, STATUS_SUCCESS),
+            (2, STATUS_FAIL),
+            (2, STATUS_SUCCESS),
+            (1, STATUS_FAIL),  # stale build is ignored
+            (3, STATUS_SKIP),  # neither success nor failure
+        )
+
+        self.assertEqual((flakiness.size, flakiness.failures), (2, 0))
+        self.assertEqual(flakiness.score, 0)
+
+    @override_settings(FLAKINESS_WINDOW=3)
+    def test_only_latest_builds_are_scored(self):
+        flakiness = self._record(
+            self.rule,
+            (1, STATUS_FAIL),
+            (2, STATUS_SUCCESS),
+            (3, STATUS_SUCCESS),
+            (4, STATUS_SUCCESS),
+        )
+
+        self.assertEqual((flakiness.size, flakiness.failures), (3, 0))
+        self.assertEqual(flakiness.score, 0)
+
+    def test_flakiest_active_rules_of_ci_and_product(self):
+        stable = Rule.objects.create(
+            name='liberty', ci_system=self.ci, is_active=True)
+        inactive = Rule.objects.create(name='mitaka', ci_system=self.ci)
+        pci = ProductCi.objects.create(name='Product', version='9.0')
+        pci.rules.add(self.rule, stable, inactive)
+
+        for rule in (self.rule, inactive):
+            self._record(rule, (1, STATUS_FAIL), (2, STATUS_SUCCESS))
+        self._record(stable, (1, STATUS_SUCCESS), (2, STATUS_SUCCESS))
+
+        by_ci = RuleFlakiness.top_by_ci([self.ci], limit=5)
+        by_product = RuleFlakiness.top_by_product([pci], limit=5)
+
+        self.assertEqual(
+            [flakiness.rule for flakiness in by_ci[self.ci.pk]], [self.rule])
+        self.assertEqual(
+            [flakiness.rule for flakiness in by_product[pci.pk]], [self.rule])
@@ -0,0 +1,50 @@
+import mock
+
+from django.test import TestCase, override_settings
+
+from ci_dashboard import schema
+from ci_dashboard.models import CiSystem
+
+
+class SchemaTests(TestCase):
+
+    def setUp(self):
+        schema.reset_validator()
+        self.addCleanup(schema.reset_validator)
+
+    def test_validator_is_built_once(self):
+        with mock.patch.object(
+            schema, '_load_schema', wraps=schema._load_schema
+        ) as load_schema:
+            validator = schema.get_validator()
+
+            self.assertIsNotNone(validator)
+            self.assertIs(schema.get_validator(), validator)
+            self.assertEqual(load_schema.call_count, 1)
+
+    @override_settings(JSON_SCHEMA_PATH='/unexistent/schema.json')
+    def test_broken_schema_is_reported(self):
+        result = CiSystem.create_from_seeds({'sources': {}})
+
+        self.assertIsNone(schema.get_validator())
+        self.assertTrue(
+            'Something went wrong' in result['errors'][0])
+
+    def test_all_violations_are_reported(self):
+        result = CiSystem.create_from_seeds({
+            'sources': {
+                'jenkins': [{
+                    'url': 1,
+                    'query': {
+                        'jobs': [{'names': ['8.0.test_all']}],
+                    },
+                }]
+            }
+        })
+
+        self.assertEqual(len(result['errors']), 2)
+        self.assertTrue(all(
+            'not follow json schema' in error for error in result['errors']))
+        self.assertTrue(
+            '(at sources/jenkins/0/query/jobs/0)' in result['errors'][0])
+        self.assertTrue('(at sources/jenkins/0/url)' in result['errors'][1])
@@ -0,0 +1,167 @@
+import os
+import shutil
+import tempfile
+
+import mock
+import yaml
+
+from django.test import TestCase
+
+from ci_dashboard import seed_loader
+from ci_dashboard.models import CiSystem
+
+SEED_FILE_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(__file__)), 'fixtures', 'seeds.yaml')
+
+TEAM_SEEDS = """
+dashboards:
+  ci_systems:
+    - title: '{title}'
+      key: {key}
+sources:
+  jenkins:
+    - url: https://{key}.abc.net/
+      query:
+        jobs:
+          - names: [test]
+            dashboards: [{key}]
+"""
+
+
+class SeedLoaderTests(TestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.path)
+
+    def _write(self, name, content):
+        with open(os.path.join(self.path, name), 'w') as f:
+            f.write(content)
+
+    def test_file_is_loaded_as_safe_load_does(self):
+        with open(SEED_FILE_PATH) as f:
+            expected = yaml.safe_load(f)
+
+        self.assertEqual(seed_loader.load_files([SEED_FILE_PATH]), expected)
+
+    def test_aliases_are_resolved_between_entries(self):
+        seeds = seed_loader.load(
+            'sources:\n'
+            '  jenkins:\n'
+            '    - url: a\n'
+            '      query: &query {jobs: []}\n'
+            '    - url: b\n'
+            '      query: *query\n'
+        )
+
+        self.assertEqual(seeds['sources']['jenkins'], [
+            {'url': 'a', 'query': {'jobs': []}},
+            {'url': 'b', 'query': {'jobs': []}},
+        ])
+
+    def test_documents_are_merged(self):
+        seeds = seed_loader.load(
+            TEAM_SEEDS.format(title='A', key='a') + '---\n' +
+            TEAM_SEEDS.format(title='B', key='b')
+        )
+
+        self.assertEqual(
+            [ci['key'] for ci in seeds['dashboards']['ci_systems']],
+            ['a', 'b']
+        )
+        self.assertEqual(len(seeds['sources']['jenkins']), 2)
+
+    def test_directory_files_are_merged_in_name_order(self):
+        self._write('b.yaml', TEAM_SEEDS.format(title='B', key='b'))
+        self._write('a.yml', TEAM_SEEDS.format(title='A', key='a'))
+        self._write('notes.txt', 'not seeds')
+
+        seeds = CiSystem.parse_seeds_file(self.path)
+
+        self.assertEqual(
+            [source['url'] for source in seeds['sources']['jenkins']],
+            ['https://a.abc.net/', 'https://b.abc.net/']
+        )
+
+    def test_invalid_file_fails_all_files(self):
+        self._write('a.yaml', TEAM_SEEDS.format(title='A', key='a'))
+        self._write('b.yaml', 'sources: [')
+
+        self.assertIsNone(CiSystem.parse_seeds_file(self.path))
+
+    def test_files_are_imported_together(self):
+        self._write('a.yaml', TEAM_SEEDS.format(title='A', key='a'))
+        self._write('b.yaml', TEAM_SEEDS.format(title='B', key='b'))
+
+        result = CiSystem.create_from_seed_file([
+            os.path.join(self.path, 'a.yaml'),
+            os.path.join(self.path, 'b.yaml'),
+        ])
+
+        self.assertEqual(result['cis_imported'], 2)
+        self.assertEqual(
+            set(CiSystem.objects.values_list('url', flat=True)),
+            {'https://a.abc.net/', 'https://b.abc.net/'}
+        )
+
+
+class SeedsWatcherTests(TestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.path)
+        self.watcher = seed_loader.SeedsWatcher([self.path])
+
+    def _write(self, name, content, mtime=1):
+        path = os.path.join(self.path, name)
+        with open(path, 'w') as f:
+            f.write(content)
+        os.utime(path, (mtime, mtime))
+
+    def _urls(self, seeds):
+        return [source['url'] for source in seeds['sources']['jenkins']]
+
+    def test_only_changed_files_are_parsed_again(self):
+        self._write('a.yaml', TEAM_SEEDS.format(title='A', key='a'))
+        self._write('b.yaml', TEAM_SEEDS.format(title='B', key='b'))
+        self.watcher.poll()
+
+        self.assertIsNone(self.watcher.poll())
+
+        self._write('b.yaml', TEAM_SEEDS.format(title='C', key='c'), mtime=2)
+        with mock.patch.object(
+            seed_loader, '_load_file', wraps=seed_loader._load_file
+        ) as load_file:
+            seeds = self.watcher.poll()
+
+        load_file.assert_called_once_with(os.path.join(self.path, 'b.yaml'))
+        self.assertEqual(
+            self._urls(seeds), ['https://a.abc.net/', 'https://c.abc.net/'])
+
+    def test_removed_files_are_noticed(self):
+        self._write('a.yaml', TEAM_SEEDS.format(title='A', key='a'))
+        self._write('b.yaml', TEAM_SEEDS.format(title='B', key='b'))
+        self.watcher.poll()
+
+        os.remove(os.path.join(self.path, 'b.yaml'))
+
+        self.assertEqual(
+            self._urls(self.watcher.poll()), ['https://a.abc.net/'])
+
+    def test_broken_file_holds_the_seeds_back(self):
+        self._write('a.yaml', TEAM_SEEDS.format(title='A', key='a'))
+        self._write('b.yaml', TEAM_SEEDS.format(title='B', key='b'))
+        self.watcher.poll()
+
+        self._write('a.yaml', 'sources: [', mtime=2)
+        self.assertIsNone(self.watcher.poll())
+
+        self._write('b.yaml', TEAM_SEEDS.format(title='C', key='c'), mtime=2)
+        self.assertIsNone(self.watcher.poll())
+
+        self._write('a.yaml', TEAM_SEEDS.format(title='A', key='a'), mtime=3)
+        self.assertEqual(
+            self._urls(self.watcher.poll()),
+            ['https://a.abc.net/', 'https://c.abc.net/']
+        )
+        self.assertFalse(self.watcher.broken)
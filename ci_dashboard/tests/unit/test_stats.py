@@ -0,0 +1,36 @@
+from django.core.cache import cache
+from django.test import TestCase
+
+from ci_dashboard.models import LAST_SYNC_LOCAL_CACHE, Stats
+from ci_dashboard.models import last_sync_timestamp, update_last_sync_timestamp
+
+
+class LastSyncTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        LAST_SYNC_LOCAL_CACHE.clear()
+
+    def test_last_sync_created_on_first_read(self):
+        timestamp = last_sync_timestamp()
+
+        self.assertEqual(
+            Stats.objects.get(name='last_sync').updated_at, timestamp)
+
+    def test_last_sync_read_from_cache(self):
+        timestamp = last_sync_timestamp()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(last_sync_timestamp(), timestamp)
+
+        LAST_SYNC_LOCAL_CACHE.clear()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(last_sync_timestamp(), timestamp)
+
+    def test_update_refreshes_cached_timestamp(self):
+        timestamp = last_sync_timestamp()
+        update_last_sync_timestamp()
+
+        with self.assertNumQueries(0):
+            self.assertGreater(last_sync_timestamp(), timestamp)
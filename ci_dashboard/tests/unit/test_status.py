@@ -10,6 +10,7 @@ from ci_dashboard.constants import (
 )
 from ci_dashboard.models import CiSystem, Status
 from ci_dashboard.models import Rule, RuleCheck
+from ci_dashboard.models import StatusEvent, StatusTransition
 
 
 class StatusTests(TestCase):
@@ -166,3 +167,94 @@ class StatusTests(TestCase):
 
         status2.delete()
         self.assertEqual(RuleCheck.objects.count(), 0)
+
+    def test_latest_statuses_with_rule_checks_counts(self):
+        """Dashboard reads counts of the latest statuses in one query"""
+        other_ci = CiSystem.objects.create(url='http://example.com/')
+        rule = Rule.objects.create(name='kilo', ci_system=self.ci)
+
+        old_status = self._make_status()
+        old_status.save()
+        old_status.rulecheck_set.create(rule=rule, status_type=STATUS_FAIL)
+
+        status = self._make_status()
+        status.save()
+        status.rulecheck_set.create(rule=rule)
+        status.rulecheck_set.create(rule=rule, status_type=STATUS_FAIL)
+        other_status = Status.objects.create(
+            summary=self.summary, ci_system=other_ci)
+
+        with self.assertNumQueries(2):
+            statuses = list(Status.latest_with_rule_checks_counts(
+                CiSystem.objects.all()))
+
+        self.assertEqual(statuses, [other_status, status])
+        self.assertEqual(statuses[0].rule_checks_count, 0)
+        self.assertEqual(statuses[0].failed_rule_checks_count, 0)
+        self.assertEqual(statuses[1].rule_checks_count, 2)
+        self.assertEqual(statuses[1].failed_rule_checks_count, 1)
+
+
+class ManualStatusesTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user('tempo', 'tempo@gmail.com')
+        self.ci = CiSystem.objects.create(url='http://localhost/', name='CI')
+        self.other_ci = CiSystem.objects.create(
+            url='http://otherhost/', name='Other CI')
+
+    def test_batch_is_created_with_timelines_and_events(self):
+        previous = self.ci.status_set.create(
+            summary='Auto', status_type=STATUS_SUCCESS)
+        StatusTransition.record(previous)
+
+        statuses, errors = Status.create_manual([
+            {'ci_system': self.ci.pk, 'status_type': 'Failed',
+             'summary': 'outage'},
+            {'ci_system': self.other_ci.pk, 'status_type': STATUS_SKIP,
+             'summary': 'outage', 'description': 'network is down'},
+            {'ci_system': self.ci.pk, 'status_type': STATUS_SKIP,
+             'summary': 'still down'},
+        ], self.user)
+
+        self.assertEqual(errors, [])
+        self.assertEqual(
+            [(status.ci_system_id, status.status_type, status.is_manual,
+              status.user) for status in statuses],
+            [(self.ci.pk, STATUS_FAIL, True, self.user),
+             (self.other_ci.pk, STATUS_SKIP, True, self.user),
+             (self.ci.pk, STATUS_SKIP, True, self.user)]
+        )
+        self.assertEqual(
+            list(StatusTransition.objects.filter(ci_system=self.ci)
+                 .values_list('status_type', 'ended_at')),
+            [(STATUS_SUCCESS, statuses[0].created_at),
+             (STATUS_FAIL, statuses[2].created_at),
+             (STATUS_SKIP, None)]
+        )
+        self.assertEqual(
+            [(event.object_id, event.payload()['previous_status_type'])
+             for event in StatusEvent.objects.all()],
+            [(self.ci.pk, STATUS_SUCCESS),
+             (self.other_ci.pk, None),
+             (self.ci.pk, STATUS_FAIL)]
+        )
+
+    def test_invalid_records_fail_the_whole_batch(self):
+        statuses, errors = Status.create_manual([
+            {'ci_system': self.ci.pk, 'status_type': STATUS_FAIL,
+             'summary': 'outage'},
+            {'ci_system': 0, 'status_type': STATUS_FAIL, 'summary': 'x'},
+            {'ci_system': self.ci.pk, 'status_type': 'Unknown',
+             'summary': ''},
+            'not a status',
+        ], self.user)
+
+        self.assertEqual(statuses, [])
+        self.assertEqual(len(errors), 3)
+        self.assertTrue(errors[0].startswith('Status #1: CI system 0'))
+        self.assertTrue('status_type' in errors[1])
+        self.assertTrue('summary' in errors[1])
+        self.assertTrue(errors[2].startswith('Status #3:'))
+        self.assertFalse(Status.objects.exists())
+        self.assertFalse(StatusEvent.objects.exists())
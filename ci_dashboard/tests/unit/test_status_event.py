@@ -0,0 +1,87 @@
+import mock
+
+from django.test import TestCase
+
+from ci_dashboard import constants
+from ci_dashboard.models import CiSystem, ProductCi, Rule, RuleCheck
+from ci_dashboard.models import StatusEvent
+
+
+class StatusEventTests(TestCase):
+
+    def setUp(self):
+        self.ci = CiSystem.objects.create(url='http://localhost/', name='CI')
+
+    def test_latest_id_without_events(self):
+        self.assertEqual(StatusEvent.latest_id(), 0)
+
+    def test_ci_status_published(self):
+        status = self.ci.status_set.create(
+            summary='Broken', status_type=constants.STATUS_FAIL)
+
+        event = StatusEvent.publish_ci_status(status)
+
+        self.assertEqual(event.event_type, constants.EVENT_CI_STATUS)
+        self.assertEqual(event.object_id, self.ci.pk)
+        self.assertEqual(event.payload()['status'], status.pk)
+        self.assertEqual(event.payload()['status_text'], 'Failed')
+        self.assertEqual(event.payload()['rule_checks'], 0)
+        self.assertEqual(StatusEvent.latest_id(), event.pk)
+
+    def test_ci_status_event_carries_previous_status_type(self):
+        first = self.ci.status_set.create(
+            summary='Auto', status_type=constants.STATUS_SUCCESS)
+        second = self.ci.status_set.create(
+            summary='Broken', status_type=constants.STATUS_FAIL)
+
+        self.assertIsNone(
+            StatusEvent.publish_ci_status(first).payload()[
+                'previous_status_type'])
+        self.assertEqual(
+            StatusEvent.publish_ci_status(second).payload()[
+                'previous_status_type'],
+            constants.STATUS_SUCCESS
+        )
+
+    def test_product_status_published(self):
+        pci = ProductCi.objects.create(name='Product', version='9.0')
+        status = pci.productcistatus_set.create(summary='Auto')
+
+        event = StatusEvent.publish_product_status(status)
+
+        self.assertEqual(event.event_type, constants.EVENT_PRODUCT_STATUS)
+        self.assertEqual(event.payload()['product_ci'], pci.pk)
+        self.assertEqual(event.payload()['version'], '9.0')
+
+    @mock.patch.object(Rule, 'check_rule')
+    def test_check_the_status_publishes_events(self, _check_mock):
+        rule = self.ci.rule_set.create(name='kilo', is_active=True)
+        _check_mock.return_value = RuleCheck(
+            rule=rule,
+            build_number=1,
+            status_type=constants.STATUS_SUCCESS,
+        )
+
+        self.ci.check_the_status()
+
+        self.assertEqual(
+            list(StatusEvent.objects.values_list('event_type', flat=True)),
+            [constants.EVENT_RULE_CHECK, constants.EVENT_CI_STATUS]
+        )
+        self.assertEqual(
+            StatusEvent.objects.last().payload()['rule_checks'], 1)
+
+    @mock.patch.object(Rule, 'check_rule')
+    def test_unchanged_status_is_not_published(self, _check_mock):
+        rule = self.ci.rule_set.create(name='kilo', is_active=True)
+        _check_mock.return_value = RuleCheck(
+            rule=rule,
+            build_number=1,
+            status_type=constants.STATUS_SUCCESS,
+        )
+
+        self.ci.check_the_status()
+        before = StatusEvent.objects.count()
+        self.ci.check_the_status()
+
+        self.assertEqual(StatusEvent.objects.count(), before)
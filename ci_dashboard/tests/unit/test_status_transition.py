@@ -0,0 +1,104 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from ci_dashboard.constants import STATUS_FAIL, STATUS_SKIP, STATUS_SUCCESS
+from ci_dashboard.models import CiSystem, ProductCi, Status, StatusEvent
+from ci_dashboard.models import StatusTransition
+
+
+class StatusTransitionTests(TestCase):
+
+    def setUp(self):
+        self.ci = CiSystem.objects.create(url='http://localhost/', name='CI')
+
+    def _write_status(self, status_type):
+        status = Status.objects.create(
+            summary='Auto', ci_system=self.ci, status_type=status_type)
+        StatusTransition.record(status)
+        return status
+
+    def _timeline(self):
+        return list(StatusTransition.objects.filter(
+            ci_system=self.ci).values_list('status_type', 'ended_at'))
+
+    def test_interval_started_only_when_status_type_changes(self):
+        first = self._write_status(STATUS_SUCCESS)
+        self._write_status(STATUS_SUCCESS)
+        failed = self._write_status(STATUS_FAIL)
+
+        self.assertEqual(self._timeline(), [
+            (STATUS_SUCCESS, failed.created_at),
+            (STATUS_FAIL, None),
+        ])
+        self.assertEqual(
+            StatusTransition.objects.first().started_at, first.created_at)
+
+    def test_timeline_rebuilt_after_status_deleted(self):
+        first = self._write_status(STATUS_SUCCESS)
+        skipped = self._write_status(STATUS_SKIP)
+        failed = self._write_status(STATUS_FAIL)
+
+        skipped.delete()
+        StatusTransition.rebuild(skipped)
+
+        self.assertEqual(self._timeline(), [
+            (STATUS_SUCCESS, failed.created_at),
+            (STATUS_FAIL, None),
+        ])
+
+        failed.delete()
+        StatusTransition.rebuild(failed)
+
+        self.assertEqual(self._timeline(), [(STATUS_SUCCESS, None)])
+        self.assertEqual(
+            StatusTransition.objects.get().started_at, first.created_at)
+
+    def test_timeline_rebuilt_and_published_after_status_edited(self):
+        self._write_status(STATUS_SUCCESS)
+        edited = self._write_status(STATUS_FAIL)
+        latest = self._write_status(STATUS_SUCCESS)
+
+        edited.status_type = STATUS_SUCCESS
+        edited.save()
+        Status.history_changed([edited])
+
+        self.assertEqual(self._timeline(), [(STATUS_SUCCESS, None)])
+        self.assertEqual(StatusEvent.objects.get().payload()['status'],
+                         latest.pk)
+
+    def test_product_timelines_kept_per_version(self):
+        pci = ProductCi.objects.create(name='Product', version='9.0')
+        for version, status_type in (('8.0', STATUS_FAIL),
+                                     ('9.0', STATUS_SUCCESS),
+                                     ('9.0', STATUS_SUCCESS)):
+            StatusTransition.record(pci.productcistatus_set.create(
+                summary='Auto', status_type=status_type, version=version))
+
+        self.assertEqual(
+            list(StatusTransition.objects.filter(product_ci=pci).values_list(
+                'version', 'status_type')),
+            [('8.0', STATUS_FAIL), ('9.0', STATUS_SUCCESS)]
+        )
+
+    def test_segments_clipped_to_period(self):
+        until = timezone.now()
+        since = until - timedelta(days=4)
+        transitions = [
+            StatusTransition(status_type=STATUS_FAIL,
+                             started_at=since - timedelta(days=2),
+                             ended_at=since + timedelta(days=1)),
+            StatusTransition(status_type=STATUS_SUCCESS,
+                             started_at=since + timedelta(days=1)),
+        ]
+
+        segments = StatusTransition.segments(transitions, since, until)
+
+        self.assertEqual(
+            [(s['status_type'], s['width'], s['is_current'])
+             for s in segments],
+            [(STATUS_FAIL, 25.0, False), (STATUS_SUCCESS, 75.0, True)]
+        )
+        self.assertEqual(segments[0]['started_at'], since)
+        self.assertEqual(segments[1]['ended_at'], until)
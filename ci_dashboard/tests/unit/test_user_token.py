@@ -0,0 +1,54 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from ci_dashboard.models import TOKEN_LOCAL_CACHE, UserToken
+
+
+class UserTokenTests(TestCase):
+
+    def setUp(self):
+        TOKEN_LOCAL_CACHE.clear()
+        self.user = User.objects.create(username='tasty')
+        self.token = UserToken.objects.create(user=self.user)
+
+    def test_token_resolved_to_user_id(self):
+        self.assertEqual(
+            UserToken.user_id_for_token(str(self.token.token)),
+            self.user.pk
+        )
+
+    def test_resolved_token_is_cached(self):
+        UserToken.user_id_for_token(str(self.token.token))
+
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                UserToken.user_id_for_token(str(self.token.token)),
+                self.user.pk
+            )
+
+    def test_invalid_tokens_are_not_resolved(self):
+        self.assertIsNone(UserToken.user_id_for_token('not a token'))
+        self.assertIsNone(
+            UserToken.user_id_for_token('00000000-0000-0000-0000-000000000000')
+        )
+
+    def test_regenerated_token_is_forgotten(self):
+        old_token = str(self.token.token)
+        UserToken.user_id_for_token(old_token)
+
+        self.token.save()
+
+        self.assertIsNone(UserToken.user_id_for_token(old_token))
+        self.assertEqual(
+            UserToken.user_id_for_token(str(self.token.token)),
+            self.user.pk
+        )
+
+    def test_token_authenticates_api_requests(self):
+        self.user.is_staff = True
+        self.user.save()
+
+        response = self.client.get(
+            '/token/', HTTP_TOKEN=str(self.token.token))
+
+        self.assertEqual(response.status_code, 403)
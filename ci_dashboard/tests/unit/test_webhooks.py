@@ -0,0 +1,97 @@
+import json
+import mock
+
+from django.test import TestCase
+from six.moves.urllib.error import URLError
+
+from ci_dashboard import constants, webhooks
+from ci_dashboard.models import CiSystem, Stats, StatusEvent, Webhook
+
+
+class WebhooksTests(TestCase):
+
+    def setUp(self):
+        self.ci = CiSystem.objects.create(url='http://localhost/', name='CI')
+        self.status = self.ci.status_set.create(summary='Auto')
+        self.old_event = StatusEvent.publish_ci_status(self.status)
+        self.webhook = Webhook.objects.create(url='http://hooks.invalid/')
+
+    def _posted_batches(self, urlopen_mock):
+        return [
+            [event['id'] for event in json.loads(
+                call[0][0].data.decode('utf-8'))['events']]
+            for call in urlopen_mock.call_args_list
+        ]
+
+    def test_new_webhook_starts_from_latest_event(self):
+        self.assertEqual(self.webhook.last_event_id, self.old_event.pk)
+
+    @mock.patch.object(webhooks, 'urlopen')
+    def test_pending_events_posted_in_batches(self, urlopen_mock):
+        events = [StatusEvent.publish_ci_status(self.status)
+                  for _ in range(3)]
+
+        delivered = webhooks.dispatch(batch_size=2)
+
+        self.assertEqual(delivered, {self.webhook.url: 3})
+        self.assertEqual(
+            self._posted_batches(urlopen_mock),
+            [[events[0].pk, events[1].pk], [events[2].pk]]
+        )
+        self.webhook.refresh_from_db()
+        self.assertEqual(self.webhook.last_event_id, events[-1].pk)
+
+    @mock.patch.object(webhooks, 'urlopen')
+    def test_failed_batch_is_retried_on_next_run(self, urlopen_mock):
+        event = StatusEvent.publish_ci_status(self.status)
+        urlopen_mock.side_effect = URLError('connection refused')
+
+        self.assertEqual(webhooks.dispatch(), {self.webhook.url: 0})
+        self.webhook.refresh_from_db()
+        self.assertEqual(self.webhook.last_event_id, self.old_event.pk)
+        self.assertIn('connection refused', self.webhook.last_error)
+
+        urlopen_mock.side_effect = None
+        self.assertEqual(webhooks.dispatch(), {self.webhook.url: 1})
+        self.webhook.refresh_from_db()
+        self.assertEqual(self.webhook.last_event_id, event.pk)
+        self.assertEqual(self.webhook.last_error, '')
+
+    @mock.patch.object(webhooks, 'urlopen')
+    def test_only_subscribed_event_types_posted(self, urlopen_mock):
+        self.webhook.event_types = constants.EVENT_PRODUCT_STATUS
+        self.webhook.save()
+        StatusEvent.publish_ci_status(self.status)
+
+        self.assertEqual(webhooks.dispatch(), {self.webhook.url: 0})
+        self.assertFalse(urlopen_mock.called)
+
+    @mock.patch.object(webhooks, 'urlopen')
+    def test_overlapping_runs_are_skipped(self, urlopen_mock):
+        StatusEvent.publish_ci_status(self.status)
+        Stats.objects.create(name=webhooks.DISPATCH_LOCK_NAME,
+                             value=2 ** 40)
+
+        self.assertEqual(webhooks.dispatch(), {})
+        self.assertFalse(urlopen_mock.called)
+
+        Stats.objects.filter(name=webhooks.DISPATCH_LOCK_NAME).update(value=0)
+        self.assertEqual(webhooks.dispatch(), {self.webhook.url: 1})
+        self.assertEqual(
+            Stats.objects.get(name=webhooks.DISPATCH_LOCK_NAME).value, 0)
+
+    @mock.patch.object(webhooks, 'urlopen')
+    def test_lock_taken_over_by_another_run_is_kept(self, urlopen_mock):
+        StatusEvent.publish_ci_status(self.status)
+
+        def take_over(*args, **kwargs):
+            # the lock expired while this run posted the events
+            Stats.objects.filter(
+                name=webhooks.DISPATCH_LOCK_NAME).update(value=2 ** 40)
+            return mock.MagicMock()
+
+        urlopen_mock.side_effect = take_over
+
+        self.assertEqual(webhooks.dispatch(), {self.webhook.url: 1})
+        self.assertEqual(
+            Stats.objects.get(name=webhooks.DISPATCH_LOCK_NAME).value, 2 ** 40)
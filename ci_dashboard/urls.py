@@ -29,13 +29,33 @@ statuses = [
     url(r'^(?P<pk>\d+)/delete/$', views.status_delete, name='status_delete'),
 ]
 
+api = [
+    url(r'^changes/$', views.changes, name='api_changes'),
+    url(r'^events/$', views.events, name='api_events'),
+    url(r'^history/(?P<pk>\d+)/$', views.history, name='api_history'),
+    url(r'^reliability/(?P<scope>\w+)/(?P<pk>\d+)/$', views.reliability_api,
+        name='api_reliability'),
+    url(r'^flaky_rules/$', views.flaky_rules, name='api_flaky_rules'),
+    url(r'^export/(?P<source>\w+)/$', views.export_history,
+        name='api_export_history'),
+    url(r'^import_jobs/(?P<pk>\d+)/$', views.import_job_status,
+        name='api_import_job'),
+    url(r'^statuses/$', views.statuses_bulk, name='api_statuses'),
+    url(r'^import_file/$', views.import_file_json, name='api_import_file'),
+]
+
 urlpatterns = [
     url(r'^$', views.index, name='ci_dashboard_index'),
     url(r'^dashboard/$', views.dashboard, name='ci_dashboard_dashboard'),
     url(r'^inline_dashboard/$', views.inline_dashboard,
         name='ci_dashboard_inline_dashboard'),
     url(r'^statuses/', include(statuses)),
+    url(r'^reliability/$', views.reliability, name='reliability'),
+    url(r'^timeline/(?P<scope>ci_system|product_ci)/(?P<pk>\d+)/$',
+        views.timeline, name='timeline'),
+    url(r'^api/', include(api)),
     url(r'^import_file/$', views.import_file, name='import_file'),
+    url(r'^import_jobs/(?P<pk>\d+)/$', views.import_job, name='import_job'),
     url(r'^token/$', views.generate_token, name='generate_token'),
     url(r'^admin/', admin.site.urls),
     url(
@@ -44,8 +64,6 @@ urlpatterns = [
         name='ci_status_history'
     ),
 
-    url(r'^import_file/$', views.import_file_json, name='api_import_file'),
-
     url(r'^accounts/login/$',
         'django.contrib.auth.views.login',
         {'template_name': 'ci_dashboard/login.html'}, name='login'),
@@ -1,22 +1,31 @@
 import logging
 
-from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
+from datetime import timedelta
+
+from django.conf import settings
 from django.shortcuts import redirect, render, get_object_or_404
 from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import permission_required
 from django.core.context_processors import csrf
 from django.core.urlresolvers import reverse
 from django.utils import timezone
+from django.utils.dateparse import parse_date
 from django.contrib import messages
 
 import json
 
 from django.contrib.auth import authenticate
-from django.http import HttpResponse
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse, QueryDict, StreamingHttpResponse
 from django.views.decorators.csrf import csrf_exempt
 from django import forms
 
-from ci_dashboard.models import CiSystem, ProductCi, Status, UserToken
+from ci_dashboard import constants, cursors, export, rollups, tasks
+from ci_dashboard.constants import STATUS_TYPE_CHOICES
+from ci_dashboard.models import (
+    CiSystem, ImportJob, ProductCi, ProductCiStatus, Rule, RuleCheck,
+    RuleFlakiness, Status, StatusEvent, StatusTransition, UserToken
+)
 
 
 LOGGER = logging.getLogger(__name__)
@@ -40,25 +49,100 @@ def index(request):
     return render(request, 'ci_dashboard/index.html', context)
 
 
+HISTORY_PAGE_SIZE = 10
+
+
 def ci_status_history(request, pk):
     ci = get_object_or_404(CiSystem, pk=pk)
-    paginator = Paginator(ci.status_set.all(), 10)
 
-    page = request.GET.get('page')
     try:
-        statuses = paginator.page(page)
-    except PageNotAnInteger:
-        statuses = paginator.page(1)
-    except EmptyPage:
-        statuses = paginator.page(paginator.num_pages)
+        statuses, newer, older = _status_history_page(ci, request.GET)
+    except ValueError as exc:
+        messages.error(request, 'Invalid history filters: %s' % exc)
+        statuses, newer, older = _status_history_page(ci, QueryDict())
+
+    filters = request.GET.copy()
+    filters.pop('before', None)
+    filters.pop('after', None)
 
     return render(
         request,
         'ci_dashboard/ci_status_history.html',
-        {'statuses': statuses, 'ci': ci}
+        {
+            'statuses': statuses,
+            'ci': ci,
+            'newer': newer,
+            'older': older,
+            'filters': filters,
+            'filters_query': filters.urlencode(),
+            'status_types': STATUS_TYPE_CHOICES,
+        }
+    )
+
+
+def _status_history_page(ci, params, limit=HISTORY_PAGE_SIZE):
+    """Page of the CI statuses, newest first.
+
+    Pages are read by `(created_at, id)` keys passed in the `before` and
+    `after` cursors, so the cost of a page does not depend on its depth.
+    Returns the statuses and the cursors of the newer and the older pages,
+    cursors are None when there is nothing to show there.
+    """
+    queryset = ci.status_set.select_related('ci_system', 'user')
+
+    status_types = params.getlist('status_type')
+    if status_types:
+        queryset = queryset.filter(
+            status_type__in=[int(t) for t in status_types])
+
+    if params.get('from'):
+        queryset = queryset.filter(
+            created_at__gte=cursors.parse_timestamp(params['from']))
+
+    if params.get('to'):
+        to = cursors.parse_timestamp(params['to'])
+        if parse_date(params['to']):  # whole day is included
+            to += timedelta(days=1)
+        queryset = queryset.filter(created_at__lt=to)
+
+    if params.get('after'):
+        position = _history_position(params['after'])
+        statuses = list(queryset.filter(
+            cursors.after('created_at', position)
+        ).order_by('created_at', 'id')[:limit + 1])
+        has_newer, has_older = len(statuses) > limit, True
+        statuses = statuses[:limit][::-1]
+    else:
+        if params.get('before'):
+            queryset = queryset.filter(cursors.before(
+                'created_at', _history_position(params['before'])))
+        statuses = list(
+            queryset.order_by('-created_at', '-id')[:limit + 1])
+        has_newer = bool(params.get('before'))
+        has_older = len(statuses) > limit
+        statuses = statuses[:limit]
+
+    if not statuses:
+        return statuses, None, None
+
+    return (
+        statuses,
+        _history_cursor(statuses[0]) if has_newer else None,
+        _history_cursor(statuses[-1]) if has_older else None,
     )
 
 
+def _history_cursor(status):
+    return cursors.encode_cursor({'status': (status.created_at, status.pk)})
+
+
+def _history_position(cursor):
+    try:
+        return cursors.decode_cursor(cursor)['status']
+    except KeyError:
+        raise cursors.CursorError('Invalid cursor: %s' % cursor)
+
+
 def dashboard(request):
     context = _dashboard_context(request)
     return render(request, 'ci_dashboard/dashboard.html', context)
@@ -103,18 +187,109 @@ def _dashboard_context(request):
             ))
             number += 1
 
-    statuses_summaries = [
-        ci_system.latest_status()
-        for ci_system in ci_systems
-        if ci_system.latest_status()
-    ]
+    statuses_summaries = list(
+        Status.latest_with_rule_checks_counts(ci_systems))
+    _attach_sparklines(
+        statuses_summaries, [pci for _, _, _, pci, _ in products_with_versions])
+    flaky_by_ci = RuleFlakiness.top_by_ci(
+        ci_systems, settings.FLAKY_RULES_LIMIT)
+    flaky_by_product = RuleFlakiness.top_by_product(
+        product_statuses, settings.FLAKY_RULES_LIMIT)
 
     return {
         'statuses_summaries': list(enumerate(statuses_summaries, 1)),
         'products_with_versions': products_with_versions,
+        'sparkline_days': settings.SPARKLINE_DAYS,
+        'last_event_id': StatusEvent.latest_id(),
+        'live_updates_interval': settings.LIVE_UPDATES_INTERVAL,
+        'flaky_rules': [
+            (ci, flaky_by_ci[ci.pk])
+            for ci in ci_systems if flaky_by_ci[ci.pk]
+        ] + [
+            (pci, flaky_by_product[pci.pk])
+            for pci in product_statuses if flaky_by_product[pci.pk]
+        ],
     }
 
 
+def _attach_sparklines(statuses, product_cis):
+    until = timezone.now()
+    since = until - timedelta(days=settings.SPARKLINE_DAYS)
+
+    ci_sparklines = StatusTransition.sparklines_by_ci(
+        [status.ci_system for status in statuses], since, until)
+    product_sparklines = StatusTransition.sparklines_by_product(
+        product_cis, since, until)
+
+    for status in statuses:
+        status.sparkline = ci_sparklines[status.ci_system_id]
+
+    for pci in product_cis:
+        pci.sparkline = product_sparklines[(pci.pk, pci.version)]
+
+
+TIMELINE_SCOPES = {
+    constants.ROLLUP_CI_SYSTEM: CiSystem,
+    constants.ROLLUP_PRODUCT_CI: ProductCi,
+}
+
+
+def timeline(request, scope, pk):
+    obj = get_object_or_404(TIMELINE_SCOPES[scope], pk=pk)
+    days = _report_days(request.GET.get('days'))
+    until = timezone.now()
+    since = until - timedelta(days=days)
+    transitions = StatusTransition.in_period(since)
+
+    if scope == constants.ROLLUP_CI_SYSTEM:
+        transitions = transitions.filter(ci_system=obj)
+        version = ''
+    else:
+        version = request.GET.get('version', obj.version)
+        transitions = transitions.filter(product_ci=obj, version=version)
+
+    return render(request, 'ci_dashboard/timeline.html', {
+        'object': obj,
+        'scope': scope,
+        'version': version,
+        'days': days,
+        'report_days': settings.REPORT_DAYS,
+        'segments': StatusTransition.segments(transitions, since, until),
+    })
+
+
+EVENTS_LIMIT = 100
+EVENTS_MAX_LIMIT = 1000
+
+
+def events(request):
+    """Status events published after the `after` event id, oldest first."""
+    try:
+        after = int(request.GET.get('after', 0))
+        limit = min(int(request.GET.get('limit', EVENTS_LIMIT)),
+                    EVENTS_MAX_LIMIT)
+        if limit < 1:
+            raise ValueError(limit)
+    except ValueError as exc:
+        return _json_response(status=400, errors=[
+            'Invalid events request: %s' % exc
+        ])
+
+    queryset = StatusEvent.objects.filter(id__gt=after)
+
+    if request.GET.getlist('event_type'):
+        queryset = queryset.filter(
+            event_type__in=request.GET.getlist('event_type'))
+
+    new_events = list(queryset[:limit])
+
+    return _json_response(status=200, data={
+        'events': [event.as_dict() for event in new_events],
+        'last_id': new_events[-1].pk if new_events else after,
+        'has_more': len(new_events) == limit,
+    })
+
+
 @csrf_exempt
 def import_file_json(request):
     if request.POST and request.FILES:
@@ -151,31 +326,20 @@ def import_file_json(request):
 
 
 def _import_file(request):
-    seeds = CiSystem.parse_seeds_from_stream(
-        request.FILES['file'].read()
-    )
-
-    if seeds:
-        import_result = CiSystem.create_from_seeds(seeds)
+    seeds = CiSystem.parse_seeds_from_stream(request.FILES.getlist('file'))
 
-        success_message_format = (
-            '{cis_imported} of total {cis_total} Ci Systems and '
-            '{ps_imported} of total {ps_total} Product Statuses '
-            'were imported.'
-        )
+    if seeds and _is_plan(request):
+        plan = CiSystem.plan_from_seeds(seeds)
 
-        success_message = success_message_format.format(
-            cis_imported=import_result.get('cis_imported'),
-            cis_total=import_result.get('cis_total'),
-            ps_imported=import_result.get('ps_imported'),
-            ps_total=import_result.get('ps_total')
-        )
+        return _json_response(data={'plan': plan}, errors=plan['errors'])
+    elif seeds:
+        job = _queue_import(seeds, request.user)
 
         return _json_response(
-            status=200,
+            status=202,
             data={
-                'success_message': success_message,
-                'error_messages': import_result.get('errors', [])
+                'job_id': job.pk,
+                'status_url': reverse('api_import_job', args=[job.pk]),
             })
     else:
         return _json_response(
@@ -185,20 +349,294 @@ def _import_file(request):
             ])
 
 
+def _is_plan(request):
+    return request.POST.get('plan', '').lower() in ('1', 'true', 'yes')
+
+
+def _queue_import(seeds, user):
+    job = ImportJob.objects.create(
+        seeds=json.dumps(seeds),
+        user=user if user.is_authenticated() else None,
+    )
+    tasks.run_import_job.delay(job.pk)
+
+    return job
+
+
 def _json_response(status=200, data={}, errors=[]):
     return HttpResponse(
         json.dumps({
             'status': status,
             'data': data,
             'errors': errors
-        }),
+        }, cls=DjangoJSONEncoder),
         status=status,
         content_type='application/json')
 
 
+CHANGES_LIMIT = 500
+CHANGES_MAX_LIMIT = 5000
+
+STATUS_FIELDS = (
+    'id', 'ci_system', 'status_type', 'summary', 'description',
+    'is_manual', 'user', 'created_at', 'updated_at', 'last_changed_at',
+)
+
+CHANGES_SOURCES = (
+    ('statuses', Status, STATUS_FIELDS),
+    ('product_statuses', ProductCiStatus, (
+        'id', 'product_ci', 'version', 'status_type', 'summary',
+        'description', 'is_manual', 'user', 'created_at', 'updated_at',
+        'last_changed_at',
+    )),
+    ('rule_checks', RuleCheck, (
+        'id', 'rule', 'status_type', 'running', 'queued', 'build_number',
+        'last_successfull_build_link', 'last_failed_build_link',
+        'created_at', 'last_seen', 'updated_at',
+    )),
+)
+
+
+def changes(request):
+    """Rows created or changed after the `since` timestamp or `cursor`.
+
+    Every response carries a new cursor to be passed with the next request,
+    `has_more` is set when some of the changes did not fit the `limit`.
+    """
+    try:
+        limit = min(
+            int(request.GET.get('limit', CHANGES_LIMIT)), CHANGES_MAX_LIMIT)
+        if limit < 1:
+            raise ValueError(limit)
+
+        if request.GET.get('cursor'):
+            positions = cursors.decode_cursor(request.GET['cursor'])
+        elif request.GET.get('since'):
+            since = cursors.parse_timestamp(request.GET['since'])
+            positions = {name: (since, 0) for name, _, _ in CHANGES_SOURCES}
+        else:
+            positions = {}
+    except ValueError as exc:
+        return _json_response(status=400, errors=[
+            'Invalid changes request: %s' % exc
+        ])
+
+    data = {'has_more': False}
+
+    for name, model, fields in CHANGES_SOURCES:
+        queryset = model.objects.order_by('updated_at', 'id')
+
+        if name in positions:
+            queryset = queryset.filter(
+                cursors.after('updated_at', positions[name]))
+
+        rows = list(queryset.values(*fields)[:limit])
+
+        if rows:
+            positions[name] = (rows[-1]['updated_at'], rows[-1]['id'])
+
+        if len(rows) == limit:
+            data['has_more'] = True
+
+        data[name] = rows
+
+    _attach_rule_check_statuses(data['rule_checks'])
+    data['cursor'] = cursors.encode_cursor(positions)
+
+    return _json_response(status=200, data=data)
+
+
+def history(request, pk):
+    """CI statuses history API, paginated the same way as the web page."""
+    ci = get_object_or_404(CiSystem, pk=pk)
+
+    try:
+        limit = min(
+            int(request.GET.get('limit', HISTORY_PAGE_SIZE)),
+            CHANGES_MAX_LIMIT
+        )
+        if limit < 1:
+            raise ValueError(limit)
+
+        statuses, newer, older = _status_history_page(
+            ci, request.GET, limit)
+    except ValueError as exc:
+        return _json_response(status=400, errors=[
+            'Invalid history request: %s' % exc
+        ])
+
+    return _json_response(status=200, data={
+        'statuses': [
+            {field: status.serializable_value(field)
+             for field in STATUS_FIELDS}
+            for status in statuses
+        ],
+        'newer': newer,
+        'older': older,
+    })
+
+
+def export_history(request, source):
+    """Streams the history of the source as NDJSON or CSV."""
+    if not request.user.is_authenticated():
+        return _json_response(status=401, errors=[
+            'History export is available to authenticated users only.'
+        ])
+
+    export_format = request.GET.get('format', 'ndjson')
+    compress = request.GET.get('gzip') == '1'
+
+    try:
+        stream = export.export(
+            source,
+            export_format=export_format,
+            date_from=request.GET.get('from'),
+            date_to=request.GET.get('to'),
+            compress=compress,
+        )
+    except ValueError as exc:
+        return _json_response(status=400, errors=[
+            'Invalid export request: %s' % exc
+        ])
+
+    filename = '{}.{}{}'.format(
+        source, export_format, '.gz' if compress else '')
+    response = StreamingHttpResponse(
+        stream, content_type=export.CONTENT_TYPES[export_format])
+    response['Content-Disposition'] = (
+        'attachment; filename="{}"'.format(filename))
+
+    return response
+
+
+def _attach_rule_check_statuses(rule_checks):
+    statuses = {rc['id']: [] for rc in rule_checks}
+
+    for rule_check_id, status_id in RuleCheck.status.through.objects.filter(
+        rulecheck_id__in=list(statuses)
+    ).values_list('rulecheck_id', 'status_id'):
+        statuses[rule_check_id].append(status_id)
+
+    for rule_check in rule_checks:
+        rule_check['statuses'] = statuses[rule_check['id']]
+
+
+def reliability(request):
+    days = _report_days(request.GET.get('days'))
+    ci_systems = CiSystem.objects.filter(is_active=True).order_by('url')
+    product_cis = ProductCi.objects.filter(is_active=True).order_by('name')
+
+    ci_summaries = rollups.summarize(
+        constants.ROLLUP_CI_SYSTEM, days, [ci.pk for ci in ci_systems])
+    product_summaries = rollups.summarize(
+        constants.ROLLUP_PRODUCT_CI, days, [pci.pk for pci in product_cis])
+
+    return render(request, 'ci_dashboard/reliability.html', {
+        'days': days,
+        'report_days': settings.REPORT_DAYS,
+        'ci_systems': [
+            (ci, ci_summaries.get((ci.pk, ''))) for ci in ci_systems
+        ],
+        'product_cis': [
+            (pci, product_summaries.get((pci.pk, pci.version)))
+            for pci in product_cis
+        ],
+    })
+
+
+RELIABILITY_SCOPES = {
+    constants.ROLLUP_RULE: Rule,
+    constants.ROLLUP_CI_SYSTEM: CiSystem,
+    constants.ROLLUP_PRODUCT_CI: ProductCi,
+}
+
+
+def reliability_api(request, scope, pk):
+    """Reliability summary and daily series of a rule, CI or product."""
+    if scope not in RELIABILITY_SCOPES:
+        return _json_response(status=404, errors=[
+            'Unknown reliability scope: %s' % scope
+        ])
+
+    obj = get_object_or_404(RELIABILITY_SCOPES[scope], pk=pk)
+    days = _report_days(request.GET.get('days'))
+    version = request.GET.get('version', getattr(obj, 'version', ''))
+
+    return _json_response(status=200, data={
+        'days': days,
+        'summary': rollups.summarize(scope, days, [obj.pk]).get(
+            (obj.pk, version)),
+        'daily': rollups.daily_series(scope, obj.pk, days, version),
+    })
+
+
+FLAKY_RULES_MAX_LIMIT = 100
+
+
+def flaky_rules(request):
+    """The flakiest rules of every active CI and product, or of given ones."""
+    ci_systems = CiSystem.objects.filter(is_active=True)
+    product_cis = ProductCi.objects.filter(is_active=True)
+
+    try:
+        limit = min(
+            int(request.GET.get('limit', settings.FLAKY_RULES_LIMIT)),
+            FLAKY_RULES_MAX_LIMIT
+        )
+        if limit < 1:
+            raise ValueError(limit)
+
+        if request.GET.get('ci') or request.GET.get('product'):
+            ci_systems = ci_systems.filter(
+                pk__in=[int(pk) for pk in request.GET.getlist('ci')])
+            product_cis = product_cis.filter(
+                pk__in=[int(pk) for pk in request.GET.getlist('product')])
+    except ValueError as exc:
+        return _json_response(status=400, errors=[
+            'Invalid flaky rules request: %s' % exc
+        ])
+
+    return _json_response(status=200, data={
+        'ci_systems': _flaky_rules_data(
+            RuleFlakiness.top_by_ci(ci_systems, limit)),
+        'products': _flaky_rules_data(
+            RuleFlakiness.top_by_product(product_cis, limit)),
+    })
+
+
+def _flaky_rules_data(flaky_by_key):
+    return {
+        key: [
+            {
+                'rule': flakiness.rule_id,
+                'name': flakiness.rule.name,
+                'score': flakiness.score,
+                'builds': flakiness.size,
+                'failures': flakiness.failures,
+                'last_build_number': flakiness.last_build_number,
+            }
+            for flakiness in top
+        ]
+        for key, top in flaky_by_key.items()
+    }
+
+
+def _report_days(value):
+    try:
+        days = int(value)
+    except (TypeError, ValueError):
+        days = None
+
+    if days not in settings.REPORT_DAYS:
+        days = max(settings.REPORT_DAYS)
+
+    return days
+
+
 class ImportFileForm(forms.Form):
-    label = 'Select a YAML file'
-    file = forms.FileField()
+    label = 'Select YAML files'
+    file = forms.FileField(
+        widget=forms.ClearableFileInput(attrs={'multiple': True}))
 
 
 class StatusForm(forms.ModelForm):
@@ -244,6 +682,8 @@ def status_new(request, ci_id=None):
         status.user = request.user
         status.last_changed_at = timezone.now()
         status.save()
+        StatusTransition.record(status)
+        StatusEvent.publish_ci_status(status)
         return redirect('status_detail', pk=status.pk)
 
     return render(request, 'status_new.html', context)
@@ -253,6 +693,7 @@ def status_new(request, ci_id=None):
 @permission_required('ci_system.change_status', raise_exception=True)
 def status_edit(request, pk):
     status = get_object_or_404(Status, pk=pk)
+    previous_ci_id = status.ci_system_id
 
     form = StatusForm(request.POST or None, instance=status)
     context = {
@@ -266,6 +707,13 @@ def status_edit(request, pk):
         status.last_changed_at = timezone.now()
         status.user = request.user
         status.save()
+
+        if status.ci_system_id != previous_ci_id:
+            StatusTransition.rebuild(
+                Status(ci_system_id=previous_ci_id,
+                       created_at=status.created_at))
+        StatusTransition.rebuild(status)
+        StatusEvent.publish_ci_status(status)
         return redirect('status_detail', pk=status.pk)
 
     return render(request, 'status_edit.html', context)
@@ -283,7 +731,15 @@ def status_delete(request, pk):
     }
 
     if request.POST:
+        ci = status.ci_system
         status.delete()
+        StatusTransition.rebuild(status)
+
+        # dashboards fall back to the previous status of the CI
+        latest_status = ci.latest_status()
+        if latest_status:
+            StatusEvent.publish_ci_status(latest_status)
+
         return redirect('ci_dashboard_index')
 
     return render(request, 'status_delete.html', context)
@@ -300,38 +756,24 @@ def import_file(request):
 
         if form.is_valid():
             seeds = CiSystem.parse_seeds_from_stream(
-                request.FILES['file'].read()
+                request.FILES.getlist('file')
             )
 
-            if seeds:
-                import_result = CiSystem.create_from_seeds(seeds)
-
-                success_message = (
-                    '{cis_imported} of total {cis_total} Ci Systems and '
-                    '{ps_imported} of total {ps_total} Product Statuses '
-                    'were imported.'
-                ).format(
-                    cis_imported=import_result.get('cis_imported'),
-                    cis_total=import_result.get('cis_total'),
-                    ps_imported=import_result.get('ps_imported'),
-                    ps_total=import_result.get('ps_total'),
-                )
-
-                messages.info(request, success_message)
-
-                for error in import_result.get('errors', []):
-                    messages.add_message(
-                        request,
-                        messages.ERROR,
-                        error
-                    )
+            if seeds and is_json and _is_plan(request):
+                return HttpResponse(json.dumps({
+                    'status': 'plan',
+                    'plan': CiSystem.plan_from_seeds(seeds),
+                }))
+            elif seeds:
+                job = _queue_import(seeds, request.user)
 
                 if is_json:
                     return HttpResponse(json.dumps({
-                        'status': 'ok',
-                        'message': success_message,
+                        'status': 'queued',
+                        'job_id': job.pk,
+                        'status_url': reverse('api_import_job', args=[job.pk]),
                     }))
-                return redirect('ci_dashboard_index')
+                return redirect('import_job', pk=job.pk)
             else:
                 error_message = 'Import file format is invalid.'
                 if is_json:
@@ -347,6 +789,86 @@ def import_file(request):
         return render(request, 'import_file.html', {'form': form})
 
 
+@staff_member_required
+def import_job(request, pk):
+    job = get_object_or_404(ImportJob, pk=pk)
+
+    return render(request, 'import_job.html', {'job': job})
+
+
+def import_job_status(request, pk):
+    """Progress of the queued import and its result once finished."""
+    if not request.user.is_authenticated():
+        return _json_response(status=401, errors=[
+            'Import jobs are available to authenticated users only.'
+        ])
+
+    job = ImportJob.objects.filter(pk=pk).first()
+
+    if job is None:
+        return _json_response(status=404, errors=['Import job not found.'])
+
+    if not (request.user.is_staff or job.user_id == request.user.pk):
+        return _json_response(status=403, errors=[
+            'Authenticated user has not enough permissions.'
+        ])
+
+    return _json_response(status=200, data=job.as_dict())
+
+
+MANUAL_STATUSES_MAX_BATCH = 500
+
+
+def statuses_bulk(request):
+    """Creates a batch of manual CI statuses posted as json.
+
+    The body is `{"statuses": [...]}`, every status has the `ci_system`
+    id, the `status_type` id or text, the `summary` and the optional
+    `description`. Either all the statuses are created or none of them.
+    The requests authenticated by the session are checked for csrf.
+    """
+    if request.method != 'POST':
+        return _json_response(status=405, errors=[
+            'Statuses should be posted as json.'
+        ])
+
+    if not request.user.is_authenticated():
+        return _json_response(status=401, errors=[
+            'Statuses are available to authenticated users only.'
+        ])
+
+    if not (request.user.is_staff and
+            request.user.has_perm('ci_system.add_status')):
+        return _json_response(status=403, errors=[
+            'Authenticated user has not enough permissions.'
+        ])
+
+    try:
+        records = json.loads(request.body.decode('utf-8'))['statuses']
+        if not isinstance(records, list):
+            raise ValueError('statuses should be a list')
+    except (KeyError, TypeError, ValueError) as exc:
+        return _json_response(status=400, errors=[
+            'Invalid statuses request: %s' % exc
+        ])
+
+    if not records or len(records) > MANUAL_STATUSES_MAX_BATCH:
+        return _json_response(status=400, errors=[
+            'From 1 to %s statuses could be posted at once.'
+            % MANUAL_STATUSES_MAX_BATCH
+        ])
+
+    statuses, errors = Status.create_manual(records, request.user)
+
+    if errors:
+        return _json_response(status=400, errors=errors)
+
+    return _json_response(status=201, data={'statuses': [
+        {field: status.serializable_value(field) for field in STATUS_FIELDS}
+        for status in statuses
+    ]})
+
+
 @staff_member_required
 @permission_required('ci_system.add_cisystem', raise_exception=True)
 def generate_token(request):
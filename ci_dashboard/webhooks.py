@@ -0,0 +1,114 @@
+"""Delivery of the status events to the configured webhooks.
+
+Events are posted as `{"events": [...]}` json batches in the order they
+were published. The position of every webhook is moved only after its
+batch was accepted, so the events are delivered at least once and the
+failed batches are retried on the next run.
+"""
+
+from __future__ import unicode_literals
+
+import calendar
+import json
+import logging
+import socket
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils import timezone
+from six.moves.urllib.error import URLError
+from six.moves.urllib.request import Request, urlopen
+
+from ci_dashboard.models import Stats, Webhook
+
+LOGGER = logging.getLogger(__name__)
+
+DISPATCH_LOCK_NAME = 'webhooks:dispatch'
+
+
+def dispatch(batch_size=None, timeout=None):
+    """Posts the pending events to every active webhook.
+
+    Returns the numbers of the delivered events keyed by the webhook url.
+    """
+    batch_size = batch_size or settings.WEBHOOKS_BATCH_SIZE
+    timeout = timeout or settings.WEBHOOKS_TIMEOUT
+    delivered = {}
+
+    # runs overlap when some of the webhooks respond slowly
+    expiry = _acquire_lock()
+    if expiry is None:
+        LOGGER.info('Webhooks are being dispatched already, skipped')
+        return delivered
+
+    try:
+        for webhook in Webhook.objects.filter(is_active=True):
+            delivered[webhook.url] = _dispatch_webhook(
+                webhook, batch_size, timeout)
+    finally:
+        # the lock could have expired and been taken by another run
+        Stats.objects.filter(
+            name=DISPATCH_LOCK_NAME, value=expiry).update(value=0)
+
+    return delivered
+
+
+def _acquire_lock():
+    """Takes the dispatch lock kept in `Stats` as its expiry timestamp.
+
+    Returns the expiry of the taken lock or None when it is held. The row
+    is locked only while the lock is taken, so the slow webhooks do not
+    hold a transaction open. The lock of a killed run expires after
+    `WEBHOOKS_LOCK_TIMEOUT`.
+    """
+    now = calendar.timegm(timezone.now().utctimetuple())
+    Stats.objects.get_or_create(name=DISPATCH_LOCK_NAME)
+
+    with transaction.atomic():
+        lock = Stats.objects.select_for_update().get(name=DISPATCH_LOCK_NAME)
+        if lock.value > now:
+            return None
+
+        lock.value = now + settings.WEBHOOKS_LOCK_TIMEOUT
+        lock.save()
+
+    return lock.value
+
+
+def _dispatch_webhook(webhook, batch_size, timeout):
+    delivered = 0
+
+    while True:
+        events = webhook.pending_events(batch_size)
+        if not events:
+            break
+
+        try:
+            _post(webhook.url, [event.as_dict() for event in events], timeout)
+        except (URLError, socket.error) as exc:
+            LOGGER.warning('Webhook %s failed: %s', webhook.url, exc)
+            webhook.last_error = '%s' % exc
+            webhook.save(update_fields=['last_error', 'updated_at'])
+            break
+
+        webhook.last_event_id = events[-1].pk
+        webhook.last_error = ''
+        webhook.save(
+            update_fields=['last_event_id', 'last_error', 'updated_at'])
+        delivered += len(events)
+
+        if len(events) < batch_size:
+            break
+
+    return delivered
+
+
+def _post(url, events, timeout):
+    request = Request(
+        url,
+        data=json.dumps(
+            {'events': events}, cls=DjangoJSONEncoder).encode('utf-8'),
+        headers={'Content-Type': 'application/json'},
+    )
+    urlopen(request, timeout=timeout).close()